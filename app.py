@@ -1,63 +1,50 @@
 import streamlit as st
-from sidebar import sidebar_navigation
-from database_client import verify_login
+from sidebar import sidebar_navigation, performance_panel, profile_panel, memory_panel
+from utils.auth import require_login
+from page_registry import load_page, prefetch_next, drop_page_state
+from utils import query_metrics, nplus1, profiler, jobs
 
 st.set_page_config(page_title="Login", page_icon="🔐", layout="wide", initial_sidebar_state="collapsed")
+query_metrics.begin_rerun()
+nplus1.begin_rerun()
+profiler.begin_rerun()
+jobs.ensure_started()  # resumes jobs interrupted by a server restart
 
 
 
 # -------------------
 # Login
 # -------------------
-if "user" not in st.session_state:
-
-    st.title("🔐 Login")
-    user_id = st.text_input("ID")
-    password = st.text_input("Password", type="password")
-
-    if st.button("Login"):
-        user = verify_login(user_id, password)
-        if user:
-            st.session_state["user"] = user
-            st.rerun()
-        else:
-            st.error("Invalid ID or password.")
-
-    st.stop()
+require_login()
 
 if "page" not in st.session_state:
     st.session_state.page = "landing"
 
-sidebar_navigation()
+# Leaving a page discards its scratch state (half-finished selections and the like).
+entered_page = st.session_state.get("rendered_page") != st.session_state.page
+if entered_page and "rendered_page" in st.session_state:
+    drop_page_state(st.session_state["rendered_page"], st.session_state)
+st.session_state["rendered_page"] = st.session_state.page
+
+performance_container = sidebar_navigation()
 
 # -------------------
 # Routing
 # -------------------
-if st.session_state.page == "landing":
-    import views.landing as page
-elif st.session_state.page == "overview":
-    import views.overview as page
-elif st.session_state.page == "enrollment":
-    import views.enrollment as page
-elif st.session_state.page == "edit":
-    import views.edit as page
-elif st.session_state.page == "batch_graduate":
-    import views.batch_graduate as page
-elif st.session_state.page == "migrate":
-    import views.migrate as page
-elif st.session_state.page == "wideview":
-    import views.wideview as page
-elif st.session_state.page == "irregular_overview":
-    import views.irregular_overview as page
-elif st.session_state.page == "curriculum":
-    import views.curriculum as page
-elif st.session_state.page == "semester":
-    import views.semester as page
-elif st.session_state.page == "student":
-    import views.student as page
-elif st.session_state.page == "semester_subject":
-    import views.manage_semester_subjects as page
-else:
+page = load_page(st.session_state.page)
+if page is None:
     st.error("🚨 Page not found.")
+    st.stop()
+
+with profiler.profile_page(st.session_state.page):
+    page.show()
+
+# Warm the cache for the pages users usually open next while this one is being read
+# (once per visit, not on every widget rerun).
+if entered_page:
+    prefetch_next(st.session_state.page, st.session_state.to_dict())
 
-page.show()
+# Rendered last so the panels cover everything the page did.
+performance_panel(performance_container)
+profile_panel(performance_container)
+memory_panel(performance_container)
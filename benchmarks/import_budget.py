@@ -0,0 +1,105 @@
+"""
+Import-time budget for the startup path.
+
+    python -m benchmarks.import_budget            # check every module, exit 1 on a violation
+    python -m benchmarks.import_budget --top 15   # also list the slowest imports per module
+
+Each module is imported cold in its own interpreter under `python -X importtime`. Two rules
+are enforced:
+
+* none of the heavy, rarely needed packages in FORBIDDEN may be imported (they have to be
+  loaded lazily inside the function that needs them);
+* the time a module adds on top of the framework baseline (streamlit + pandas, which every
+  page needs anyway) must stay under its budget in BUDGETS_MS.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from page_registry import PAGES
+
+BASELINE_IMPORTS = ["streamlit", "pandas"]
+FORBIDDEN = ["faker", "matplotlib", "xlsxwriter", "supabase", "fontTools"]
+
+DEFAULT_BUDGET_MS = 75
+BUDGETS_MS = {
+    "database_client": 40,
+    "sidebar": 40,
+    "page_registry": 10,
+}
+MODULES = ["database_client", "sidebar", "page_registry"] + sorted({page["module"] for page in PAGES.values()})
+
+
+def import_profile(modules):
+    """Import `modules` in a fresh interpreter and return {module: cumulative_us} for everything loaded."""
+    code = "; ".join(f"import {module}" for module in modules) or "pass"
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def _total_ms(profile, modules):
+    return sum(profile.get(module, 0) for module in modules) / 1000
+
+
+def check(top=0):
+    """Return a list of violation messages (printing a report along the way)."""
+    baseline_profile = import_profile(BASELINE_IMPORTS)
+    baseline_ms = _total_ms(baseline_profile, BASELINE_IMPORTS)
+    print(f"baseline ({' + '.join(BASELINE_IMPORTS)}): {baseline_ms:.0f} ms")
+
+    violations = []
+    for module in MODULES:
+        profile = import_profile(BASELINE_IMPORTS + [module])
+        # The baseline packages are imported first, so the module's cumulative time is its own cost.
+        own_ms = _total_ms(profile, [module])
+        budget = BUDGETS_MS.get(module, DEFAULT_BUDGET_MS)
+        forbidden = sorted({name.split(".")[0] for name in profile if name.split(".")[0] in FORBIDDEN})
+
+        status = "ok"
+        if forbidden:
+            status = "FORBIDDEN"
+            violations.append(f"{module} imports {', '.join(forbidden)} at import time")
+        if own_ms > budget:
+            status = "OVER BUDGET" if status == "ok" else status + ", OVER BUDGET"
+            violations.append(f"{module} takes {own_ms:.0f} ms to import (budget {budget} ms)")
+        print(f"{module:<40} {own_ms:>7.0f} ms  (budget {budget:>4} ms)  {status}")
+
+        if top:
+            new = {name: us for name, us in profile.items() if name not in baseline_profile and name != module}
+            for name, us in sorted(new.items(), key=lambda item: item[1], reverse=True)[:top]:
+                print(f"    {name:<50} {us / 1000:>7.1f} ms")
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check import time of the startup path against its budget.")
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest new imports per module")
+    args = parser.parse_args(argv)
+
+    violations = check(args.top)
+    if violations:
+        print("\nImport budget violations:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+    print("\nAll modules within their import budget.")
+
+
+if __name__ == "__main__":
+    main()
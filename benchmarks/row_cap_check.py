@@ -0,0 +1,91 @@
+"""
+Checks that bulk grade and enrollment reads survive PostgREST's max-rows limit.
+
+    python -m benchmarks.row_cap_check                 # exit 1 when a total does not match
+    python -m benchmarks.row_cap_check --students 400
+
+Supabase returns at most 1000 rows per request, silently. The in-memory backend is capped the
+same way (max_rows) and loaded with a dataset whose grade rows are well over that limit; the
+batched grade fetch used by the overview, wide view and exports must then return every
+enrollment, and the GWA totals built from it must match the ones computed one student at a
+time. The shared enrollment frames behind most pages must hold every enrollment too.
+"""
+import argparse
+import os
+import sys
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import database_client
+from utils import cache
+from utils.dataset_generator import iter_dataset
+from utils.memory_backend import MemoryClient
+
+MAX_ROWS = 1000
+
+
+def _rounded(summary):
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+def check(students, seed=7, max_rows=MAX_ROWS):
+    """Return a list of mismatch messages (empty when every total matches)."""
+    import pandas as pd
+    from services.enrollment_service import get_all_enrollments_frame, get_all_regular_enrollments_frame
+    from services.grades_service import get_grades_for_students, get_student_grades, summarize_gwa
+
+    warnings.simplefilter("ignore", pd.errors.SettingWithCopyWarning)
+    client = MemoryClient(max_rows=max_rows)
+    client.load_dataset(iter_dataset(students=students, seed=seed))
+    database_client.set_backend(client)
+    cache.clear()
+
+    expected_ids = {row["enrollmentid"] for row in client.rows("enrollments")}
+    if len(expected_ids) <= max_rows:
+        return [f"dataset has only {len(expected_ids)} enrollments; use more students than {students}"]
+
+    student_ids = sorted({row["studentid"] for row in client.rows("students")})
+    grades = get_grades_for_students(student_ids)
+    problems = []
+    fetched_ids = set(grades["enrollmentid"]) if not grades.empty else set()
+    if len(grades) != len(expected_ids) or fetched_ids != expected_ids:
+        problems.append(f"get_grades_for_students returned {len(grades)} rows for {len(expected_ids)} enrollments")
+
+    grades_by_student = dict(tuple(grades.groupby("studentid", sort=False))) if not grades.empty else {}
+    for student_id in student_ids:
+        alone = get_student_grades(student_id)
+        batched = grades_by_student.get(student_id)
+        alone_summary = _rounded(summarize_gwa(alone)) if not alone.empty else {}
+        batched_summary = _rounded(summarize_gwa(batched)) if batched is not None else {}
+        if alone_summary != batched_summary:
+            problems.append(f"student {student_id}: GWA totals differ ({batched_summary} vs {alone_summary})")
+
+    regular_ids = {row["enrollmentid"] for row in client.rows("enrollments") if row["enrollmentstatus"] == "Enrolled - Regular"}
+    for name, frame, ids in (
+        ("get_all_enrollments_frame", get_all_enrollments_frame(), expected_ids),
+        ("get_all_regular_enrollments_frame", get_all_regular_enrollments_frame(), regular_ids),
+    ):
+        if len(frame) != len(ids) or set(frame["enrollmentid"]) != ids:
+            problems.append(f"{name} returned {len(frame)} rows for {len(ids)} enrollments")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check bulk grade reads against PostgREST's max-rows limit.")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    problems = check(args.students, seed=args.seed)
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+    print(f"OK: grade totals and enrollment frames for {args.students} students match with selects capped at {MAX_ROWS} rows")
+
+
+if __name__ == "__main__":
+    main()
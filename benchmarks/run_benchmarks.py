@@ -0,0 +1,259 @@
+"""
+Page-level performance benchmarks against the in-memory backend.
+
+    python -m benchmarks.run_benchmarks                      # run and compare with baselines.json
+    python -m benchmarks.run_benchmarks --sizes 200 1000     # choose dataset sizes (students)
+    python -m benchmarks.run_benchmarks --save-baseline      # store this run as the new baseline
+    python -m benchmarks.run_benchmarks --latency 0.02       # add 20 ms per Supabase request
+
+Every `views/*.show()` is driven through Streamlit's AppTest, and the micro paths
+(calculate_gwa, get_student_gwa_summary, migration, batch graduation) are timed directly.
+For each case the suite reports wall time, Supabase request count, bytes transferred and
+peak Python memory (tracemalloc) per dataset size.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import database_client
+from page_registry import PAGES
+from utils import cache, nplus1
+from utils.dataset_generator import iter_dataset
+from utils.memory_backend import MemoryClient
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_SIZES = [100, 500, 2000]
+TIME_TOLERANCE = 0.25  # 25% slower than baseline counts as a regression
+
+BENCH_USER = {"id": "bench", "fullname": "Benchmark User"}
+
+
+
+def _page_script(module):
+    # Runs in AppTest's script thread; the N+1 counts are kept under this session's id.
+    import importlib
+    import streamlit as st
+    from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+    from utils import cache, nplus1
+
+    nplus1.begin_rerun()
+    st.session_state["bench_session_id"] = get_script_run_ctx().session_id
+    importlib.import_module(module).show()
+
+
+def build_backend(students, seed, latency):
+    client = MemoryClient(latency=latency)
+    client.load_dataset(iter_dataset(students=students, seed=seed))
+    database_client.set_backend(client)
+    return client
+
+
+def measure(client, fn, repeat=1):
+    """
+    Run fn `repeat` times for timing, then once more under tracemalloc for peak memory.
+    fn may return extra N+1 shapes it collected itself (AppTest runs pages in another thread).
+    """
+    times = []
+    client.stats.reset()
+    for i in range(repeat):
+        cache.clear()  # every run is measured cold
+        start = time.perf_counter()
+        with nplus1.track() as found:
+            extra = fn()
+        times.append(time.perf_counter() - start)
+        if i == 0:
+            repeated = sorted({nplus1.describe(shape) for shape, *_ in found} | set(extra or []))
+    stats = client.stats.snapshot()
+
+    cache.clear()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(times) * 1000, 1),
+        "requests": stats["requests"] // repeat,
+        "bytes": stats["bytes"] // repeat,
+        "peak_kb": round(peak / 1024, 1),
+        "nplus1": repeated,
+    }
+
+
+# -------------------------
+# Cases
+# -------------------------
+def page_cases(timeout):
+    from streamlit.testing.v1 import AppTest
+
+    def make(page, module):
+        def run():
+            at = AppTest.from_function(_page_script, kwargs={"module": module}, default_timeout=timeout)
+            at.session_state["user"] = BENCH_USER
+            at.session_state["page"] = page
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{module}.show() raised: {at.exception[0].message}")
+            return [nplus1.describe(shape) for shape, *_ in nplus1.offenders(key=at.session_state["bench_session_id"])]
+        return run
+
+    return {f"page:{name}": make(name, page["module"]) for name, page in PAGES.items()}
+
+
+def micro_cases(client):
+    from services.enrollment_service import get_all_regular_enrollments, migrate_students_to_semester_subjects, graduate_students
+    from services.grades_service import get_student_grades, calculate_gwa, get_student_gwa_summary
+
+    enrollments = client.rows("enrollments")
+    students = sorted({row["studentid"] for row in enrollments})[:20]
+    target_semester = max(row["semester_id"] for row in client.rows("semester_subjects"))
+    grades_df = get_student_grades(students[0]) if students else None
+
+    def gwa():
+        for year in ["1st Year", "2nd Year", "3rd Year", "4th Year"]:
+            calculate_gwa(grades_df.copy(), yearlevel=year, semester_term="1st Semester")
+
+    def summary():
+        for student_id in students:
+            get_student_gwa_summary(student_id)
+
+    def migrate():
+        migrate_students_to_semester_subjects(students, target_semester)
+
+    def graduate():
+        regular = get_all_regular_enrollments()
+        graduating = {row["studentid"]: row for row in regular if row["yearlevel"] == "4th Year"}
+        semester_id = max((row["semesterid"] for row in graduating.values()), default=None)
+        graduate_students(list(graduating)[:20], semester_id)
+
+    cases = {"micro:get_student_gwa_summary": summary, "micro:migrate_student_to_semester_subjects": migrate, "micro:batch_graduate": graduate}
+    if grades_df is not None and not grades_df.empty:
+        cases["micro:calculate_gwa"] = gwa
+    return cases
+
+
+def _quiet():
+    # AppTest logs "missing ScriptRunContext" whenever session state is seeded, wideview's mixed
+    # grade columns log an Arrow fallback traceback, and pandas chained-assignment warnings from
+    # the views would drown out the results.
+    import logging
+    import pandas as pd
+
+    for name in ("streamlit.runtime.scriptrunner_utils.script_run_context", "streamlit.dataframe_util"):
+        logging.getLogger(name).disabled = True
+    warnings.simplefilter("ignore", pd.errors.SettingWithCopyWarning)
+    warnings.simplefilter("ignore", FutureWarning)
+
+
+def run_suite(sizes, seed=7, latency=0.0, repeat=1, timeout=120, only=None):
+    _quiet()
+    results = {}
+    for size in sizes:
+        size_results = {}
+        # Pages and read-only micro paths share one dataset; writes get a fresh copy each.
+        client = build_backend(size, seed, latency)
+        cases = page_cases(timeout)
+        cases.update({k: v for k, v in micro_cases(client).items() if k in ("micro:calculate_gwa", "micro:get_student_gwa_summary")})
+        for name, fn in cases.items():
+            if only and not any(o in name for o in only):
+                continue
+            size_results[name] = measure(client, fn, repeat)
+            print(f"[{size:>6} students] {name:<45} {_format(size_results[name])}", flush=True)
+
+        for name in ("micro:migrate_student_to_semester_subjects", "micro:batch_graduate"):
+            if only and not any(o in name for o in only):
+                continue
+            client = build_backend(size, seed, latency)
+            size_results[name] = measure(client, micro_cases(client)[name], 1)
+            print(f"[{size:>6} students] {name:<45} {_format(size_results[name])}", flush=True)
+
+        results[str(size)] = size_results
+    return results
+
+
+# -------------------------
+# Baselines
+# -------------------------
+def _format(result):
+    line = f"{result['wall_ms']:>9.1f} ms  {result['requests']:>6} req  {result['bytes'] / 1024:>9.1f} KB  {result['peak_kb']:>9.1f} KB peak"
+    for shape in result.get("nplus1", []):
+        line += f"\n{'':>10}N+1: {shape}"
+    return line
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    for size, cases in results.items():
+        baseline.setdefault(size, {}).update(cases)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, tolerance=TIME_TOLERANCE):
+    """Print per-case deltas against the baseline and return the list of regressions."""
+    regressions = []
+    for size, cases in results.items():
+        for name, current in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            if not previous:
+                continue
+            time_delta = (current["wall_ms"] - previous["wall_ms"]) / previous["wall_ms"] if previous["wall_ms"] else 0.0
+            request_delta = current["requests"] - previous["requests"]
+            new_nplus1 = set(current.get("nplus1", [])) - set(previous.get("nplus1", []))
+            flag = "".join(f"  <-- NEW N+1: {shape}" for shape in sorted(new_nplus1))
+            if time_delta > tolerance or request_delta > 0:
+                flag = "  <-- REGRESSION" + flag
+            if flag:
+                regressions.append((size, name))
+            print(f"[{size:>6} students] {name:<45} time {time_delta:+7.1%}  requests {request_delta:+d}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run page-level performance benchmarks against the in-memory backend.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Dataset sizes in students")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every Supabase request")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per case (median is reported)")
+    parser.add_argument("--only", nargs="+", help="Run only cases whose name contains one of these strings")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when a case regressed")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, seed=args.seed, latency=args.latency, repeat=args.repeat, only=args.only)
+
+    baseline = load_baseline(args.baseline)
+    regressions = []
+    if baseline:
+        print("\nCompared with baseline:")
+        regressions = compare(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
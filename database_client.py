@@ -1,19 +1,308 @@
-from supabase import create_client, Client
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 import streamlit as st
 import bcrypt
+from utils.throttle import TokenBuckets
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
+if TYPE_CHECKING:
+    from supabase import Client
+
+# -------------------------
+# Pluggable backend
+# -------------------------
+# Services import `supabase` from here and call it directly. It forwards every attribute to
+# the active backend, which is the real Supabase client unless another one (for example
+# utils.memory_backend.MemoryClient) is installed with set_backend() or GMS_BACKEND=memory.
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _create_default_backend():
+    if os.environ.get("GMS_BACKEND", "supabase").lower() == "memory":
+        from utils.memory_backend import client_from_env
+        return client_from_env()
+    # The supabase package (gotrue, realtime, websockets, httpx) is slow to import; only pay
+    # for it when the first query actually needs the real client.
+    from supabase import create_client
+    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+
+
+def _create_read_backend():
+    # A read replica is optional; without one every read goes to the primary.
+    if os.environ.get("GMS_BACKEND", "supabase").lower() == "memory":
+        return None
+    try:
+        url = st.secrets.get("SUPABASE_READ_URL")
+    except FileNotFoundError:
+        url = None
+    if not url:
+        return None
+    from supabase import create_client
+    return create_client(url, st.secrets.get("SUPABASE_READ_KEY") or st.secrets["SUPABASE_KEY"])
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_default_backend()
+    return _backend
+
+
+def set_backend(client):
+    """Install `client` (anything with table/from_/rpc) as the backend for every service call."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, client
+    return previous
+
+
+_read_backend = None
+_read_backend_loaded = False
+
+
+def get_read_backend():
+    """The read replica, or the primary backend when no replica is configured."""
+    global _read_backend, _read_backend_loaded
+    if not _read_backend_loaded:
+        with _backend_lock:
+            if not _read_backend_loaded:
+                _read_backend = _create_read_backend()
+                _read_backend_loaded = True
+    return _read_backend or get_backend()
+
+
+def has_read_replica():
+    get_read_backend()
+    return _read_backend is not None
+
+
+def set_read_backend(client):
+    """Install `client` as the read replica (None routes every read to the primary)."""
+    global _read_backend, _read_backend_loaded
+    with _backend_lock:
+        previous, _read_backend, _read_backend_loaded = _read_backend, client, True
+    return previous
+
+
+# -------------------------
+# Query pipeline
+# -------------------------
+# table()/from_()/rpc() hand out a recorder instead of a live postgrest builder. It records
+# the chained calls and only builds the real query on the active backend at execute(), after
+# every middleware has seen the request. A middleware is `fn(request, call_next) -> response`.
+OPERATIONS = ("select", "insert", "upsert", "update", "delete")
+MODIFIERS = ("order", "range", "limit", "offset", "single", "maybe_single", "csv")
+
+# Frames from these modules are plumbing, never the code that issued a query.
+INTERNAL_MODULES = {__name__}
+
+
+class QueryRequest:
+    """A recorded query: how to build it on a backend plus where it was issued from."""
+
+    def __init__(self, root, args, kwargs):
+        self.root = root
+        self.args = args
+        self.kwargs = kwargs
+        self.calls = []
+        self.view = None
+        self.caller = None
+        self.target = "primary"  # or "replica"; set by the routing middleware
+        self.cancelled = False  # set once the script run that issued it was superseded
+
+    def stop_if_superseded(self):
+        """Raise if the script run that issued this request was superseded (see utils/cancellation.py)."""
+
+    @property
+    def table(self):
+        return self.args[0] if self.args else self.kwargs.get("fn") or self.kwargs.get("table_name")
+
+    @property
+    def operation(self):
+        if self.root == "rpc":
+            return "rpc"
+        for name, _, _ in self.calls:
+            if name in OPERATIONS:
+                return name
+        return "select"
+
+    @property
+    def filters(self):
+        """[(method, column, value)] for every filter call, in order."""
+        return [
+            (name, args[0] if args else None, args[1] if len(args) > 1 else None)
+            for name, args, _ in self.calls
+            if args is not None and name not in OPERATIONS and name not in MODIFIERS
+        ]
+
+    def build(self, backend):
+        builder = getattr(backend, self.root)(*self.args, **self.kwargs)
+        for name, args, kwargs in self.calls:
+            attr = getattr(builder, name)
+            builder = attr if args is None else attr(*args, **kwargs)
+        return builder
+
+    def __repr__(self):
+        return f"<QueryRequest {self.operation} {self.table} from {self.caller}>"
+
+
+def _call_site(request):
+    """Fill in the calling view (first views.* frame) and the first non-plumbing frame."""
+    frame = sys._getframe(2)
+    while frame is not None and (request.view is None or request.caller is None):
+        module = frame.f_globals.get("__name__", "")
+        if request.caller is None and module not in INTERNAL_MODULES:
+            request.caller = f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        if request.view is None and module.startswith("views."):
+            request.view = module[len("views."):]
+        frame = frame.f_back
+    request.view = request.view or "-"
+    request.caller = request.caller or "-"
+
+
+_middleware = []
+
+
+def add_query_middleware(middleware):
+    """Append `middleware` to the pipeline (middlewares added first run outermost)."""
+    if middleware not in _middleware:
+        _middleware.append(middleware)
+
+
+def remove_query_middleware(middleware):
+    if middleware in _middleware:
+        _middleware.remove(middleware)
+
+
+def execute_request(request, backend=None):
+    """Run `request` through every middleware and finally against the backend."""
+    chain = list(_middleware)
+
+    def call_next(req, index=0):
+        if index < len(chain):
+            return chain[index](req, lambda r: call_next(r, index + 1))
+        if backend is None:
+            return req.build(get_read_backend() if req.target == "replica" else get_backend()).execute()
+        return req.build(backend).execute()
+
+    return call_next(request)
+
+
+class _QueryBuilder:
+    """Records postgrest builder calls (select/eq/order/...) until execute()."""
+
+    def __init__(self, request):
+        self._request = request
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name == "not_":
+            # postgrest exposes `not_` as a property that negates the next filter.
+            self._request.calls.append((name, None, None))
+            return self
+
+        def record(*args, **kwargs):
+            self._request.calls.append((name, args, kwargs))
+            return self
+        return record
+
+    def execute(self):
+        _call_site(self._request)
+        return execute_request(self._request)
+
+
+class _BackendProxy:
+    def table(self, *args, **kwargs):
+        return _QueryBuilder(QueryRequest("table", args, kwargs))
+
+    def from_(self, *args, **kwargs):
+        return _QueryBuilder(QueryRequest("from_", args, kwargs))
+
+    def rpc(self, *args, **kwargs):
+        return _QueryBuilder(QueryRequest("rpc", args, kwargs))
+
+    def __getattr__(self, name):
+        return getattr(get_backend(), name)
+
+
+supabase: "Client" = _BackendProxy()
+
+from utils import query_metrics, nplus1, cache, routing, cancellation, singleflight, resilience  # noqa: E402  (needs the pipeline above)
+
+add_query_middleware(query_metrics.record_query)
+add_query_middleware(nplus1.detect_nplus1)
+add_query_middleware(cache.cache_queries)
+add_query_middleware(routing.route_queries)
+# Runs the rest on a worker thread; everything above relies on the script thread's locals.
+add_query_middleware(cancellation.cancel_superseded)
+# After routing, so only reads bound for the same backend share a request.
+add_query_middleware(singleflight.coalesce_reads)
+# Innermost, so hedged copies and retries re-run only the backend call.
+add_query_middleware(resilience.resilient_queries)
+
+# -------------------------
+# Passwords and login
+# -------------------------
+# bcrypt is CPU-bound (about 0.25 s at cost 12) but releases the GIL, so checks run on a small
+# shared pool: a burst of logins queues there instead of stalling every session's script
+# thread. Attempts are throttled per user ID and per client IP before any hashing happens.
+BCRYPT_ROUNDS = int(os.environ.get("GMS_BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.environ.get("GMS_AUTH_WORKERS", "2"))
+AUTH_TIMEOUT = 30  # seconds to wait for a free hashing worker
+
+# 5 failed attempts per ID, then one every 12 s; 20 per IP, then one every 3 s.
+_attempts_by_id = TokenBuckets(capacity=5, rate=1 / 12)
+_attempts_by_ip = TokenBuckets(capacity=20, rate=1 / 3)
+
+_auth_executor = None
+_auth_lock = threading.Lock()
+
+
+class LoginThrottled(ValueError):
+    """Too many login attempts for this ID or address; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Too many login attempts. Try again in {retry_after:.0f} seconds.")
+
+
+def _run_auth(fn, *args):
+    global _auth_executor
+    with _auth_lock:
+        if _auth_executor is None:
+            _auth_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt")
+    return _auth_executor.submit(fn, *args).result(timeout=AUTH_TIMEOUT)
+
+
+def _hashpw(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def _hash_rounds(hashed):
+    # "$2b$12$<salt+hash>"
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 # Hash password before saving
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return _run_auth(_hashpw, password)
 
 # Verify password on login
 def check_password(password, hashed):
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return _run_auth(_checkpw, password, hashed)
 
 def create_account(user_id, password, fullname):
     existing = supabase.table("users").select("id").eq("id", user_id).execute().data
@@ -27,15 +316,39 @@ def create_account(user_id, password, fullname):
     }).execute()
     return True, "Account created successfully."
 
-def verify_login(user_id, password):
-    result = supabase.table("users").select("*").eq("id", user_id).execute().data
+def get_user(user_id):
+    result = supabase.table("users").select("id, fullname, password").eq("id", user_id).execute().data
+    return result[0] if result else None
 
-    if not result:
+def verify_login(user_id, password, ip_address=None):
+    """
+    Return the user row for valid credentials, else None. Raises LoginThrottled when the
+    ID or `ip_address` has run out of attempts, and TimeoutError when no hashing worker
+    frees up within AUTH_TIMEOUT. Only failed attempts count against the limits. Hashes
+    made with a different cost than BCRYPT_ROUNDS are upgraded on successful login.
+    """
+    # An attempt is charged to both buckets or to neither; it is refunded if it succeeds.
+    charged = []
+    for buckets, key in ((_attempts_by_id, user_id), (_attempts_by_ip, ip_address)):
+        if key:
+            retry_after = buckets.take(key)
+            if retry_after:
+                for spent, spent_key in charged:
+                    spent.refund(spent_key)
+                raise LoginThrottled(retry_after)
+            charged.append((buckets, key))
+
+    user = get_user(user_id)
+    if not user:
+        return None
+
+    if not check_password(password, user["password"]):
         return None
-    
-    user = result[0]
 
-    if check_password(password, user["password"]):
-        return user
-    
-    return None
+    for buckets, key in charged:
+        buckets.refund(key)
+
+    if _hash_rounds(user["password"]) != BCRYPT_ROUNDS:
+        user["password"] = hash_password(password)
+        supabase.table("users").update({"password": user["password"]}).eq("id", user_id).execute()
+    return user
@@ -0,0 +1,212 @@
+import importlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 2
+
+
+def _selected_student(state):
+    student_id = state.get("last_selected_student_id") or state.get("selected_student_id")
+    return (student_id,) if student_id else None
+
+
+# page key (st.session_state.page) -> view module, the data it loads on a plain visit, and the
+# pages users usually open next. Modules are imported on first visit only.
+#
+# A data dependency is ("module:function", args), where args is a tuple or a function of the
+# session state returning one (or None to skip it). The calls must match the page's own calls
+# so that prefetching warms exactly the cache entries the page will read.
+#
+# "session_keys" are scratch session-state keys the page owns; they are dropped when the user
+# navigates to another page so abandoned work does not stay in memory for the whole session.
+# "shared_keys" are key prefixes of utils.shared_cache entries the page reads; the session stops
+# holding them at the same time, so they are evicted first when the cache is full.
+PAGES = {
+    "landing": {
+        "module": "views.landing",
+        "next": ["overview"],
+    },
+    "overview": {
+        "module": "views.overview",
+        "data": [
+            ("services.enrollment_service:get_all_regular_enrollments_frame", ()),
+            ("services.enrollment_service:get_all_students", ()),
+            ("services.grades_service:get_curriculum_units", ()),
+        ],
+        "next": ["edit", "wideview"],
+    },
+    "enrollment": {
+        "module": "views.enrollment",
+        "data": [
+            ("services.page_bundle_service:get_page_bundle", ("enrollment",)),
+            ("services.enrollment_service:get_all_enrollments", ()),
+        ],
+        "next": ["edit"],
+        "session_keys": ["selected_subjects", "record_semester_key", "record_school_year", "record_term"],
+        "shared_keys": [("all_subjects",)],
+    },
+    "edit": {
+        "module": "views.edit",
+        "data": [
+            ("services.enrollment_service:get_all_students", ()),
+            ("services.enrollment_service:get_all_enrollments_frame", ()),
+            ("services.curriculum_service:get_all_curriculum_subjects", ()),
+            ("services.grades_service:get_student_gwa_summary", _selected_student),
+        ],
+        "next": ["overview"],
+    },
+    "batch_graduate": {
+        "module": "views.batch_graduate",
+        "data": [
+            ("services.calendar_service:get_calendar", ()),
+            ("services.enrollment_service:get_all_enrollments_frame", ()),
+        ],
+        "next": ["overview"],
+    },
+    "migrate": {
+        "module": "views.migrate",
+        "data": [
+            ("services.calendar_service:get_calendar", ()),
+            ("services.enrollment_service:get_all_enrollments_frame", ()),
+        ],
+        "next": ["enrollment"],
+    },
+    "wideview": {
+        "module": "views.wideview",
+        "data": [
+            ("services.enrollment_service:get_all_regular_enrollments_frame", ()),
+            ("services.grades_service:get_curriculum_units", ()),
+        ],
+        "next": ["overview", "reports"],
+    },
+    "reports": {
+        "module": "views.reports",
+        "data": [
+            ("services.enrollment_service:get_all_regular_enrollments_frame", ()),
+        ],
+    },
+    "irregular_overview": {
+        "module": "views.irregular_overview",
+        "next": ["edit"],
+    },
+    "curriculum": {
+        "module": "views.curriculum",
+        "data": [
+            ("services.program_service:get_all_programs", ()),
+            ("services.curriculum_service:get_all_curriculum_subjects", ()),
+        ],
+        "next": ["semester_subject"],
+    },
+    "semester": {
+        "module": "views.semester",
+        "data": [
+            ("services.semester_service:get_all_semesters", ()),
+        ],
+        "next": ["semester_subject"],
+    },
+    "student": {
+        "module": "views.student",
+        "data": [
+            ("services.student_service:get_all_students", ()),
+            ("services.program_service:get_all_programs", ()),
+        ],
+        "next": ["enrollment"],
+    },
+    "jobs": {
+        "module": "views.jobs",
+    },
+    "semester_subject": {
+        "module": "views.manage_semester_subjects",
+        "data": [
+            ("services.page_bundle_service:get_page_bundle", ("semester_subject",)),
+        ],
+        "next": ["migrate"],
+    },
+}
+
+
+def load_page(name):
+    """Import and return the view module for `name`, or None for an unknown page."""
+    page = PAGES.get(name)
+    if page is None:
+        return None
+    return importlib.import_module(page["module"])
+
+
+def drop_page_state(name, state):
+    """Remove the scratch session-state keys owned by page `name` and release its shared cache entries."""
+    page = PAGES.get(name, {})
+    for key in page.get("session_keys", []):
+        state.pop(key, None)
+    if page.get("shared_keys"):
+        from utils import shared_cache
+
+        for prefix in page["shared_keys"]:
+            shared_cache.release(prefix)
+
+
+def _resolve(target):
+    module, function = target.split(":")
+    return getattr(importlib.import_module(module), function)
+
+
+def page_dependencies(name, state):
+    """[(function path, args)] a visit to `name` would load, given the session state."""
+    calls = []
+    for target, args in PAGES.get(name, {}).get("data", []):
+        if callable(args):
+            args = args(state)
+        if args is not None:
+            calls.append((target, tuple(args)))
+    return calls
+
+
+# -------------------------
+# Prefetch
+# -------------------------
+_executor = None
+_in_flight = set()
+_lock = threading.Lock()
+
+
+def _run_prefetch(call):
+    target, args = call
+    try:
+        _resolve(target)(*args)
+    except Exception:
+        logger.debug("Prefetch of %s%r failed", target, args, exc_info=True)
+    finally:
+        with _lock:
+            _in_flight.discard(call)
+
+
+def prefetch_next(name, state):
+    """
+    Warm the query cache for the pages usually opened after `name` on a background thread.
+    Returns the number of calls queued (calls already running are skipped).
+    """
+    from utils import cache
+
+    global _executor
+    if cache.CACHE_TTL <= 0:
+        return 0
+
+    calls = []
+    for next_page in PAGES.get(name, {}).get("next", []):
+        if next_page in PAGES:
+            calls += page_dependencies(next_page, state)
+
+    queued = 0
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        for call in dict.fromkeys(calls):
+            if call in _in_flight:
+                continue
+            _in_flight.add(call)
+            _executor.submit(_run_prefetch, call)
+            queued += 1
+    return queued
@@ -0,0 +1,104 @@
+import re
+
+from services.semester_service import get_all_semesters
+from utils import shared_cache
+
+# Position of each term within a school year. Terms not listed come after these, by name.
+TERM_ORDER = {"1st Semester": 0, "2nd Semester": 1, "Summer": 2, "Midyear": 2}
+YEAR = re.compile(r"\d{4}")
+
+
+def semester_key(schoolyear, term):
+    """The "<schoolyear> <term>" label used for semesters throughout the views."""
+    return f"{schoolyear} {term}"
+
+
+def school_year_start(schoolyear):
+    """2024 for "2024-2025"; 0 when the school year has no four-digit year."""
+    match = YEAR.search(str(schoolyear))
+    return int(match.group()) if match else 0
+
+
+def term_rank(term):
+    return TERM_ORDER.get(term, len(TERM_ORDER))
+
+
+def sort_school_years(values, newest_first=False):
+    return sorted(set(values), key=lambda year: (school_year_start(year), str(year)), reverse=newest_first)
+
+
+def sort_terms(values):
+    return sorted(set(values), key=lambda term: (term_rank(term), str(term)))
+
+
+class AcademicCalendar:
+    """
+    Every semester in chronological order: by school year, then term (1st, 2nd, Summer), then
+    start date. A semester's ordinal is its position in that order, so "latest", "previous"
+    and "all terms between" are dictionary lookups and slices, never string comparisons.
+
+    Semesters can be referred to by semesterid, by "<schoolyear> <term>" or by
+    (schoolyear, term); references to unknown semesters give None.
+    """
+
+    def __init__(self, semesters):
+        self.semesters = tuple(sorted(
+            (dict(row) for row in semesters),
+            key=lambda row: (school_year_start(row["schoolyear"]), str(row["schoolyear"]),
+                             term_rank(row["term"]), str(row["term"]), str(row.get("startdate") or "")),
+        ))
+        self._by_id = {row["semesterid"]: i for i, row in enumerate(self.semesters)}
+        self._by_key = {semester_key(row["schoolyear"], row["term"]): i for i, row in enumerate(self.semesters)}
+
+    def __len__(self):
+        return len(self.semesters)
+
+    def ordinal(self, semester):
+        if isinstance(semester, tuple):
+            return self._by_key.get(semester_key(*semester))
+        ordinal = self._by_id.get(semester)
+        return ordinal if ordinal is not None else self._by_key.get(semester)
+
+    def latest(self, semesters=None):
+        """The most recent of `semesters` (of all semesters when None)."""
+        if semesters is None:
+            return self.semesters[-1] if self.semesters else None
+        ordinals = [ordinal for ordinal in map(self.ordinal, semesters) if ordinal is not None]
+        return self.semesters[max(ordinals)] if ordinals else None
+
+    def previous(self, semester):
+        ordinal = self.ordinal(semester)
+        return self.semesters[ordinal - 1] if ordinal else None
+
+    def between(self, start, end):
+        """Semesters from `start` through `end` (inclusive, either order), oldest first; () if either is unknown."""
+        first, last = self.ordinal(start), self.ordinal(end)
+        if first is None or last is None:
+            return ()
+        first, last = min(first, last), max(first, last)
+        return self.semesters[first:last + 1]
+
+    def sort(self, semesters, newest_first=False):
+        """`semesters` (any kind of reference) in chronological order; unknown ones go last."""
+        semesters = list(semesters)
+        known = sorted((ref for ref in semesters if self.ordinal(ref) is not None), key=self.ordinal, reverse=newest_first)
+        return known + [ref for ref in semesters if self.ordinal(ref) is None]
+
+    def options(self, newest_first=False):
+        """{"<schoolyear> <term>": semesterid} for selectboxes, in chronological order."""
+        rows = reversed(self.semesters) if newest_first else self.semesters
+        return {semester_key(row["schoolyear"], row["term"]): row["semesterid"] for row in rows}
+
+
+def get_calendar():
+    """The academic calendar, shared by every session and rebuilt after semesters change."""
+    return shared_cache.get(("academic_calendar",), lambda: AcademicCalendar(get_all_semesters()), tables={"semesters"})
+
+
+def calendar_from_frame(df):
+    """
+    A calendar of the semesters found in an enrollments_view frame (semesterid, schoolyear,
+    semester_term), for pages that already hold one and only order those semesters.
+    """
+    semesters = df[["semesterid", "schoolyear", "semester_term"]].dropna().drop_duplicates("semesterid")
+    return AcademicCalendar(semesters.rename(columns={"semester_term": "term"}).to_dict("records"))
@@ -1,5 +1,39 @@
 from database_client import supabase
 from datetime import date
+from utils.nplus1 import expected
+from utils.frames import read_csv_pages
+from utils.paging import PAGE_SIZE
+from utils import arrow_store, cache
+from utils.routing import primary
+
+# Bounds for batched requests: ids per `in_` filter (URL length) and rows per insert.
+ID_BATCH_SIZE = 200
+INSERT_BATCH_SIZE = 1000
+
+# Column types of enrollments_view for CSV reads (see utils/frames.py). Columns with a few
+# hundred distinct values at most are categorical: stored once per value, filtered by integer
+# code. Names and IDs stay strings (grouped by, and near-unique per student); grades stay
+# strings because views edit and pattern-match them.
+ENROLLMENTS_VIEW_SCHEMA = {
+    "enrollmentid": "int64",
+    "studentid": "string",
+    "studentname": "string",
+    "studentremarks": "string",
+    "program": "category",
+    "yearlevel": "category",
+    "curriculumid": "int64",
+    "subjectcode": "category",
+    "subjectname": "category",
+    "units": "float64",  # may be fractional or missing
+    "semesterid": "int64",
+    "schoolyear": "category",
+    "semester_term": "category",
+    "enrollmentdate": "category",
+    "enrollmentstatus": "category",
+    "remarks": "category",
+    "grade": "string",
+}
+ENROLLMENTS_VIEW_TABLES = {"enrollments_view"} | cache.VIEW_DEPENDENCIES["enrollments_view"]
 
 
 def add_enrollment(student_id, curriculum_id, semester_id, enrollment_status="Enrolled - Regular", remarks="Regular"):
@@ -32,6 +66,21 @@ def get_all_enrollments():
     response = supabase.from_("enrollments_view").select("*").execute()
     return response.data
 
+def _enrollments_view_frame(regular_only=False):
+    # Paged like every bulk read: a single request would stop silently at PostgREST's max-rows.
+    def fetch_page(start, end):
+        query = supabase.from_("enrollments_view").select("*")
+        if regular_only:
+            query = query.eq("enrollmentstatus", "Enrolled - Regular")
+        return query.order("enrollmentid").range(start, end).csv().execute().data
+    return read_csv_pages(fetch_page, PAGE_SIZE, ENROLLMENTS_VIEW_SCHEMA)
+
+def get_all_enrollments_frame():
+    """get_all_enrollments() as a DataFrame, transferred as CSV and shared by every worker on the host."""
+    def load():
+        return _enrollments_view_frame()
+    return arrow_store.get_frame("enrollments_view", load, ENROLLMENTS_VIEW_TABLES)
+
 def delete_enrollment(enrollment_id):
     supabase.table("enrollments").delete().eq("enrollmentid", enrollment_id).execute()
 
@@ -43,8 +92,8 @@ def delete_all_enrollments_for_student_semester(student_id, semester_id):
 
 
     if enrollment_ids.data:
-        for enrollment in enrollment_ids.data:
-            delete_enrollment(enrollment["enrollmentid"])
+        ids = [enrollment["enrollmentid"] for enrollment in enrollment_ids.data]
+        supabase.table("enrollments").delete().in_("enrollmentid", ids).execute()
 
 
 def update_student_status(student_id, program, yearlevel, remarks="Enrolled", status="Regular"):
@@ -58,6 +107,26 @@ def update_student_status(student_id, program, yearlevel, remarks="Enrolled", st
         .eq("studentid", student_id) \
         .execute()
 
+def graduate_students(student_ids, semester_id):
+    """Mark students as Graduated and tag their enrollments in `semester_id`, two requests per ID_BATCH_SIZE students."""
+    student_ids = list(student_ids)
+    with expected():
+        for start in range(0, len(student_ids), ID_BATCH_SIZE):
+            batch = student_ids[start:start + ID_BATCH_SIZE]
+            supabase.table("students") \
+                .update({
+                    "yearlevel": "Graduated",
+                    "enrollmentstatus": "Graduated",
+                    "status": "Graduated"
+                }) \
+                .in_("studentid", batch) \
+                .execute()
+            supabase.table("enrollments") \
+                .update({"remarks": "Graduated"}) \
+                .in_("studentid", batch) \
+                .eq("semesterid", semester_id) \
+                .execute()
+
 def get_all_regular_enrollments():
     response = supabase.from_("enrollments_view") \
         .select("*") \
@@ -65,6 +134,12 @@ def get_all_regular_enrollments():
         .execute()
     return response.data
 
+def get_all_regular_enrollments_frame():
+    """get_all_regular_enrollments() as a DataFrame, transferred as CSV and shared by every worker on the host."""
+    def load():
+        return _enrollments_view_frame(regular_only=True)
+    return arrow_store.get_frame("enrollments_view_regular", load, ENROLLMENTS_VIEW_TABLES)
+
 def update_enrollment_status_and_remarks(student_id, semester_id, enrollment_status, remarks):
     supabase.table("enrollments") \
         .update({
@@ -77,35 +152,90 @@ def update_enrollment_status_and_remarks(student_id, semester_id, enrollment_sta
 
 
 def migrate_student_to_semester_subjects(student_id, target_semester_id):
-    semester_subjects = get_subjects_for_semester(target_semester_id)
-    if not semester_subjects:
+    results = migrate_students_to_semester_subjects([student_id], target_semester_id)
+    if results is None:
         return "No subjects offered for the selected semester."
 
-    migrated = 0
-    skipped = 0
-
-    for subject in semester_subjects:
-        curriculum_id = subject["curriculum_subject_id"]
-
-        # Check if already enrolled
-        existing = supabase.table("enrollments").select("enrollmentid") \
-            .eq("studentid", student_id) \
-            .eq("semesterid", target_semester_id) \
-            .eq("curriculumid", curriculum_id) \
-            .execute()
+    migrated, skipped = results[student_id]
+    return f"Enrolled {migrated} subjects. Skipped {skipped} (already enrolled)."
 
-        if existing.data:
-            skipped += 1
-            continue
 
-        add_enrollment(
-            student_id=student_id,
-            curriculum_id=curriculum_id,
-            semester_id=target_semester_id
-        )
-        migrated += 1
+def migrate_students_to_semester_subjects(student_ids, target_semester_id):
+    """
+    Enroll every student in all subjects offered in the target semester with three requests
+    in total: the offerings, the students' existing enrollments, and one multi-row insert.
 
-    return f"Enrolled {migrated} subjects. Skipped {skipped} (already enrolled)."
+    Returns {student_id: (migrated, skipped)}, or None when the semester has no subjects.
+    """
+    semester_subjects = get_subjects_for_semester(target_semester_id)
+    if not semester_subjects:
+        return None
+
+    student_ids = list(dict.fromkeys(student_ids))
+    enrolled = set()
+    # Read from the primary, never from the cache: a stale answer would let duplicates through.
+    with expected(), primary(), cache.bypass():
+        for start in range(0, len(student_ids), ID_BATCH_SIZE):
+            existing = supabase.table("enrollments").select("studentid, curriculumid") \
+                .in_("studentid", student_ids[start:start + ID_BATCH_SIZE]) \
+                .eq("semesterid", target_semester_id) \
+                .execute().data or []
+            enrolled.update((row["studentid"], row["curriculumid"]) for row in existing)
+
+    results = {}
+    rows = []
+    for student_id in student_ids:
+        migrated = 0
+        skipped = 0
+        for subject in semester_subjects:
+            curriculum_id = subject["curriculum_subject_id"]
+            # Check if already enrolled
+            if (student_id, curriculum_id) in enrolled:
+                skipped += 1
+                continue
+            enrolled.add((student_id, curriculum_id))
+            rows.append({
+                "studentid": student_id,
+                "curriculumid": curriculum_id,
+                "semesterid": target_semester_id,
+                "enrollmentdate": date.today().isoformat(),
+                "enrollmentstatus": "Enrolled - Regular",
+                "remarks": "Regular"
+            })
+            migrated += 1
+        results[student_id] = (migrated, skipped)
+
+    with expected():
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            supabase.table("enrollments").insert(rows[start:start + INSERT_BATCH_SIZE]).execute()
+    return results
+
+
+
+# -------------------------
+# Background job handlers (see utils/jobs.py)
+# -------------------------
+def run_migration_batch(params, students):
+    """Job item: migrate [[student_id, name], ...] into params["target_semester_id"]."""
+    names = dict((student_id, name) for student_id, name in students)
+    results = migrate_students_to_semester_subjects(list(names), params["target_semester_id"])
+    if results is None:
+        raise ValueError("No subjects offered for the selected semester.")
+
+    outcome = {"succeeded": [], "skipped": []}
+    for student_id, name in names.items():
+        migrated, _ = results.get(student_id, (0, 0))
+        if migrated == 0:
+            outcome["skipped"].append(f"{name} (already enrolled in all subjects)")
+        else:
+            outcome["succeeded"].append(name)
+    return outcome
+
+
+def run_graduation_batch(params, students):
+    """Job item: mark [[student_id, name], ...] as Graduated in params["semester_id"]."""
+    graduate_students([student_id for student_id, _ in students], params["semester_id"])
+    return {"succeeded": [name for _, name in students]}
 
 
 
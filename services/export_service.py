@@ -0,0 +1,267 @@
+import csv
+import io
+import os
+import tempfile
+import time
+from database_client import supabase
+from services.grades_service import get_curriculum_units, get_grades_for_students, summarize_gwa
+from services.enrollment_service import get_all_enrollments_frame, get_all_regular_enrollments_frame
+from utils.paging import PAGE_SIZE, paginate
+
+STUDENTS_PER_CHUNK = 200
+EXPORT_DIR = os.environ.get("GMS_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "gms_exports"))
+EXPORT_TTL = int(os.environ.get("GMS_EXPORT_TTL", "3600"))  # seconds a prepared export stays downloadable
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+YEAR_LEVELS = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
+SEMESTER_TERMS = ["1st Semester", "2nd Semester"]
+
+GRADEBOOK_COLUMNS = [
+    ("studentid", "string"), ("studentname", "string"), ("program", "string"),
+    ("yearlevel", "string"), ("schoolyear", "string"), ("semester_term", "string"),
+    ("subjectcode", "string"), ("subjectname", "string"), ("grade", "string"),
+    ("enrollmentstatus", "string"), ("studentremarks", "string"),
+]
+
+TRANSCRIPT_COLUMNS = [
+    ("studentid", "string"), ("studentname", "string"), ("program", "string"),
+    ("schoolyear", "string"), ("semester_term", "string"), ("yearlevel", "string"),
+    ("subjectcode", "string"), ("subjectname", "string"), ("units", "float"), ("grade", "string"),
+]
+
+GWA_KEYS = [
+    key
+    for year in YEAR_LEVELS
+    for key in [f"{year} {sem}" for sem in SEMESTER_TERMS] + [f"{year} Overall"]
+] + ["Overall"]
+
+GWA_COLUMNS = [("studentid", "string"), ("Name", "string")] + [(key, "float") for key in GWA_KEYS]
+
+
+# -------------------------
+# Paginated reads
+# -------------------------
+def enrollments_query(columns, regular_only=False, schoolyear=None, semester_term=None, yearlevel=None, program=None, student_id=None):
+    query = supabase.table("enrollments_view").select(columns)
+    if regular_only:
+        query = query.eq("enrollmentstatus", "Enrolled - Regular")
+    if schoolyear:
+        query = query.eq("schoolyear", schoolyear)
+    if semester_term:
+        query = query.eq("semester_term", semester_term)
+    if yearlevel:
+        query = query.eq("yearlevel", yearlevel)
+    if program:
+        query = query.eq("program", program)
+    if student_id:
+        query = query.eq("studentid", student_id)
+    return query
+
+
+def iter_student_ids(regular_only=False, schoolyear=None, semester_term=None, yearlevel=None, program=None, student_id=None, by_name=False):
+    """Yield distinct student IDs (in chunks, by ID or by name) matching the enrollment filters."""
+    if student_id:
+        yield [student_id]
+        return
+
+    if regular_only or schoolyear or semester_term or yearlevel:
+        # Filters on enrollments: the shared enrollment frame has them (no request while it is fresh).
+        frame = get_all_regular_enrollments_frame() if regular_only else get_all_enrollments_frame()
+        mask = frame["studentid"].notna()
+        for column, value in (("schoolyear", schoolyear), ("semester_term", semester_term), ("yearlevel", yearlevel), ("program", program)):
+            if value:
+                mask &= frame[column] == value
+        students = frame.loc[mask, ["studentid", "studentname"]].drop_duplicates("studentid")
+        order = ["studentname", "studentid"] if by_name else ["studentid"]
+        student_ids = students.astype({"studentname": str}).sort_values(order)["studentid"].tolist()
+        for start in range(0, len(student_ids), PAGE_SIZE):
+            yield student_ids[start:start + PAGE_SIZE]
+        return
+
+    # One row per student instead of one per enrollment.
+    def build():
+        query = supabase.table("students").select("studentid")
+        if program:
+            query = query.eq("program", program)
+        if by_name:
+            query = query.order("firstname").order("lastname")
+        return query.order("studentid")
+    for page in paginate(build):
+        yield [row["studentid"] for row in page]
+
+
+def _chunked(id_chunks, size=STUDENTS_PER_CHUNK):
+    buffer = []
+    for chunk in id_chunks:
+        buffer.extend(chunk)
+        while len(buffer) >= size:
+            yield buffer[:size]
+            buffer = buffer[size:]
+    if buffer:
+        yield buffer
+
+
+def iter_gradebook_chunks(**filters):
+    """Overview gradebook: one row per enrollment with its grade, streamed page by page."""
+    columns = ", ".join(name for name, _ in GRADEBOOK_COLUMNS)
+    build = lambda: enrollments_query(columns, regular_only=True, **filters).order("studentid").order("enrollmentid")
+    yield from paginate(build)
+
+
+def iter_gwa_chunks(**filters):
+    """Wide GWA table: one row per student with per-semester, per-year and overall GWA, ordered by name."""
+    curriculum_df = get_curriculum_units()
+    # Students come sorted by name before chunking, so the whole file is in name order.
+    for student_ids in _chunked(iter_student_ids(regular_only=True, by_name=True, **filters)):
+        grades = get_grades_for_students(student_ids, curriculum_df)
+        if grades.empty:
+            continue
+
+        grades_by_student = dict(tuple(grades.groupby("studentid", sort=False)))
+        rows = []
+        for student_id in student_ids:
+            student_df = grades_by_student.get(student_id)
+            if student_df is None:
+                continue
+            summary = summarize_gwa(student_df)
+            row = {"studentid": student_id, "Name": student_df["studentname"].iloc[0]}
+            for key in GWA_KEYS:
+                row[key] = summary.get(key, "--")
+            rows.append(row)
+        yield rows
+
+
+def iter_transcript_chunks(student_id=None, **filters):
+    """Per-student transcripts: every enrollment of each student with units and the raw grade."""
+    curriculum_units = dict(get_curriculum_units().itertuples(index=False, name=None))
+    columns = "studentid, studentname, program, schoolyear, semester_term, yearlevel, subjectcode, subjectname, curriculumid, grade"
+
+    if student_id:
+        id_chunks = [[student_id]]
+    else:
+        id_chunks = _chunked(iter_student_ids(**filters))
+
+    for student_ids in id_chunks:
+        build = lambda: (
+            supabase.table("enrollments_view").select(columns)
+            .in_("studentid", student_ids)
+            .order("studentid").order("schoolyear").order("semester_term").order("enrollmentid")
+        )
+        for page in paginate(build):
+            for row in page:
+                row["units"] = curriculum_units.get(row.pop("curriculumid", None))
+            yield page
+
+
+EXPORTS = {
+    "gradebook": (GRADEBOOK_COLUMNS, iter_gradebook_chunks),
+    "gwa": (GWA_COLUMNS, iter_gwa_chunks),
+    "transcripts": (TRANSCRIPT_COLUMNS, iter_transcript_chunks),
+}
+
+
+# -------------------------
+# Chunked writers
+# -------------------------
+def _coerce(value, kind):
+    if kind == "float":
+        try:
+            return float(value) if value not in (None, "") else None
+        except (TypeError, ValueError):
+            return None
+    return None if value is None else str(value)
+
+
+def _write_csv(chunks, columns, fh):
+    text = io.TextIOWrapper(fh, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow([name for name, _ in columns])
+    count = 0
+    for rows in chunks:
+        writer.writerows([[row.get(name, "") for name, _ in columns] for row in rows])
+        count += len(rows)
+    text.flush()
+    text.detach()
+    return count
+
+
+def _write_xlsx(chunks, columns, fh):
+    import xlsxwriter
+
+    # constant_memory flushes each row to disk as soon as the next one starts.
+    workbook = xlsxwriter.Workbook(fh, {"constant_memory": True, "in_memory": False})
+    sheet = workbook.add_worksheet("Export")
+    sheet.write_row(0, 0, [name for name, _ in columns])
+    count = 0
+    for rows in chunks:
+        for row in rows:
+            count += 1
+            values = []
+            for name, kind in columns:
+                value = _coerce(row.get(name), kind)
+                if kind == "float" and value is None:
+                    value = row.get(name) or ""  # keep "--" markers readable
+                values.append(value)
+            sheet.write_row(count, 0, values)
+    workbook.close()
+    return count
+
+
+def _write_parquet(chunks, columns, fh):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.float64() if kind == "float" else pa.string()) for name, kind in columns])
+    count = 0
+    with pq.ParquetWriter(fh, schema) as writer:
+        for rows in chunks:
+            arrays = [
+                pa.array([_coerce(row.get(name), kind) for row in rows], type=schema.field(name).type)
+                for name, kind in columns
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    return count
+
+
+WRITERS = {"csv": _write_csv, "xlsx": _write_xlsx, "parquet": _write_parquet}
+
+
+def write_export(kind, fmt, fh, **filters):
+    """Stream an export of `kind` in format `fmt` (csv/xlsx/parquet) into a binary file handle."""
+    columns, iter_chunks = EXPORTS[kind]
+    return WRITERS[fmt](iter_chunks(**filters), columns, fh)
+
+
+def sweep_exports(max_age=EXPORT_TTL):
+    """Delete prepared exports older than `max_age` seconds (left by sessions that ended)."""
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def export_to_file(kind, format_label, **filters):
+    """Write an export to a temporary file in EXPORT_DIR and return (path, row_count, extension, mime)."""
+    extension, mime = EXPORT_FORMATS[format_label]
+    sweep_exports()
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=f"gms_{kind}_", suffix=f".{extension}", dir=EXPORT_DIR)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            count = write_export(kind, extension, fh, **filters)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, count, extension, mime
@@ -1,23 +1,26 @@
 from database_client import supabase
 import streamlit as st
 import pandas as pd
+from utils import cache
+from utils.paging import paginate
+from utils.routing import primary
 
 
-def get_student_grades(student_id):
-    """Fetch all enrollments + grades + subjects + units for the student."""
-    enrollments = supabase.table("enrollments_view").select(
-        "enrollmentid, studentid, studentname, program, yearlevel, semester_term, schoolyear, subjectname, curriculumid, grade"
-    ).eq("studentid", student_id).execute().data
+STUDENT_BATCH_SIZE = 200  # ids per `in_` filter, keeps the request URL short
+GRADE_COLUMNS = "enrollmentid, studentid, studentname, program, yearlevel, semester_term, schoolyear, subjectname, curriculumid, grade"
 
-    if not enrollments:
-        return pd.DataFrame()
 
-    enrollments_df = pd.DataFrame(enrollments)
-
-    # Fetch units for curriculum subjects
+def get_curriculum_units():
+    """Return a DataFrame of curriculumid -> units for all curriculum subjects."""
     curriculum = supabase.table("curriculum_subjects").select("id, units").execute().data
-    curriculum_df = pd.DataFrame(curriculum)
-    curriculum_df.rename(columns={"id": "curriculumid"}, inplace=True)
+    curriculum_df = pd.DataFrame(curriculum, columns=["id", "units"])
+    return curriculum_df.rename(columns={"id": "curriculumid"})
+
+
+def _merge_units(enrollments, curriculum_df=None):
+    enrollments_df = pd.DataFrame(enrollments)
+    if curriculum_df is None:
+        curriculum_df = get_curriculum_units()
 
     # Merge units into enrollments
     merged = enrollments_df.merge(curriculum_df, on="curriculumid", how="left")
@@ -27,6 +30,40 @@ def get_student_grades(student_id):
     return merged
 
 
+def get_student_grades(student_id):
+    """Fetch all enrollments + grades + subjects + units for the student."""
+    enrollments = supabase.table("enrollments_view").select(GRADE_COLUMNS).eq("studentid", student_id).execute().data
+
+    if not enrollments:
+        return pd.DataFrame()
+
+    return _merge_units(enrollments)
+
+
+def get_grades_for_students(student_ids, curriculum_df=None):
+    """
+    Fetch enrollments + grades + units for many students: one enrollments_view scan per
+    STUDENT_BATCH_SIZE students, paged so no batch is cut off at PostgREST's max-rows limit.
+    """
+
+    student_ids = list(student_ids)
+    if not student_ids:
+        return pd.DataFrame()
+
+    enrollments = []
+    with cache.keep_pages():
+        for start in range(0, len(student_ids), STUDENT_BATCH_SIZE):
+            batch = student_ids[start:start + STUDENT_BATCH_SIZE]
+            build = lambda: supabase.table("enrollments_view").select(GRADE_COLUMNS).in_("studentid", batch).order("enrollmentid")
+            for page in paginate(build):
+                enrollments += page
+
+    if not enrollments:
+        return pd.DataFrame()
+
+    return _merge_units(enrollments, curriculum_df)
+
+
 def calculate_gwa(df, yearlevel=None, semester_term=None):
     if yearlevel:
         df = df[df["yearlevel"] == yearlevel]
@@ -59,7 +96,11 @@ def calculate_gwa(df, yearlevel=None, semester_term=None):
 
 def get_student_gwa_summary(student_id):
     """Return a dict of per-year, per-semester, and overall GWA for the student."""
-    df = get_student_grades(student_id)
+    return summarize_gwa(get_student_grades(student_id))
+
+
+def summarize_gwa(df):
+    """Build the per-year, per-semester, and overall GWA dict from one student's grade rows."""
     if df.empty:
         return {}
 
@@ -98,7 +139,9 @@ def get_student_gwa_summary(student_id):
 
 
 def upsert_grade(enrollment_id, grade):
-    existing = supabase.table("grades").select("gradeid").eq("enrollmentid", enrollment_id).execute()
+    # A stale "no grade yet" would insert a second grade row.
+    with primary(), cache.bypass():
+        existing = supabase.table("grades").select("gradeid").eq("enrollmentid", enrollment_id).execute()
     if existing.data and len(existing.data) > 0:
         grade_id = existing.data[0]["gradeid"]
         return supabase.table("grades").update({"grade": grade}).eq("gradeid", grade_id).execute()
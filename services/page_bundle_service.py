@@ -0,0 +1,46 @@
+import logging
+
+from database_client import supabase
+from services.curriculum_service import get_all_curriculum_subjects
+from services.enrollment_service import get_all_semesters, get_all_students
+from services.program_service import get_all_programs
+
+logger = logging.getLogger(__name__)
+
+# page -> (Postgres function from sql/page_bundles.sql, {key: service function returning the same rows}).
+# Keys are table names; cache.READ_ONLY_RPCS tags each function with them.
+PAGE_BUNDLES = {
+    "enrollment": ("enrollment_page_bundle", {
+        "programs": get_all_programs,
+        "students": get_all_students,
+        "semesters": get_all_semesters,
+    }),
+    "semester_subject": ("semester_subjects_page_bundle", {
+        "semesters": get_all_semesters,
+        "curriculum_subjects": get_all_curriculum_subjects,
+    }),
+}
+
+# Functions the database does not have (sql/page_bundles.sql not applied yet).
+_missing = set()
+
+
+def get_page_bundle(page):
+    """
+    All reference data `page` opens with, fetched in one round trip:
+    {key: rows} with the same rows as the service function for each key.
+    Falls back to one query per key when the database has no bundle function.
+    """
+    function, loaders = PAGE_BUNDLES[page]
+    if function not in _missing:
+        try:
+            data = supabase.rpc(function, {}).execute().data or {}
+            return {key: data.get(key) or [] for key in loaders}
+        except Exception as e:
+            # PGRST202: PostgREST has no such function in its schema cache. Matched by code, not
+            # by postgrest's APIError class, which would pull postgrest into the page import.
+            if getattr(e, "code", None) != "PGRST202":
+                raise
+            logger.warning("%s is not installed (apply sql/page_bundles.sql); loading %s with one query per table", function, page)
+            _missing.add(function)
+    return {key: loader() or [] for key, loader in loaders.items()}
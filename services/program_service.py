@@ -1,4 +1,6 @@
 from database_client import supabase
+from utils import cache
+from utils.routing import primary
 
 
 def get_all_programs():
@@ -10,7 +12,8 @@ def get_all_programs():
 
 def add_program(program_name, description=""):
     # Optional: Check first if it exists
-    existing = supabase.table("programs").select("*").eq("program_name", program_name).execute()
+    with primary(), cache.bypass():
+        existing = supabase.table("programs").select("*").eq("program_name", program_name).execute()
     if existing.data:
         raise ValueError(f"Program '{program_name}' already exists.")
     
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from services.export_service import enrollments_query
+from utils.paging import paginate
+from services.grades_service import get_curriculum_units
+
+# Bump when the report layout changes so every cached PDF is re-rendered.
+REPORT_VERSION = 1
+REPORT_CACHE_DIR = os.environ.get("GMS_REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "gms_reports"))
+
+REPORT_COLUMNS = "enrollmentid, studentid, studentname, program, yearlevel, schoolyear, semester_term, subjectcode, subjectname, curriculumid, grade"
+
+
+def fetch_report_data(**filters):
+    """
+    Fetch every enrollment needed for the reports with one paginated enrollments_view scan
+    and group them per student. Returns {studentid: {"student": {...}, "rows": [...]}}.
+    """
+    curriculum_units = dict(get_curriculum_units().itertuples(index=False, name=None))
+    build = lambda: enrollments_query(REPORT_COLUMNS, **filters).order("studentid").order("enrollmentid")
+
+    students = {}
+    for page in paginate(build):
+        for row in page:
+            row["units"] = curriculum_units.get(row.pop("curriculumid", None))
+            entry = students.setdefault(row["studentid"], {
+                "student": {
+                    "studentid": row["studentid"],
+                    "studentname": row.get("studentname") or "",
+                    "program": row.get("program"),
+                },
+                "rows": [],
+            })
+            entry["rows"].append(row)
+    return students
+
+
+def report_hash(payload):
+    """Content hash of a student's grade rows; unchanged students map to the same cached PDF."""
+    rows = sorted(payload["rows"], key=lambda r: str(r.get("enrollmentid")))
+    content = json.dumps([REPORT_VERSION, payload["student"], rows], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _cache_path(digest, cache_dir):
+    return os.path.join(cache_dir, f"{digest}.pdf")
+
+
+def generate_reports(student_data, max_workers=None, cache_dir=REPORT_CACHE_DIR, progress_callback=None):
+    """
+    Render (or reuse cached) PDFs for every student in `student_data` using a process pool.
+
+    Returns {"paths": {studentid: pdf_path}, "rendered": n, "cached": n, "failed": [(studentid, error)]}.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+
+    paths = {}
+    to_render = {}
+    for student_id, payload in student_data.items():
+        path = _cache_path(report_hash(payload), cache_dir)
+        paths[student_id] = path
+        if not os.path.exists(path):
+            to_render[student_id] = payload
+
+    result = {"paths": paths, "rendered": 0, "cached": len(paths) - len(to_render), "failed": []}
+    total = len(paths)
+    if progress_callback:
+        progress_callback(result["cached"], total)
+
+    if to_render:
+        # matplotlib is only imported once there is something to render.
+        from utils.report_pdf import render_report_file
+
+        # spawn, not fork: forking the server would copy its threads' locks (Streamlit, the
+        # query pools) into the workers mid-use.
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            futures = {
+                executor.submit(render_report_file, payload, paths[student_id]): student_id
+                for student_id, payload in to_render.items()
+            }
+            for future in as_completed(futures):
+                student_id = futures[future]
+                try:
+                    future.result()
+                    result["rendered"] += 1
+                except Exception as e:
+                    result["failed"].append((student_id, str(e)))
+                    paths.pop(student_id, None)
+                if progress_callback:
+                    progress_callback(result["cached"] + result["rendered"] + len(result["failed"]), total)
+        except BaseException:
+            # A rerun raised from progress_callback: drop the reports nobody will download.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    return result
+
+
+def build_report_archive(paths, student_data):
+    """Zip the rendered PDFs (stored, not re-compressed) into a temporary file and return its path."""
+    fd, archive_path = tempfile.mkstemp(prefix="gms_reports_", suffix=".zip")
+    with os.fdopen(fd, "wb") as fh, zipfile.ZipFile(fh, "w", compression=zipfile.ZIP_STORED) as archive:
+        for student_id, path in paths.items():
+            name = student_data[student_id]["student"]["studentname"].replace("/", "-")
+            archive.write(path, arcname=f"{name} ({student_id}).pdf")
+    return archive_path
@@ -0,0 +1,196 @@
+import csv
+import io
+from datetime import date
+from database_client import supabase
+from services.program_service import get_all_programs
+from utils import cache
+from utils.routing import primary
+
+STUDENT_COLUMNS = [
+    "studentid", "firstname", "lastname", "middlename", "gender", "dateofbirth",
+    "emailaddress", "yearlevel", "program", "section", "enrollmentstatus",
+    "status", "remarks", "dl_applicable", "laude_applicable",
+]
+REQUIRED_COLUMNS = ["studentid", "firstname", "lastname", "yearlevel", "program"]
+
+YEAR_LEVELS = ["1st Year", "2nd Year", "3rd Year", "4th Year", "Onward"]
+GENDERS = ["Male", "Female", "Other"]
+ENROLLMENT_STATUSES = ["Enrolled", "Not Enrolled", "Graduated", "Dropped"]
+STATUSES = ["Regular", "Irregular", "Graduated"]
+BOOLEAN_VALUES = {"yes": True, "true": True, "1": True, "no": False, "false": False, "0": False}
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _open_text(file):
+    """Wrap an uploaded (binary) file so the CSV reader can stream it line by line."""
+    if isinstance(file, io.TextIOBase):
+        return file
+    return io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+
+def validate_roster_header(fieldnames):
+    header = [name.strip().lower() for name in (fieldnames or [])]
+    unknown = [name for name in header if name not in STUDENT_COLUMNS]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if unknown:
+        raise ValueError(f"Unknown column(s) in roster: {', '.join(unknown)}")
+    if missing:
+        raise ValueError(f"Missing required column(s) in roster: {', '.join(missing)}")
+    return header
+
+
+def validate_roster_row(row, program_names):
+    """Return (clean_row, None) for a valid roster row, or (None, reason) for a rejected one."""
+    if None in row:
+        # csv.DictReader files cells beyond the header under the None key.
+        return None, "More cells than header columns"
+
+    clean = {}
+    for col, value in row.items():
+        if isinstance(value, str):
+            value = value.strip()
+        clean[col] = value if value else None
+
+    for col in REQUIRED_COLUMNS:
+        if not clean.get(col):
+            return None, f"Missing {col}"
+
+    if clean["program"] not in program_names:
+        return None, f"Unknown program '{clean['program']}'"
+    if clean["yearlevel"] not in YEAR_LEVELS:
+        return None, f"Invalid yearlevel '{clean['yearlevel']}'"
+    if clean.get("gender") and clean["gender"] not in GENDERS:
+        return None, f"Invalid gender '{clean['gender']}'"
+    if clean.get("enrollmentstatus") and clean["enrollmentstatus"] not in ENROLLMENT_STATUSES:
+        return None, f"Invalid enrollmentstatus '{clean['enrollmentstatus']}'"
+    if clean.get("status") and clean["status"] not in STATUSES:
+        return None, f"Invalid status '{clean['status']}'"
+    if clean.get("emailaddress") and "@" not in clean["emailaddress"]:
+        return None, f"Invalid emailaddress '{clean['emailaddress']}'"
+
+    if clean.get("dateofbirth"):
+        try:
+            clean["dateofbirth"] = date.fromisoformat(clean["dateofbirth"]).isoformat()
+        except ValueError:
+            return None, f"Invalid dateofbirth '{clean['dateofbirth']}' (expected YYYY-MM-DD)"
+
+    for col in ["dl_applicable", "laude_applicable"]:
+        if clean.get(col) is not None:
+            flag = BOOLEAN_VALUES.get(clean[col].lower())
+            if flag is None:
+                return None, f"Invalid {col} '{clean[col]}' (expected Yes/No)"
+            clean[col] = flag
+
+    return clean, None
+
+
+def get_existing_student_ids(student_ids):
+    if not student_ids:
+        return set()
+    # Decides insert vs. reject, so it must not come from the cache or a lagging replica.
+    with primary(), cache.bypass():
+        response = supabase.table("students").select("studentid").in_("studentid", list(student_ids)).execute()
+    return {row["studentid"] for row in response.data or []}
+
+
+def import_student_roster(file, mode="insert", chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+    """
+    Stream a roster CSV into `students` in multi-row chunks.
+
+    mode="insert" rejects students that already exist, mode="upsert" updates them (blank
+    optional cells leave the stored value unchanged).
+    progress_callback(rows_processed, fraction_or_None) is called after every chunk.
+    Returns a summary dict with counts and the reject file as CSV text.
+    """
+    if mode not in ("insert", "upsert"):
+        raise ValueError("mode must be 'insert' or 'upsert'.")
+
+    program_names = {p["program_name"] for p in get_all_programs()}
+
+    raw = file
+    total_bytes = None if isinstance(raw, io.TextIOBase) else getattr(raw, "size", None)
+    reader = csv.DictReader(_open_text(file))
+    header = validate_roster_header(reader.fieldnames)
+    reader.fieldnames = header
+
+    rejects = io.StringIO()
+    reject_writer = csv.writer(rejects)
+    reject_writer.writerow(["line"] + header + ["error"])
+
+    summary = {"processed": 0, "inserted": 0, "updated": 0, "rejected": 0}
+    seen_ids = set()
+
+    def reject(line_no, row, reason):
+        reject_writer.writerow([line_no] + [row.get(col) or "" for col in header] + [reason])
+        summary["rejected"] += 1
+
+    def flush(chunk):
+        if not chunk:
+            return
+        ids = [row["studentid"] for _, row, _ in chunk]
+        existing = get_existing_student_ids(ids)
+
+        pending = []
+        for line_no, row, raw_row in chunk:
+            if mode == "insert" and row["studentid"] in existing:
+                reject(line_no, raw_row, "Student ID already exists")
+            else:
+                pending.append((line_no, row, raw_row))
+
+        if mode == "upsert":
+            # Blank optional cells keep the stored value instead of clearing it. A bulk request
+            # needs the same keys in every row, so rows are sent grouped by the cells they fill.
+            groups = {}
+            for line_no, row, raw_row in pending:
+                filled = {col: value for col, value in row.items() if value is not None}
+                groups.setdefault(tuple(filled), []).append((line_no, filled, raw_row))
+            batches = list(groups.values())
+        else:
+            batches = [pending] if pending else []
+
+        for batch in batches:
+            to_write = [row for _, row, _ in batch]
+            try:
+                if mode == "upsert":
+                    supabase.table("students").upsert(to_write, on_conflict="studentid").execute()
+                else:
+                    supabase.table("students").insert(to_write).execute()
+            except Exception as e:
+                for line_no, _, raw_row in batch:
+                    reject(line_no, raw_row, f"Database error: {str(e)}")
+            else:
+                updated = sum(1 for row in to_write if row["studentid"] in existing)
+                summary["updated"] += updated
+                summary["inserted"] += len(to_write) - updated
+
+        summary["processed"] += len(chunk)
+
+    chunk = []
+    for raw_row in reader:
+        line_no = reader.line_num
+        row, error = validate_roster_row(raw_row, program_names)
+        if row is None:
+            summary["processed"] += 1
+            reject(line_no, raw_row, error)
+            continue
+        if row["studentid"] in seen_ids:
+            summary["processed"] += 1
+            reject(line_no, raw_row, "Duplicate Student ID in file")
+            continue
+        seen_ids.add(row["studentid"])
+
+        chunk.append((line_no, row, raw_row))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+            if progress_callback:
+                fraction = raw.tell() / total_bytes if total_bytes else None
+                progress_callback(summary["processed"], fraction)
+
+    flush(chunk)
+    if progress_callback:
+        progress_callback(summary["processed"], 1.0)
+
+    summary["reject_csv"] = rejects.getvalue() if summary["rejected"] else ""
+    return summary
@@ -12,7 +12,14 @@ def update_student(student_id, updates):
 def get_student_by_id(student_id):
     return supabase.table('students').select('*').eq('StudentID', student_id).single().execute().data
 
+def changed_fields(original: dict, updated: dict):
+    """The entries of `updated` whose value differs from `original` (what a save has to send)."""
+    return {key: value for key, value in updated.items() if key not in original or original[key] != value}
+
 def update_student_info(student_id, data: dict):
+    """Update only the given columns; an empty change set makes no request."""
+    if not data:
+        return None
     return (
         supabase.table("students")
         .update(data)
@@ -1,4 +1,7 @@
 import streamlit as st
+import pandas as pd
+from utils import cancellation, profiler, query_metrics, resilience, singleflight
+from utils.auth import is_admin, logout
 
 
 def sidebar_navigation():
@@ -17,6 +20,9 @@ def sidebar_navigation():
         if st.button("Wide View", key="regular_wideview"):
             st.session_state.page = "wideview"
             st.rerun()
+        if st.button("Grade Reports", key="regular_reports"):
+            st.session_state.page = "reports"
+            st.rerun()
 
         # ---------------- Irregular ----------------
         st.markdown("---")
@@ -55,8 +61,140 @@ def sidebar_navigation():
         if st.button("Subject per Semester", key="tools_subject_semester"):
             st.session_state.page = "semester_subject"
             st.rerun()
+        if st.button("Background Jobs", key="tools_jobs"):
+            st.session_state.page = "jobs"
+            st.rerun()
         if st.button("Logout"):
-            del st.session_state["user"]
+            logout()
             st.rerun()
 
+        # ---------------- Performance ----------------
+        st.markdown("---")
+        st.toggle("⏱️ Performance", key="show_performance")
+        st.toggle("🧠 Memory", key="show_memory")
+        if st.toggle("🔬 Profile page", key="profile_enabled"):
+            busy = profiler.capture_busy()
+            if st.button("Capture next rerun", key="profile_capture", disabled=busy,
+                         help="Run the page once under cProfile, tracemalloc and a stack sampler"):
+                st.session_state["profile_capture_next"] = True
+                st.rerun()
+            if busy:
+                st.caption("⏳ Busy: another session is capturing a profile.")
+        return st.container()
+
+
+def profile_panel(container):
+    """Show this rerun's page/section timings and the last captured profile report."""
+    if not st.session_state.get("profile_enabled"):
+        return
+
+    with container:
+        st.markdown("**Page timings**")
+        timings = st.session_state.get("profile_timings", [])
+        if timings:
+            st.dataframe(pd.DataFrame(timings), hide_index=True)
+
+        if st.session_state.pop("profile_capture_busy", False):
+            st.warning("⏳ Busy: another session was capturing a profile, so this rerun was not captured. Try again in a moment.")
+
+        report = st.session_state.get("profile_report")
+        if report:
+            st.caption(f"Last capture: {report['page']}")
+            st.download_button("Summary report", report["summary"], file_name=f"profile_{report['page']}.txt", mime="text/plain", key="profile_summary")
+            st.download_button("Flame graph stacks", report["folded"], file_name=f"profile_{report['page']}.folded", mime="text/plain", key="profile_folded", help="Folded stacks for flamegraph.pl or speedscope")
+            st.download_button("cProfile data", report["prof"], file_name=f"profile_{report['page']}.prof", mime="application/octet-stream", key="profile_prof", help="Open with snakeviz or pstats")
+
+
+def memory_panel(container):
+    """Session-state sizes (this session's, or every session's in this process for admins), plus the shared cache."""
+    if not st.session_state.get("show_memory"):
+        return
+
+    from utils import memory, shared_cache
+
+    admin = is_admin(st.session_state.get("user"))
+    sessions = memory.session_report(all_sessions=admin)
+    shared = shared_cache.stats()
+    current = memory.key_sizes(st.session_state.to_dict())
+
+    with container:
+        col1, col2 = st.columns(2)
+        if admin:
+            col1.metric("Sessions", len(sessions))
+            col2.metric("Session state", f"{sum(row['bytes'] for row in sessions) / 1024:.0f} KB")
+        else:
+            col1.metric("Session state", f"{sum(size for _, size in current) / 1024:.0f} KB")
+            col2.metric("Keys", len(current))
+        col1.metric("Shared cache", f"{shared['bytes'] / 1024:.0f} KB")
+        col2.metric("Cap", f"{shared['max_bytes'] / 1024 / 1024:.0f} MB")
+        st.caption(f"Shared cache: {shared['entries']} entries, {shared['hits']} hits, {shared['misses']} misses, {shared['evictions']} evictions.")
+
+        st.markdown("**This session's largest keys**")
+        st.dataframe(pd.DataFrame(current[:15], columns=["key", "bytes"]), hide_index=True)
+        if admin:
+            if memory.listing_unsupported() is not None:
+                st.warning("Other sessions cannot be listed with this Streamlit version; only this session is shown.")
+            with st.expander("All sessions"):
+                st.dataframe(pd.DataFrame(
+                    [{"session": row["session"][:8], "keys": row["keys"], "KB": round(row["bytes"] / 1024, 1),
+                      "largest": ", ".join(key for key, _ in row["largest"][:3])} for row in sessions]
+                ), hide_index=True)
+        if shared["detail"]:
+            with st.expander("Shared cache entries"):
+                st.dataframe(pd.DataFrame(shared["detail"], columns=["key", "bytes", "sessions"]), hide_index=True)
+
+
+def performance_panel(container):
+    """Fill the sidebar container returned by sidebar_navigation() with this rerun's queries."""
+    if not st.session_state.get("show_performance"):
+        return
+
+    queries, dropped = query_metrics.current_rerun_queries()
+    totals = query_metrics.summarize(queries)
+
+    with container:
+        col1, col2 = st.columns(2)
+        col1.metric("Queries", totals["queries"] + dropped)
+        col2.metric("Query time", f"{totals['ms']:.0f} ms")
+        col1.metric("Rows", totals["rows"])
+        col2.metric("Response", f"{totals['bytes'] / 1024:.0f} KB")
+        if totals["cached"]:
+            st.caption(f"{totals['cached']} of {totals['queries']} queries served from cache.")
+        replica_reads = sum(1 for query in queries if query.get("target") == "replica" and not query["cached"])
+        if replica_reads:
+            st.caption(f"{replica_reads} reads went to the read replica.")
+        if totals["errors"]:
+            st.warning(f"{totals['errors']} queries failed.")
+        backend = resilience.stats()
+        if backend["breaker"] == "open":
+            st.warning("The database is not responding; reads are served from the last cached results.")
+        elif backend.get("retries") or backend.get("hedges"):
+            st.caption(f"Since startup: {backend.get('retries', 0)} retries, {backend.get('hedges', 0)} hedged reads "
+                       f"({backend.get('hedges_won', 0)} won).")
+        dropped_work = cancellation.stats()
+        if dropped_work["cancelled"] or dropped_work["abandoned"]:
+            st.caption(f"Since startup: {dropped_work['cancelled']} queries skipped and {dropped_work['abandoned']} "
+                       f"stopped before a retry by superseded reruns.")
+        coalesced = singleflight.stats()
+        if coalesced["followers"]:
+            st.caption(f"Since startup: {coalesced['followers']} reads shared another session's request "
+                       f"({coalesced['ratio']:.0%} coalesced).")
+        if dropped:
+            st.caption(f"{dropped} more queries were counted but not listed.")
+
+        if queries:
+            columns = ["table", "operation", "ms", "rows", "bytes", "cached", "target", "view", "caller", "error"]
+            st.markdown("**Slowest queries**")
+            st.dataframe(pd.DataFrame(query_metrics.slowest(queries), columns=columns).round({"ms": 1}), hide_index=True)
+            with st.expander("All queries this rerun"):
+                st.dataframe(pd.DataFrame(queries, columns=columns).round({"ms": 1}), hide_index=True)
+
+        st.download_button(
+            "Export metrics (Prometheus)",
+            data=query_metrics.prometheus_text(),
+            file_name="gms_metrics.prom",
+            mime="text/plain",
+            key="performance_export",
+        )
+
 
@@ -0,0 +1,37 @@
+-- Page data bundles: every reference dataset a page opens with, in one round trip.
+-- Called through supabase.rpc() by services/page_bundle_service.py, which falls back to one
+-- query per table while these functions are missing. Each key holds the same rows as
+-- `select * from <table>`.
+--
+-- Apply with the Supabase SQL editor or `psql -f sql/page_bundles.sql`.
+
+create or replace function public.enrollment_page_bundle()
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'programs', coalesce((select json_agg(p) from public.programs p), '[]'::json),
+        'students', coalesce((select json_agg(s) from public.students s), '[]'::json),
+        'semesters', coalesce((select json_agg(sem) from public.semesters sem), '[]'::json)
+    );
+$$;
+
+create or replace function public.semester_subjects_page_bundle()
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'semesters', coalesce((select json_agg(sem) from public.semesters sem), '[]'::json),
+        'curriculum_subjects', coalesce((select json_agg(cs) from public.curriculum_subjects cs), '[]'::json)
+    );
+$$;
+
+grant execute on function public.enrollment_page_bundle() to anon, authenticated, service_role;
+grant execute on function public.semester_subjects_page_bundle() to anon, authenticated, service_role;
+
+-- Make PostgREST pick up the new functions without a restart.
+notify pgrst, 'reload schema';
@@ -0,0 +1,175 @@
+"""
+Host-wide cache of materialized tables for multi-worker deployments.
+
+Several Streamlit processes on one host share snapshots through SHARED_DIR on the local
+filesystem:
+
+    <name>-<version>.arrow   the table as an uncompressed Arrow IPC file (memory-mapped)
+    <name>.json              manifest: current version, creation time, table stamps and
+                             the previous version's file
+    stamps/<table>           write stamp per base table, see utils/stamps.py
+
+A snapshot is valid while its recorded stamps match the current ones and it is younger than
+TTL. The first worker to find it stale takes <name>.lock, refetches and publishes a new file;
+the others wait briefly for the new manifest instead of refetching too. Readers memory-map
+the file, so the Arrow buffers live once in the OS page cache for all workers; each process
+keeps one pandas view per version (numeric columns without nulls stay zero-copy). A file is
+deleted one publish after it was replaced, so a worker that read the previous manifest can
+still map it; a reader that loses even that race rereads the manifest.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+
+from utils import cache, routing, stamps
+
+TTL = float(os.environ.get("GMS_SHARED_TTL", str(cache.CACHE_TTL)))
+LOCK_TIMEOUT = 30  # seconds before a lock left by a crashed worker is ignored
+WAIT_FOR_PEER = 10  # seconds to wait for another worker's refresh
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_frames = {}  # name -> (version, DataFrame)
+
+_path = stamps.path
+_write_atomic = stamps.write_atomic
+_stamps = stamps.current
+
+
+# -------------------------
+# Snapshots
+# -------------------------
+def _manifest(name):
+    try:
+        with open(_path(f"{name}.json"), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _is_fresh(manifest, tables):
+    return (
+        manifest is not None
+        and manifest["stamps"] == _stamps(tables)
+        and time.time() - manifest["created"] < TTL
+        and os.path.exists(_path(manifest["file"]))
+    )
+
+
+def _read(name, manifest):
+    import pyarrow as pa
+
+    with _lock:
+        current = _frames.get(name)
+        if current and current[0] == manifest["version"]:
+            return current[1]
+    source = pa.memory_map(_path(manifest["file"]))
+    frame = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+    with _lock:
+        _frames[name] = (manifest["version"], frame)
+    return frame
+
+
+def _publish(name, frame, table_stamps):
+    import pyarrow as pa
+
+    version = uuid.uuid4().hex[:12]
+    file_name = f"{name}-{version}.arrow"
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    tmp_path = _path(f"{file_name}.tmp")
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, _path(file_name))
+
+    previous = _manifest(name)
+    manifest = {
+        "version": version,
+        "file": file_name,
+        "created": time.time(),
+        "stamps": table_stamps,
+        "previous": previous["file"] if previous else None,
+    }
+    _write_atomic(_path(f"{name}.json"), json.dumps(manifest))
+    if previous and previous.get("previous"):
+        # Two generations back: workers still mapping it keep their mapping; the name just goes away.
+        try:
+            os.remove(_path(previous["previous"]))
+        except OSError:
+            pass
+    return manifest
+
+
+def _try_lock(name):
+    path = _path(f"{name}.lock")
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(path) > LOCK_TIMEOUT:
+                os.remove(path)
+                return _try_lock(name)
+        except OSError:
+            pass
+        return False
+    os.close(fd)
+    return True
+
+
+def _unlock(name):
+    try:
+        os.remove(_path(f"{name}.lock"))
+    except OSError:
+        pass
+
+
+def _snapshot(name, loader, tables):
+    """A fresh manifest for `name`, publishing one if needed; None if a peer holds the lock too long."""
+    manifest = _manifest(name)
+    if not _is_fresh(manifest, tables):
+        deadline = time.monotonic() + WAIT_FOR_PEER
+        while not _try_lock(name):
+            if time.monotonic() > deadline:
+                logger.warning("Shared snapshot %s is locked; loading it directly", name)
+                return None
+            time.sleep(0.05)
+            manifest = _manifest(name)
+            if _is_fresh(manifest, tables):
+                break
+        else:
+            try:
+                manifest = _manifest(name)
+                if not _is_fresh(manifest, tables):
+                    # Stamps are taken before loading: a write during the load leaves it stale.
+                    current = _stamps(tables)
+                    # After a write, a lagging read replica could still serve the old rows.
+                    written = manifest is not None and manifest["stamps"] != current
+                    with cache.bypass(), (routing.primary() if written else nullcontext()):
+                        manifest = _publish(name, loader(), current)
+            finally:
+                _unlock(name)
+    return manifest
+
+
+def get_frame(name, loader, tables):
+    """
+    The shared snapshot `name`, refreshed with loader() (returning a DataFrame) when one of
+    `tables` was written or TTL passed. Returns a shallow copy callers may add columns to.
+    """
+    if TTL <= 0:
+        return loader()
+    stamps.ensure_dir()
+
+    for _ in range(3):
+        manifest = _snapshot(name, loader, tables)
+        if manifest is None:
+            return loader()
+        try:
+            return _read(name, manifest).copy(deep=False)
+        except FileNotFoundError:
+            continue  # replaced and deleted since we read its manifest; look again
+    return loader()
@@ -1,29 +1,239 @@
+"""
+Login and session tokens.
+
+A successful login issues a signed, expiring token kept in the `gms_session` cookie (set
+from the page, since Streamlit cannot set response cookies), so a browser refresh or a new
+tab restores the user without re-running bcrypt. The token never appears in the URL:
+
+    <user id, base64url>.<expiry, unix seconds>.<token id>.<HMAC-SHA256>
+
+The HMAC covers the ID, the expiry, the token id and the user's stored password hash, so
+changing a password invalidates every token issued before. logout() revokes the token id for
+every worker on the host (SHARED_DIR/revoked) and clears the cookie. The user row behind a
+token is cached for USER_CACHE_TTL seconds, but only while nobody has written to `users`
+since (checked against the host-wide write stamp), so a password change takes effect at once.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
 import streamlit as st
+from database_client import verify_login, get_user, LoginThrottled
+from utils import stamps
+
+SESSION_TTL = int(os.environ.get("GMS_SESSION_TTL", str(12 * 3600)))
+USER_CACHE_TTL = 300
+TOKEN_COOKIE = "gms_session"
+LEGACY_TOKEN_PARAM = "session"  # tokens used to travel in the URL; dropped on sight
+
+logger = logging.getLogger(__name__)
+
+_user_cache = {}  # user id -> (expires_at, users stamp, user)
+_lock = threading.Lock()
+_fallback_secret = secrets.token_bytes(32)
+_warned_secret = False
+
+
+def _secret():
+    global _warned_secret
+    try:
+        secret = st.secrets["auth"].get("session_secret")
+    except (KeyError, FileNotFoundError):
+        secret = None
+    secret = secret or os.environ.get("GMS_SESSION_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    if not _warned_secret:
+        _warned_secret = True
+        logger.warning(
+            "No session_secret under [auth] in secrets.toml and no GMS_SESSION_SECRET: session tokens "
+            "are signed with a per-process random key, so they fail on other workers and after a restart."
+        )
+    return _fallback_secret
+
+
+def is_admin(user):
+    """True for user IDs listed under `admins` in [auth] (secrets.toml) or in GMS_ADMINS (comma-separated)."""
+    try:
+        admins = st.secrets["auth"].get("admins")
+    except (KeyError, FileNotFoundError):
+        admins = None
+    if admins is None:
+        admins = [admin.strip() for admin in os.environ.get("GMS_ADMINS", "").split(",") if admin.strip()]
+    return bool(user) and str(user["id"]) in {str(admin) for admin in admins}
+
+
+def _signature(user_id, expires, token_id, password_hash):
+    message = f"{user_id}\n{expires}\n{token_id}\n{password_hash}".encode("utf-8")
+    return hmac.new(_secret(), message, hashlib.sha256).hexdigest()
+
+
+def _encode(value):
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(value):
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("utf-8")
+
+
+def _cached_user(user_id):
+    now = time.monotonic()
+    users_stamp = stamps.read("users")
+    with _lock:
+        entry = _user_cache.get(user_id)
+        if entry and entry[0] > now and entry[1] == users_stamp:
+            return entry[2]
+    user = get_user(user_id)
+    if user:
+        with _lock:
+            _user_cache[user_id] = (now + USER_CACHE_TTL, users_stamp, user)
+    return user
+
+
+def forget_user(user_id):
+    """Drop the cached row for `user_id` (after its password changed, on logout)."""
+    with _lock:
+        _user_cache.pop(str(user_id), None)
+
+
+# -------------------------
+# Revocation
+# -------------------------
+def _revoked_path(token_id=""):
+    return stamps.path("revoked", token_id)
+
+
+def revoke(token):
+    """Make `token` invalid for every worker on this host until it would have expired anyway."""
+    parts = token.split(".") if token else []
+    if len(parts) != 4 or not parts[2].isalnum():
+        return
+    stamps.ensure_dir("revoked")
+    stamps.write_atomic(_revoked_path(parts[2]), json.dumps({"expires": parts[1]}))
+    _prune_revoked()
+
+
+def _is_revoked(token_id):
+    return os.path.exists(_revoked_path(token_id))
+
+
+def _prune_revoked():
+    now = time.time()
+    for name in os.listdir(_revoked_path()):
+        try:
+            with open(_revoked_path(name), encoding="utf-8") as fh:
+                expires = int(json.load(fh)["expires"])
+            if expires < now:
+                os.remove(_revoked_path(name))
+        except (OSError, ValueError, KeyError):
+            pass
+
+
+# -------------------------
+# Tokens
+# -------------------------
+def issue_token(user, ttl=SESSION_TTL):
+    expires = int(time.time()) + ttl
+    token_id = secrets.token_hex(16)
+    return f"{_encode(str(user['id']))}.{expires}.{token_id}.{_signature(user['id'], expires, token_id, user['password'])}"
+
+
+def validate_token(token):
+    """Return the user for a valid, unexpired, unrevoked token, else None."""
+    try:
+        encoded_id, expires, token_id, signature = token.split(".")
+        user_id = _decode(encoded_id)
+        expires = int(expires)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if expires < time.time() or not token_id.isalnum() or _is_revoked(token_id):
+        return None
+
+    user = _cached_user(user_id)
+    if not user or not hmac.compare_digest(signature, _signature(user["id"], expires, token_id, user["password"])):
+        return None
+    return user
+
+
+# -------------------------
+# Cookie
+# -------------------------
+def _write_cookie(value, max_age):
+    # Streamlit cannot set cookies on its responses; a component iframe (same origin) sets it
+    # on the page, and it is sent with the next connection (st.context.cookies).
+    import streamlit.components.v1 as components
+
+    cookie = json.dumps(f"{TOKEN_COOKIE}={value}; Max-Age={max_age}; Path=/; SameSite=Strict")
+    components.html(
+        f"<script>parent.document.cookie = {cookie} + (parent.location.protocol === 'https:' ? '; Secure' : '');</script>",
+        height=0,
+    )
+
+
+def _sync_cookie():
+    """Make the browser's cookie match this session's token (st.context.cookies is fixed per connection)."""
+    token = st.session_state.get("session_token")
+    if token != st.context.cookies.get(TOKEN_COOKIE):
+        # Written on every run until the next connection sends it, so a run cut short by
+        # st.rerun() or st.switch_page() cannot lose it.
+        _write_cookie(token or "", SESSION_TTL if token else 0)
+
+
+def _start_session(user):
+    token = issue_token(user)
+    st.session_state["user"] = user
+    st.session_state["session_token"] = token
+    st.session_state.pop("logged_out", None)
+    with _lock:
+        _user_cache[str(user["id"])] = (time.monotonic() + USER_CACHE_TTL, stamps.read("users"), user)
+
+
+def logout():
+    user = st.session_state.pop("user", None)
+    st.session_state["logged_out"] = True
+    revoke(st.session_state.pop("session_token", None) or st.context.cookies.get(TOKEN_COOKIE))
+    if user:
+        forget_user(user["id"])
+
 
 def require_login():
-    users = {"faculty": "secret123"}
-
-    if "logged_in" not in st.session_state:
-        st.session_state.logged_in = False
-
-    # 🔒 Hide sidebar and main menu before login
-    if not st.session_state.logged_in:
-        hide_sidebar = """
-            <style>
-                [data-testid="stSidebar"], header, footer, [data-testid="stToolbar"] {
-                    display: none !important;
-                }
-            </style>
-        """
-        st.markdown(hide_sidebar, unsafe_allow_html=True)
-
-        st.title("Faculty Login")
-        username = st.text_input("Username")
-        password = st.text_input("Password", type="password")
-        if st.button("Login"):
-            if username in users and users[username] == password:
-                st.session_state.logged_in = True
-                st.rerun()
-            else:
-                st.error("Invalid credentials")
-        st.stop()
+    """Return the logged-in user, restoring it from the session cookie if needed; otherwise show the login form and stop."""
+    if LEGACY_TOKEN_PARAM in st.query_params:
+        del st.query_params[LEGACY_TOKEN_PARAM]
+
+    if "user" not in st.session_state and "logged_out" not in st.session_state:
+        token = st.context.cookies.get(TOKEN_COOKIE)
+        user = validate_token(token) if token else None
+        if user:
+            st.session_state["user"] = user
+            st.session_state["session_token"] = token
+    _sync_cookie()
+    if "user" in st.session_state:
+        return st.session_state["user"]
+
+    st.title("🔐 Login")
+    user_id = st.text_input("ID")
+    password = st.text_input("Password", type="password")
+
+    if st.button("Login"):
+        try:
+            user = verify_login(user_id, password, st.context.ip_address)
+        except LoginThrottled as e:
+            st.error(str(e))
+            st.stop()
+        except TimeoutError:
+            st.error("The server is busy signing other users in. Please try again in a moment.")
+            st.stop()
+        if user:
+            _start_session(user)
+            st.rerun()
+        else:
+            st.error("Invalid ID or password.")
+
+    st.stop()
@@ -0,0 +1,229 @@
+"""
+Process-wide cache of read query results, installed as a query middleware.
+
+Reads are keyed by the full recorded query (table, columns, filters, ordering) and tagged
+with every table they depend on: the table itself, the base tables behind a view, and any
+embedded resources in the select. A write (insert/update/upsert/delete, or an RPC that is
+not registered as read-only) drops every entry tagged with the written table, so a page
+that saves and reruns always sees its own change. Writes also bump the table's host-wide
+stamp (utils/stamps.py): an entry is only served while the stamps it was stored with are
+current, so a write by another worker process on the host is seen on the next read. Entries
+expire after CACHE_TTL seconds to pick up writes made from other hosts.
+
+Reads that decide a write (does this row exist yet?) must not trust a cached answer; run
+them inside `with bypass():`.
+
+Rows are copied on the way in and out, so callers may mutate what they get back.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils import stamps
+
+CACHE_TTL = float(os.environ.get("GMS_CACHE_TTL", "60"))
+MAX_ENTRIES = int(os.environ.get("GMS_CACHE_MAX_ENTRIES", "256"))
+
+# Tables that must never be served from memory.
+UNCACHED_TABLES = {"users"}
+
+# Base tables behind each view.
+VIEW_DEPENDENCIES = {
+    "enrollments_view": {"enrollments", "students", "curriculum_subjects", "semesters", "grades"},
+}
+
+# RPCs that only read (cached like a select, tagged with these tables) ...
+READ_ONLY_RPCS = {
+    "enrollment_page_bundle": {"programs", "students", "semesters"},
+    "semester_subjects_page_bundle": {"semesters", "curriculum_subjects"},
+}
+# ... and the tables written by known RPCs. Any other RPC clears the whole cache.
+RPC_WRITES = {
+    "delete_enrollments_for_student_semester": {"enrollments"},
+}
+
+WRITE_OPERATIONS = ("insert", "upsert", "update", "delete")
+EMBEDDED_RESOURCE = re.compile(r"(\w+)\s*\(")
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> (expires_at, tags, data, count, stamps)
+_generations = {}  # table -> bumped on every write to it; ALL_TABLES is bumped by clear()
+ALL_TABLES = stamps.ALL_TABLES
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_listeners = []  # fn(tables), called after invalidate(); tables is None after clear()
+_local = threading.local()
+
+
+class CachedResponse:
+    """Stand-in for postgrest's APIResponse when a read is served from the cache."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _copy(data):
+    if isinstance(data, list):
+        return [dict(row) if isinstance(row, dict) else row for row in data]
+    if isinstance(data, dict):
+        # A single row, or a bundle of row lists returned by an RPC.
+        return {key: _copy(value) for key, value in data.items()}
+    return data
+
+
+def _key(request):
+    return repr((request.root, request.args, sorted(request.kwargs.items()), request.calls))
+
+
+def tables_read(request):
+    """Every table a read request depends on."""
+    if request.root == "rpc":
+        return set(READ_ONLY_RPCS.get(request.table, ()))
+    tables = {request.table}
+    tables |= VIEW_DEPENDENCIES.get(request.table, set())
+    for name, args, _ in request.calls:
+        if name == "select" and args:
+            tables |= set(EMBEDDED_RESOURCE.findall(str(args[0])))
+    for view in list(tables):
+        tables |= VIEW_DEPENDENCIES.get(view, set())
+    return tables
+
+
+def _is_paginated(request):
+    return any(name == "range" for name, _, _ in request.calls)
+
+
+def is_read(request):
+    if request.root == "rpc":
+        return request.table in READ_ONLY_RPCS
+    return request.operation not in WRITE_OPERATIONS
+
+
+def invalidate(*tables):
+    """Drop every cached read that depends on one of `tables`."""
+    tables = set(tables)
+    with _lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+        stale = [key for key, entry in _entries.items() if entry[1] & tables]
+        for key in stale:
+            del _entries[key]
+        _stats["invalidations"] += len(stale)
+    stamps.bump(tables)
+    for listener in _listeners:
+        listener(tables)
+
+
+def clear():
+    """Drop every cached read (used after RPCs with unknown side effects)."""
+    with _lock:
+        _generations[ALL_TABLES] = _generations.get(ALL_TABLES, 0) + 1
+        _stats["invalidations"] += len(_entries)
+        _entries.clear()
+    stamps.bump()
+    for listener in _listeners:
+        listener(None)
+
+
+@contextmanager
+def bypass():
+    """Reads in this block go to the backend and are not stored (for callers with their own cache)."""
+    _local.bypass = getattr(_local, "bypass", 0) + 1
+    try:
+        yield
+    finally:
+        _local.bypass -= 1
+
+
+@contextmanager
+def keep_pages():
+    """Cache paginated reads in this block too (small, repeated page sets such as grade batches)."""
+    _local.keep_pages = getattr(_local, "keep_pages", 0) + 1
+    try:
+        yield
+    finally:
+        _local.keep_pages -= 1
+
+
+def add_invalidation_listener(fn):
+    """Have fn(tables) called whenever cached data for `tables` (None = everything) goes stale."""
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+
+def stale(request):
+    """The last stored result for a read even if expired (None if never cached or invalidated)."""
+    with _lock:
+        entry = _entries.get(_key(request))
+    return CachedResponse(_copy(entry[2]), entry[3]) if entry else None
+
+
+def version_key(request):
+    """Identifies a read together with the current write generation of every table it reads."""
+    tags = tables_read(request)
+    with _lock:
+        return _key(request), _generation(tags)
+
+
+def clone(response):
+    """A CachedResponse with its own copy of `response`'s rows."""
+    return CachedResponse(_copy(response.data), getattr(response, "count", None))
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_entries))
+
+
+def _generation(tags):
+    return tuple(sorted((table, _generations.get(table, 0)) for table in tags | {ALL_TABLES}))
+
+
+def cache_queries(request, call_next):
+    """Query middleware: serve repeated reads from memory and invalidate on writes."""
+    if not is_read(request):
+        try:
+            return call_next(request)
+        finally:
+            if request.root == "rpc" and request.table not in RPC_WRITES:
+                clear()
+            else:
+                invalidate(*(RPC_WRITES.get(request.table) or {request.table}))
+
+    if request.table in UNCACHED_TABLES:
+        # Never stored, but writes to them still bump their stamps (see utils/auth.py).
+        return call_next(request)
+
+    # Paginated scans (exports, reports) are streamed on purpose; keeping them would defeat that.
+    paged = _is_paginated(request) and not getattr(_local, "keep_pages", 0)
+    if CACHE_TTL <= 0 or paged or getattr(_local, "bypass", 0):
+        return call_next(request)
+
+    key = _key(request)
+    now = time.monotonic()
+    tags = tables_read(request)
+    # Taken before the read: a write by another process during it leaves the entry stale.
+    current = stamps.current(tags)
+    with _lock:
+        entry = _entries.get(key)
+        if entry and entry[0] > now and entry[4] == current:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            request.cache_hit = True
+            return CachedResponse(_copy(entry[2]), entry[3])
+        _stats["misses"] += 1
+        generation = _generation(tags)
+
+    response = call_next(request)
+
+    with _lock:
+        # Skip the store if a write to one of the tables landed while this read was running.
+        if _generation(tags) == generation:
+            _entries[key] = (now + CACHE_TTL, tags, _copy(response.data), getattr(response, "count", None), current)
+            _entries.move_to_end(key)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return response
@@ -0,0 +1,130 @@
+"""
+Ties Supabase requests issued by a page to its script run (query middleware).
+
+When a widget changes while a page is still loading, Streamlit only acts on the rerun at the
+next st.* call; until then the old run keeps issuing queries whose results are thrown away.
+For reads issued from a script run:
+
+* a request about to be sent by a superseded run is not sent; the run stops right there, as
+  it would at an st.* call, so loops of per-row queries end early;
+* a request that was already sent runs inline on the script thread, and the run stops at its
+  next retry, hedge or single-flight wait instead (request.stop_if_superseded()), so no
+  shared pool can run out of threads and hold other sessions' reads back.
+
+Writes, and requests from threads without a script run (jobs, prefetch), pass through
+untouched: a write is never abandoned halfway through a save.
+stats() counts both cases.
+
+Detecting a pending rerun relies on Streamlit internals (ScriptRequests state, pinned to the
+Streamlit version in requirements.txt). If they are missing or behave differently, a warning
+is logged once and requests simply run to completion, as they would without this middleware.
+"""
+import logging
+import threading
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils import cache, query_metrics
+
+try:
+    from streamlit.runtime.scriptrunner_utils.exceptions import RerunException, StopException
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType, _fragment_run_should_not_preempt_script
+except ImportError as e:
+    _unsupported = e
+else:
+    _unsupported = None
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {"cancelled": 0, "abandoned": 0}
+_warned = False
+
+
+def _disable(error):
+    """Turn cancellation off for this process after Streamlit's internals did not match."""
+    global _unsupported, _warned
+    _unsupported = error
+    if not _warned:
+        _warned = True
+        logger.warning("Query cancellation disabled, unsupported Streamlit internals: %r", error)
+
+
+def _script_requests():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return getattr(ctx, "script_requests", None) if ctx else None
+
+
+def is_superseded(requests):
+    """True if the script run owning `requests` has a pending stop or a rerun that preempts it."""
+    try:
+        state = requests._state
+        if state == ScriptRequestType.STOP:
+            return True
+        if state == ScriptRequestType.RERUN:
+            data = requests._rerun_data
+            return not _fragment_run_should_not_preempt_script(data.fragment_id_queue, data.is_fragment_scoped_rerun)
+        return False
+    except Exception as e:
+        _disable(e)
+        return False
+
+
+def _pending_stop(requests):
+    """
+    The exception that ends a superseded script run the way Streamlit does at a yield point,
+    or None if the run is not superseded (or cannot be stopped).
+    """
+    if not is_superseded(requests):
+        return None
+    try:
+        pending = requests.on_scriptrunner_yield()
+        if pending is None:
+            return None
+        if pending.type == ScriptRequestType.RERUN:
+            return RerunException(pending.rerun_data)
+        return StopException()
+    except Exception as e:
+        _disable(e)
+        return None
+
+
+def _count(key):
+    with _lock:
+        _stats[key] += 1
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
+
+
+def _stop(request, requests, stat):
+    stop = _pending_stop(requests) if _unsupported is None else None
+    if stop is not None:
+        request.cancelled = True
+        _count(stat)
+        raise stop
+
+
+def cancel_superseded(request, call_next):
+    """Query middleware: drop reads whose script run was superseded by a rerun or stop."""
+    requests = _script_requests() if _unsupported is None and cache.is_read(request) else None
+    if requests is None:
+        return call_next(request)
+
+    _stop(request, requests, "cancelled")
+    request.stop_if_superseded = lambda: _stop(request, requests, "abandoned")
+    return call_next(request)
+
+
+def _prometheus_lines():
+    current = stats()
+    return [
+        "# HELP gms_cancelled_queries_total Queries dropped because the script run that issued them was superseded.",
+        "# TYPE gms_cancelled_queries_total counter",
+        f'gms_cancelled_queries_total{{stage="before_send"}} {current["cancelled"]}',
+        f'gms_cancelled_queries_total{{stage="retry"}} {current["abandoned"]}',
+    ]
+
+
+query_metrics.add_collector(_prometheus_lines)
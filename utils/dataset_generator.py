@@ -0,0 +1,348 @@
+"""
+Seeded synthetic school generator for load and performance testing.
+
+    python -m utils.dataset_generator --students 100000 --seed 7 --out data/
+    python -m utils.dataset_generator --students 5000 --supabase
+
+Rows are produced table by table in foreign-key order and in bounded chunks,
+so even 100k students (millions of enrollments) never sit in memory at once.
+The same seed and options always produce the same dataset.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import uuid
+from datetime import date
+
+YEAR_LEVELS = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
+TERMS = ["1st Semester", "2nd Semester"]
+DEFAULT_PROGRAMS = ["BSCS", "BSIT", "BSED-English", "BSED-Math"]
+NUMERIC_GRADES = ["1", "1.25", "1.5", "1.75", "2", "2.25", "2.5", "2.75", "3"]
+NUMERIC_WEIGHTS = [4, 8, 12, 15, 16, 14, 12, 10, 9]
+
+TABLE_ORDER = ["programs", "curriculum_subjects", "semesters", "semester_subjects", "students", "enrollments", "grades"]
+
+# Serial keys the database assigns on insert, and the columns referring to them. The generated
+# ids only tie the dataset together; write_to_supabase() lets the database assign its own.
+SERIAL_KEYS = {
+    "programs": "programid",
+    "curriculum_subjects": "id",
+    "semesters": "semesterid",
+    "enrollments": "enrollmentid",
+    "grades": "gradeid",
+}
+REFERENCES = {
+    "semester_subjects": {"semester_id": "semesters", "curriculum_subject_id": "curriculum_subjects"},
+    "enrollments": {"curriculumid": "curriculum_subjects", "semesterid": "semesters"},
+    "grades": {"enrollmentid": "enrollments"},
+}
+
+SUBJECT_TOPICS = [
+    "Mathematics", "Communication", "Ethics", "History", "Science", "Programming",
+    "Statistics", "Research", "Literature", "Physical Education", "Seminar", "Laboratory",
+]
+
+
+def _faker(seed):
+    from faker import Faker
+
+    faker = Faker()
+    faker.seed_instance(seed)
+    return faker
+
+
+def _pick_grade(rng, inc_rate, dropped_rate, failed_rate):
+    roll = rng.random()
+    if roll < inc_rate:
+        return "INC"
+    if roll < inc_rate + dropped_rate:
+        return "Dropped"
+    if roll < inc_rate + dropped_rate + failed_rate:
+        return rng.choice(["5.0", "FAILED"])
+    return rng.choices(NUMERIC_GRADES, weights=NUMERIC_WEIGHTS)[0]
+
+
+def iter_dataset(
+    students=1000,
+    seed=42,
+    programs=None,
+    school_years=4,
+    start_year=2021,
+    subjects_per_term=7,
+    chunk_size=1000,
+    inc_rate=0.03,
+    dropped_rate=0.02,
+    failed_rate=0.02,
+    attrition_rate=0.04,
+    ungraded_latest_rate=0.3,
+):
+    """Yield (table_name, rows) chunks for a complete synthetic school in foreign-key order."""
+    rng = random.Random(seed)
+    faker = _faker(seed)
+    programs = list(programs or DEFAULT_PROGRAMS)
+
+    # -------------------------
+    # Programs + 4-year curricula
+    # -------------------------
+    yield "programs", [
+        {"programid": i + 1, "program_name": name, "description": f"Synthetic program {name}"}
+        for i, name in enumerate(programs)
+    ]
+
+    curriculum = {}
+    curriculum_rows = []
+    subject_id = 0
+    for program in programs:
+        prefix = program.split("-")[-1][:4].upper()
+        for year_index, yearlevel in enumerate(YEAR_LEVELS):
+            for term_index, term in enumerate(TERMS):
+                subjects = []
+                for n in range(subjects_per_term):
+                    subject_id += 1
+                    topic = SUBJECT_TOPICS[(subject_id + n) % len(SUBJECT_TOPICS)]
+                    row = {
+                        "id": subject_id,
+                        "program": program,
+                        "yearlevel": yearlevel,
+                        "term": term,
+                        "code": f"{prefix}{year_index + 1}{term_index + 1}{n + 1:02d}",
+                        "name": f"{topic} {year_index + 1}{term_index + 1}{n + 1:02d}",
+                        "units": rng.choice([2, 3, 3, 3, 4, 5]),
+                    }
+                    subjects.append(row)
+                    curriculum_rows.append(row)
+                curriculum[(program, yearlevel, term)] = subjects
+    yield "curriculum_subjects", curriculum_rows
+
+    # -------------------------
+    # Semesters (with Summer) + offerings
+    # -------------------------
+    semesters = {}
+    semester_rows = []
+    for y in range(school_years):
+        sy_start = start_year + y
+        schoolyear = f"{sy_start}-{sy_start + 1}"
+        spans = {
+            "1st Semester": (date(sy_start, 8, 1), date(sy_start, 12, 15)),
+            "2nd Semester": (date(sy_start + 1, 1, 8), date(sy_start + 1, 5, 20)),
+            "Summer": (date(sy_start + 1, 6, 1), date(sy_start + 1, 7, 15)),
+        }
+        for term, (start, end) in spans.items():
+            semesterid = len(semester_rows) + 1
+            semester_rows.append({
+                "semesterid": semesterid,
+                "schoolyear": schoolyear,
+                "term": term,
+                "startdate": start.isoformat(),
+                "enddate": end.isoformat(),
+            })
+            semesters[(y, term)] = semester_rows[-1]
+    yield "semesters", semester_rows
+
+    offering_rows = []
+    for (y, term), semester in semesters.items():
+        if term not in TERMS:
+            continue
+        for (program, yearlevel, sub_term), subjects in curriculum.items():
+            if sub_term != term:
+                continue
+            for subject in subjects:
+                offering_rows.append({
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "semester_id": semester["semesterid"],
+                    "curriculum_subject_id": subject["id"],
+                })
+    yield "semester_subjects", offering_rows
+
+    # -------------------------
+    # Students, enrollments and grades (streamed per chunk of students)
+    # -------------------------
+    enrollment_id = 0
+    grade_id = 0
+    latest_year = school_years - 1
+    buffers = {"students": [], "enrollments": [], "grades": []}
+
+    def drain():
+        for table in ["students", "enrollments", "grades"]:
+            rows = buffers[table]
+            while rows:
+                yield table, rows[:chunk_size]
+                del rows[:chunk_size]
+
+    for n in range(students):
+        program = programs[n % len(programs)]
+        # Cohorts admitted up to 3 years before the first generated school year.
+        admit_year = rng.randint(-3, latest_year)
+        irregular = rng.random() < 0.08
+        gender = rng.choice(["Male", "Female"])
+        firstname = faker.first_name_male() if gender == "Male" else faker.first_name_female()
+        lastname = faker.last_name()
+        studentid = f"{start_year + admit_year}-{n + 1:06d}"
+
+        yearlevel = None
+        enrollmentstatus = "Not Enrolled"
+        for y in range(max(admit_year, 0), school_years):
+            year_index = y - admit_year
+            if year_index >= len(YEAR_LEVELS):
+                enrollmentstatus = "Graduated"
+                yearlevel = "Graduated"
+                break
+            if rng.random() < attrition_rate:
+                enrollmentstatus = "Dropped"
+                break
+
+            yearlevel = YEAR_LEVELS[year_index]
+            enrollmentstatus = "Enrolled"
+            for term in TERMS:
+                semester = semesters[(y, term)]
+                is_latest = y == latest_year and term == TERMS[-1]
+                for subject in curriculum[(program, yearlevel, term)]:
+                    enrollment_id += 1
+                    buffers["enrollments"].append({
+                        "enrollmentid": enrollment_id,
+                        "studentid": studentid,
+                        "curriculumid": subject["id"],
+                        "semesterid": semester["semesterid"],
+                        "enrollmentdate": semester["startdate"],
+                        "enrollmentstatus": "Enrolled - Irregular" if irregular else "Enrolled - Regular",
+                        "remarks": "Irregular" if irregular else "Regular",
+                    })
+                    if is_latest and rng.random() < ungraded_latest_rate:
+                        continue
+                    grade_id += 1
+                    buffers["grades"].append({
+                        "gradeid": grade_id,
+                        "enrollmentid": enrollment_id,
+                        "grade": _pick_grade(rng, inc_rate, dropped_rate, failed_rate),
+                    })
+
+        if yearlevel is None:
+            yearlevel = YEAR_LEVELS[0]  # dropped before finishing their first year
+
+        buffers["students"].append({
+            "studentid": studentid,
+            "firstname": firstname,
+            "lastname": lastname,
+            "middlename": faker.last_name(),
+            "gender": gender,
+            "dateofbirth": date(start_year + admit_year - rng.randint(17, 20), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+            "emailaddress": f"{firstname}.{lastname}.{n + 1}@example.edu".lower(),
+            "yearlevel": yearlevel,
+            "program": program,
+            "section": rng.choice("ABCD"),
+            "enrollmentstatus": enrollmentstatus,
+            "status": "Irregular" if irregular else "Regular",
+            "remarks": None,
+            "dl_applicable": rng.random() < 0.2,
+            "laude_applicable": rng.random() < 0.1,
+        })
+
+        # Students must be flushed before the enrollments that reference them.
+        if len(buffers["students"]) >= chunk_size or len(buffers["enrollments"]) >= chunk_size * 10:
+            yield from drain()
+
+    yield from drain()
+
+
+# -------------------------
+# Writers
+# -------------------------
+def write_to_files(chunks, out_dir, fmt="csv"):
+    """Append every chunk to <out_dir>/<table>.<fmt> (csv or jsonl). Returns row counts per table."""
+    os.makedirs(out_dir, exist_ok=True)
+    handles = {}
+    writers = {}
+    counts = {}
+    try:
+        for table, rows in chunks:
+            if not rows:
+                continue
+            if table not in handles:
+                handles[table] = open(os.path.join(out_dir, f"{table}.{fmt}"), "w", newline="", encoding="utf-8")
+                if fmt == "csv":
+                    writers[table] = csv.DictWriter(handles[table], fieldnames=list(rows[0].keys()))
+                    writers[table].writeheader()
+            if fmt == "csv":
+                writers[table].writerows(rows)
+            else:
+                handles[table].writelines(json.dumps(row) + "\n" for row in rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+    finally:
+        for fh in handles.values():
+            fh.close()
+    return counts
+
+
+def write_to_supabase(chunks, chunk_size=1000, client=None):
+    """
+    Insert every chunk into Supabase with multi-row inserts of at most `chunk_size` rows.
+
+    Serial keys are left out so the database's sequences assign them (and later inserts by the
+    app do not collide with generated rows); references are rewritten to the ids returned by
+    the inserts.
+    """
+    if client is None:
+        from database_client import supabase as client
+
+    referenced = {target for columns in REFERENCES.values() for target in columns.values()}
+    assigned = {table: {} for table in referenced}  # table -> {generated id: database id}
+    counts = {}
+    for table, rows in chunks:
+        if table == "students":
+            # Grades only refer to enrollments of the same student chunk; drop the older ids.
+            assigned["enrollments"].clear()
+        key = SERIAL_KEYS.get(table)
+        references = REFERENCES.get(table, {})
+        for start in range(0, len(rows), chunk_size):
+            batch = rows[start:start + chunk_size]
+            payload = [
+                {
+                    column: assigned[references[column]][value] if column in references else value
+                    for column, value in row.items() if column != key
+                }
+                for row in batch
+            ]
+            inserted = client.table(table).insert(payload).execute().data
+            if table in assigned:
+                assigned[table].update(zip((row[key] for row in batch), (row[key] for row in inserted)))
+        counts[table] = counts.get(table, 0) + len(rows)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic school dataset.")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--school-years", type=int, default=4)
+    parser.add_argument("--start-year", type=int, default=2021)
+    parser.add_argument("--subjects-per-term", type=int, default=7)
+    parser.add_argument("--programs", nargs="+", default=DEFAULT_PROGRAMS)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="Directory to write one file per table")
+    target.add_argument("--supabase", action="store_true", help="Insert into the configured Supabase project")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    args = parser.parse_args(argv)
+
+    chunks = iter_dataset(
+        students=args.students,
+        seed=args.seed,
+        programs=args.programs,
+        school_years=args.school_years,
+        start_year=args.start_year,
+        subjects_per_term=args.subjects_per_term,
+        chunk_size=args.chunk_size,
+    )
+    if args.supabase:
+        counts = write_to_supabase(chunks, chunk_size=args.chunk_size)
+    else:
+        counts = write_to_files(chunks, args.out, fmt=args.format)
+
+    for table in TABLE_ORDER:
+        print(f"{table}: {counts.get(table, 0)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import streamlit as st
+from services.export_service import EXPORT_FORMATS, export_to_file
+
+
+def export_buttons(kind, file_stem, key, **filters):
+    """
+    Format picker + "Prepare" button that streams an export to disk, then offers it for download.
+    The file is replaced by the session's next export and swept after EXPORT_TTL (export_service).
+    """
+    state_key = f"export_{key}"
+
+    col1, col2 = st.columns([2, 1])
+    format_label = col1.selectbox("Export Format", list(EXPORT_FORMATS.keys()), key=f"{state_key}_format")
+
+    if col2.button("📤 Prepare Export", key=f"{state_key}_prepare"):
+        previous = st.session_state.pop(state_key, None)
+        if previous and os.path.exists(previous["path"]):
+            os.remove(previous["path"])
+
+        with st.spinner("Exporting..."):
+            path, count, extension, mime = export_to_file(kind, format_label, **filters)
+        st.session_state[state_key] = {
+            "path": path,
+            "count": count,
+            "file_name": f"{file_stem}.{extension}",
+            "mime": mime,
+        }
+
+    prepared = st.session_state.get(state_key)
+    if prepared and os.path.exists(prepared["path"]):
+        with open(prepared["path"], "rb") as fh:
+            st.download_button(
+                f"⬇️ Download {prepared['file_name']} ({prepared['count']} rows)",
+                data=fh,
+                file_name=prepared["file_name"],
+                mime=prepared["mime"],
+                key=f"{state_key}_download"
+            )
@@ -0,0 +1,239 @@
+"""
+Background jobs for long batch operations.
+
+A job is a list of work items (for example batches of student IDs) processed one at a time
+by the handler registered for its kind, on a worker pool shared by the whole server process.
+Job state (items, progress, accumulated results) is written to JOB_DIR after every item, so
+the job survives reruns, page changes and browser disconnects, and a job that was running
+when the process stopped resumes from its last finished item on the next start. A job that
+failed or was cancelled can be resumed the same way with resume_job(). cancel_job() records
+the request in the job file, so it reaches the worker whichever server process runs the job.
+
+Every resumption first claims the job with an exclusively created claim file, so when several
+server processes share JOB_DIR only one of them picks an interrupted job up.
+
+Handlers must be idempotent per item: an item interrupted halfway is run again on resume.
+"""
+import importlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_DIR = os.environ.get("GMS_JOB_DIR", os.path.join(tempfile.gettempdir(), "gms_jobs"))
+JOB_WORKERS = int(os.environ.get("GMS_JOB_WORKERS", "2"))
+KEEP_FINISHED = 50
+ITEM_SIZE = 100  # rows per job item; progress is checkpointed after each item
+
+# kind -> "module:function"; handler(params, item) -> {"succeeded": [...], "skipped": [...], "failed": [...]}
+JOB_KINDS = {
+    "migrate_students": "services.enrollment_service:run_migration_batch",
+    "graduate_students": "services.enrollment_service:run_graduation_batch",
+}
+
+ACTIVE = ("queued", "running")
+RESUMABLE = ("failed", "cancelled")
+RESULT_KEYS = ("succeeded", "skipped", "failed")
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _path(job_id):
+    return os.path.join(JOB_DIR, f"{job_id}.json")
+
+
+def _claim_path(job_id, generation):
+    return os.path.join(JOB_DIR, f"{job_id}.{generation}.claim")
+
+
+def _json_default(value):
+    # numpy scalars (IDs taken out of a DataFrame) -> plain Python values
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _save(job):
+    job["updated"] = time.time()
+    tmp_path = f"{_path(job['id'])}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(job, fh, default=_json_default)
+    os.replace(tmp_path, _path(job["id"]))
+
+
+def load_job(job_id):
+    try:
+        with open(_path(job_id), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def list_jobs():
+    """All known jobs, newest first."""
+    if not os.path.isdir(JOB_DIR):
+        return []
+    jobs = [load_job(name[:-len(".json")]) for name in os.listdir(JOB_DIR) if name.endswith(".json")]
+    return sorted((job for job in jobs if job), key=lambda job: job["created"], reverse=True)
+
+
+def _cancel_requested(job_id):
+    job = load_job(job_id)
+    return bool(job and job.get("cancel_requested"))
+
+
+def _handler(kind):
+    module, function = JOB_KINDS[kind].split(":")
+    return getattr(importlib.import_module(module), function)
+
+
+def _run(job_id):
+    job = load_job(job_id)
+    if job is None or job["status"] not in ACTIVE:
+        return  # cancelled while queued
+
+    handler = _handler(job["kind"])
+    job["status"] = "running"
+    job["pid"] = os.getpid()
+    _save(job)
+
+    try:
+        while job["done"] < len(job["items"]):
+            if _cancel_requested(job_id):
+                job["cancel_requested"] = True
+                job["status"] = "cancelled"
+                break
+            outcome = handler(job["params"], job["items"][job["done"]]) or {}
+            for key in RESULT_KEYS:
+                job["results"][key].extend(outcome.get(key, []))
+            job["done"] += 1
+            job["cancel_requested"] = _cancel_requested(job_id)  # keep a request made during the item
+            _save(job)  # checkpoint: a restart resumes from the next item
+        else:
+            job["status"] = "done"
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        _save(job)
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+            _resume_interrupted()
+        return _executor
+
+
+def _pid_alive(pid):
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _claim(job):
+    """
+    Take over `job` for this process and requeue it. The claim file for the next resumption
+    is created exclusively, so of several processes resuming the same job only one wins.
+    """
+    generation = job.get("resumed", 0) + 1
+    try:
+        os.close(os.open(_claim_path(job["id"], generation), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    try:
+        os.remove(_claim_path(job["id"], generation - 1))
+    except FileNotFoundError:
+        pass
+    job.update(status="queued", resumed=generation, pid=os.getpid(), error=None, cancel_requested=False)
+    _save(job)
+    return True
+
+
+def _resume_interrupted():
+    """Requeue jobs left queued/running by a previous server process (called once per process)."""
+    for job in list_jobs():
+        if job["status"] in ACTIVE and not _pid_alive(job.get("pid")) and _claim(job):
+            _executor.submit(_run, job["id"])
+
+
+def resume_job(job_id):
+    """Run a failed or cancelled job again from its last finished item. Returns True if requeued."""
+    job = load_job(job_id)
+    if job is None or job["status"] not in RESUMABLE or job["done"] >= len(job["items"]):
+        return False
+    executor = _get_executor()
+    if not _claim(job):
+        return False
+    executor.submit(_run, job_id)
+    return True
+
+
+def submit_job(kind, items, params=None, label=None):
+    """Persist a new job and queue it on the worker pool. Returns the job id."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}'.")
+    os.makedirs(JOB_DIR, exist_ok=True)
+    executor = _get_executor()
+
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "kind": kind,
+        "label": label or kind,
+        "params": params or {},
+        "items": list(items),
+        "done": 0,
+        "status": "queued",
+        "results": {key: [] for key in RESULT_KEYS},
+        "error": None,
+        "created": time.time(),
+        "pid": os.getpid(),
+    }
+    _save(job)
+    executor.submit(_run, job["id"])
+    _prune()
+    return job["id"]
+
+
+def cancel_job(job_id):
+    """Stop the job after the item it is working on (in whichever process runs it)."""
+    job = load_job(job_id)
+    if job is None or job["status"] not in ACTIVE:
+        return
+    job["cancel_requested"] = True
+    if job["status"] == "queued":
+        job["status"] = "cancelled"
+    _save(job)
+
+
+def ensure_started():
+    """Start the worker pool (and resume interrupted jobs) if this process has not yet."""
+    _get_executor()
+
+
+def _prune():
+    finished = [job for job in list_jobs() if job["status"] not in ACTIVE]
+    for job in finished[KEEP_FINISHED:]:
+        for path in (_path(job["id"]), _claim_path(job["id"], job.get("resumed", 0))):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def chunk_items(values, size=ITEM_SIZE):
+    return [values[start:start + size] for start in range(0, len(values), size)]
@@ -0,0 +1,103 @@
+"""
+Memory accounting for session state.
+
+deep_sizeof() estimates the bytes held by an object graph (DataFrames via memory_usage(deep=True),
+containers recursively, shared objects counted once). session_report() applies it to the
+current session, or to every live session of this server process for admins.
+
+Listing other sessions relies on Streamlit internals (Runtime._session_mgr, pinned to the
+Streamlit version in requirements.txt). If they are missing or behave differently, a warning is
+logged once and only the current session is reported.
+"""
+import logging
+import sys
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+_unsupported = None
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate bytes reachable from `obj`; objects already in `_seen` count once."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "items") and callable(obj.items):  # mappingproxy and friends
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def key_sizes(state):
+    """[(key, bytes)] for a session state mapping, largest first."""
+    sizes = [(str(key), deep_sizeof(value)) for key, value in state.items()]
+    return sorted(sizes, key=lambda item: item[1], reverse=True)
+
+
+def _runtime_states():
+    """{session_id: user-visible session state} for every session in this process, or None if unavailable."""
+    global _unsupported
+    if _unsupported is not None:
+        return None
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return None  # AppTest, bare scripts
+    try:
+        sessions = Runtime.instance()._session_mgr.list_sessions()
+        return {info.session.id: info.session.session_state.filtered_state for info in sessions}
+    except Exception as e:
+        _unsupported = e
+        logger.warning("Listing sessions disabled, unsupported Streamlit internals: %r", e)
+        return None
+
+
+def listing_unsupported():
+    """The error that disabled listing other sessions, or None."""
+    return _unsupported
+
+
+def _current_state():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return {ctx.session_id if ctx else "current": st.session_state.to_dict()}
+
+
+def live_session_ids():
+    """IDs of every live session in this process, or None when they cannot be listed."""
+    states = _runtime_states()
+    return set(states) if states is not None else None
+
+
+def session_report(top=10, all_sessions=False):
+    """Per-session totals (largest first) with each session's `top` biggest keys; the current session only unless `all_sessions`."""
+    states = (_runtime_states() if all_sessions else None) or _current_state()
+    report = []
+    for session_id, state in states.items():
+        sizes = key_sizes(state)
+        report.append({
+            "session": session_id,
+            "keys": len(sizes),
+            "bytes": sum(size for _, size in sizes),
+            "largest": sizes[:top],
+        })
+    return sorted(report, key=lambda row: row["bytes"], reverse=True)
@@ -0,0 +1,620 @@
+"""
+In-memory stand-in for the Supabase client, for offline tests and benchmarks.
+
+Implements the subset of the PostgREST query chain used in services/ and views/:
+table()/from_() -> select/insert/upsert/update/delete -> eq/neq/in_/gt/gte/lt/lte/is_
+-> order/range/limit/single -> execute(), plus rpc(). `enrollments_view` is emulated
+as a join over enrollments, students, curriculum_subjects, semesters and grades.
+
+Every execute() counts as one request in `client.stats` and can be slowed down with
+`latency` (seconds, or a callable receiving the request dict) to mimic network round trips.
+"""
+import csv
+import io
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from postgrest.exceptions import APIError
+
+PRIMARY_KEYS = {
+    "students": "studentid",
+    "programs": "programid",
+    "curriculum_subjects": "id",
+    "semesters": "semesterid",
+    "semester_subjects": "id",
+    "enrollments": "enrollmentid",
+    "grades": "gradeid",
+    "manual_subjects": "subjectid",
+    "users": "id",
+}
+
+UUID_KEYS = {"semester_subjects"}
+
+# (table, embedded resource) -> (local column, remote column)
+RELATIONS = {
+    ("semester_subjects", "curriculum_subjects"): ("curriculum_subject_id", "id"),
+    ("semester_subjects", "semesters"): ("semester_id", "semesterid"),
+    ("enrollments", "students"): ("studentid", "studentid"),
+    ("enrollments", "curriculum_subjects"): ("curriculumid", "id"),
+    ("enrollments", "semesters"): ("semesterid", "semesterid"),
+    ("grades", "enrollments"): ("enrollmentid", "enrollmentid"),
+}
+
+VIEWS = {"enrollments_view"}
+VIEW_TABLES = ("enrollments", "students", "curriculum_subjects", "semesters", "grades")  # what enrollments_view reads
+
+# enrollments_view columns that come straight from the enrollments table, so filters on
+# them can be applied before the join.
+ENROLLMENT_VIEW_BASE_COLUMNS = {"enrollmentid", "studentid", "curriculumid", "semesterid", "enrollmentdate", "enrollmentstatus"}
+
+
+class RequestStats:
+    """Request counters for one MemoryClient (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.rows = 0
+            self.bytes = 0
+            self.latency = 0.0
+            self.by_table = Counter()
+
+    def record(self, table, op, rows, size, latency):
+        with self._lock:
+            self.requests += 1
+            self.rows += rows
+            self.bytes += size
+            self.latency += latency
+            self.by_table[(table, op)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "rows": self.rows,
+                "bytes": self.bytes,
+                "latency": self.latency,
+                "by_table": dict(self.by_table),
+            }
+
+
+class MemoryResponse:
+    """Mimics postgrest's APIResponse (data + count)."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_columns(columns):
+    """Split a PostgREST select string on top-level commas: "a, b, rel(c, d)"."""
+    parts, depth, current = [], 0, ""
+    for ch in " ".join(columns.split()):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _matches(value, op, target):
+    if op == "eq":
+        return value == target or (value is not None and target is not None and str(value) == str(target))
+    if op == "neq":
+        return not _matches(value, "eq", target)
+    if op == "in":
+        targets = {str(t) for t in target}
+        return value is not None and str(value) in targets
+    if op == "is":
+        return value is None if target in (None, "null") else value == target
+    if value is None:
+        return False
+    try:
+        if op == "gt":
+            return value > target
+        if op == "gte":
+            return value >= target
+        if op == "lt":
+            return value < target
+        if op == "lte":
+            return value <= target
+    except TypeError:
+        value, target = str(value), str(target)
+        return {"gt": value > target, "gte": value >= target, "lt": value < target, "lte": value <= target}[op]
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class MemoryQuery:
+    """One PostgREST-style request being built against a MemoryClient."""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._op = None
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = ""
+        self._filters = []
+        self._order = []
+        self._range = None
+        self._single = None
+        self._count = None
+        self._csv = False
+
+    # ---------------- Operations ----------------
+    def select(self, *columns, count=None, head=None):
+        self._op = self._op or "select"
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, json, count=None, returning=None, upsert=False, default_to_null=True):
+        self._op = "insert"
+        self._payload = json
+        return self
+
+    def upsert(self, json, count=None, returning=None, ignore_duplicates=False, on_conflict="", default_to_null=True):
+        self._op = "upsert"
+        self._payload = json
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, json, count=None, returning=None):
+        self._op = "update"
+        self._payload = json
+        return self
+
+    def delete(self, count=None, returning=None):
+        self._op = "delete"
+        return self
+
+    # ---------------- Filters ----------------
+    def _filter(self, column, op, value):
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    # ---------------- Modifiers ----------------
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        self._order.append((column, desc))
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self._range = (start, end)
+        return self
+
+    def limit(self, size, foreign_table=None):
+        start = self._range[0] if self._range else 0
+        self._range = (start, start + size - 1)
+        return self
+
+    def offset(self, size):
+        end = self._range[1] if self._range else None
+        self._range = (size, end)
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    def csv(self):
+        self._csv = True
+        return self
+
+    # ---------------- Execution ----------------
+    def execute(self):
+        return self._client._execute(self)
+
+
+class MemoryRpc:
+    def __init__(self, client, name, params):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    def execute(self):
+        return self._client._execute_rpc(self._name, self._params)
+
+
+class MemoryClient:
+    """
+    Drop-in for `supabase.Client` backed by Python dicts.
+
+    latency: seconds added to every request, or callable(request: dict) -> seconds.
+    max_rows: most rows a select returns, like PostgREST's db-max-rows (1000 on Supabase);
+    None for no limit.
+    """
+
+    def __init__(self, tables=None, latency=0.0, measure_bytes=True, max_rows=None):
+        self._lock = threading.RLock()
+        self._tables = {}
+        self._versions = Counter()
+        self._indexes = {}
+        self._sequences = {}
+        self._scans = {}  # ranged selects: (table, versions, filters, order) -> ordered rows
+        self._rpcs = {
+            "delete_enrollments_for_student_semester": self._rpc_delete_enrollments_for_student_semester,
+            # sql/page_bundles.sql
+            "enrollment_page_bundle": _page_bundle("programs", "students", "semesters"),
+            "semester_subjects_page_bundle": _page_bundle("semesters", "curriculum_subjects"),
+        }
+        self.latency = latency
+        self.measure_bytes = measure_bytes
+        self.max_rows = max_rows
+        self.stats = RequestStats()
+        for table, rows in (tables or {}).items():
+            self.load(table, rows)
+
+    # ---------------- Loading ----------------
+    def load(self, table, rows):
+        """Bulk-load rows without counting requests (setup only)."""
+        with self._lock:
+            target = self._tables.setdefault(table, [])
+            for row in rows:
+                target.append(dict(row))
+            self._bump(table)
+
+    def load_dataset(self, chunks):
+        """Load (table, rows) chunks, e.g. from utils.dataset_generator.iter_dataset()."""
+        for table, rows in chunks:
+            self.load(table, rows)
+        return self
+
+    def load_directory(self, path):
+        """Load every <table>.jsonl / <table>.csv file written by utils.dataset_generator."""
+        for filename in sorted(os.listdir(path)):
+            table, ext = os.path.splitext(filename)
+            full_path = os.path.join(path, filename)
+            if ext == ".jsonl":
+                with open(full_path, encoding="utf-8") as fh:
+                    self.load(table, (json.loads(line) for line in fh if line.strip()))
+            elif ext == ".csv":
+                with open(full_path, newline="", encoding="utf-8") as fh:
+                    self.load(table, ({k: _parse_csv_value(k, v) for k, v in row.items()} for row in csv.DictReader(fh)))
+        return self
+
+    def register_rpc(self, name, fn):
+        """Register fn(client, params) -> data as a Postgres function callable through rpc()."""
+        self._rpcs[name] = fn
+
+    def rows(self, table):
+        with self._lock:
+            return [dict(row) for row in self._tables.get(table, [])]
+
+    # ---------------- Client API ----------------
+    def table(self, name):
+        return MemoryQuery(self, name)
+
+    def from_(self, name):
+        return MemoryQuery(self, name)
+
+    def rpc(self, name, params=None, count=None, head=False, get=False):
+        return MemoryRpc(self, name, params)
+
+    # ---------------- Internals ----------------
+    def _bump(self, table, inserted=None):
+        """Advance a table's version; plain inserts keep its up-to-date indexes in sync instead of dropping them."""
+        version = self._versions[table]
+        self._versions[table] += 1
+        if inserted is None:
+            return
+        for (indexed_table, column), (index_version, index) in list(self._indexes.items()):
+            if indexed_table == table and index_version == version:
+                for row in inserted:
+                    index.setdefault(str(row.get(column)), []).append(row)
+                self._indexes[(indexed_table, column)] = (self._versions[table], index)
+
+    def _index(self, table, column):
+        """Lazily built hash index on table.column, rebuilt after writes to the table."""
+        key = (table, column)
+        cached = self._indexes.get(key)
+        if cached and cached[0] == self._versions[table]:
+            return cached[1]
+        index = {}
+        for row in self._tables.get(table, []):
+            index.setdefault(str(row.get(column)), []).append(row)
+        self._indexes[key] = (self._versions[table], index)
+        return index
+
+    def _candidates(self, table, filters):
+        """Use an eq/in filter to narrow the scan through a hash index when possible."""
+        for column, op, value in filters:
+            if op == "eq":
+                return list(self._index(table, column).get(str(value), []))
+            if op == "in":
+                index = self._index(table, column)
+                return list(itertools.chain.from_iterable(index.get(str(v), []) for v in dict.fromkeys(value)))
+        return list(self._tables.get(table, []))
+
+    def _filter_rows(self, rows, filters):
+        return [row for row in rows if all(_matches(row.get(c), op, v) for c, op, v in filters)]
+
+    def _enrollments_view(self, filters):
+        base_filters = [f for f in filters if f[0] in ENROLLMENT_VIEW_BASE_COLUMNS]
+        enrollments = self._filter_rows(self._candidates("enrollments", base_filters), base_filters)
+
+        students = self._index("students", "studentid")
+        curriculum = self._index("curriculum_subjects", "id")
+        semesters = self._index("semesters", "semesterid")
+        grades = self._index("grades", "enrollmentid")
+
+        rows = []
+        for e in enrollments:
+            student = (students.get(str(e.get("studentid"))) or [{}])[0]
+            subject = (curriculum.get(str(e.get("curriculumid"))) or [{}])[0]
+            semester = (semesters.get(str(e.get("semesterid"))) or [{}])[0]
+            grade_rows = grades.get(str(e.get("enrollmentid"))) or []
+            grade = grade_rows[-1].get("grade") if grade_rows else None
+            rows.append({
+                "enrollmentid": e.get("enrollmentid"),
+                "studentid": e.get("studentid"),
+                "studentname": f"{student.get('firstname', '')} {student.get('lastname', '')}".strip(),
+                "studentremarks": student.get("remarks"),
+                "program": student.get("program"),
+                "yearlevel": subject.get("yearlevel"),
+                "curriculumid": e.get("curriculumid"),
+                "subjectcode": subject.get("code"),
+                "subjectname": subject.get("name"),
+                "units": subject.get("units"),
+                "semesterid": e.get("semesterid"),
+                "schoolyear": semester.get("schoolyear"),
+                "semester_term": semester.get("term"),
+                "enrollmentdate": e.get("enrollmentdate"),
+                "enrollmentstatus": e.get("enrollmentstatus"),
+                "remarks": e.get("remarks"),
+                "grade": grade,
+            })
+        return self._filter_rows(rows, [f for f in filters if f not in base_filters])
+
+    def _embed(self, table, row, resource, columns):
+        relation = RELATIONS.get((table, resource))
+        if relation is None:
+            raise APIError({"message": f"Could not find a relationship between '{table}' and '{resource}'", "code": "PGRST200"})
+        local, remote = relation
+        matches = self._index(resource, remote).get(str(row.get(local))) or []
+        return self._project(resource, matches[0], columns) if matches else None
+
+    def _project(self, table, row, columns):
+        parts = _split_columns(columns)
+        if not parts or parts == ["*"]:
+            return dict(row)
+        result = {}
+        for part in parts:
+            if "(" in part:
+                resource, inner = part.split("(", 1)
+                resource = resource.split(":")[-1].strip()
+                result[resource] = self._embed(table, row, resource, inner[:-1])
+            elif part == "*":
+                result.update(row)
+            else:
+                result[part] = row.get(part)
+        return result
+
+    def _next_id(self, table, key):
+        if table in UUID_KEYS:
+            return str(uuid.uuid4())
+        if table not in self._sequences:
+            existing = [r.get(key) for r in self._tables.get(table, []) if isinstance(r.get(key), int)]
+            self._sequences[table] = max(existing, default=0)
+        self._sequences[table] += 1
+        return self._sequences[table]
+
+    def _ordered_rows(self, query):
+        if query._table in VIEWS:
+            rows = self._enrollments_view(query._filters)
+        else:
+            rows = self._filter_rows(self._candidates(query._table, query._filters), query._filters)
+
+        for column, desc in reversed(query._order):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) if r.get(column) is not None else ""), reverse=desc)
+        return rows
+
+    def _select(self, query):
+        if not query._range:
+            rows = self._ordered_rows(query)
+        else:
+            # Paged reads scan and sort once per page set, as an index would let Postgres do;
+            # otherwise paging a large view here costs a full scan per page.
+            tables = VIEW_TABLES if query._table in VIEWS else (query._table,)
+            key = (query._table, tuple(self._versions[table] for table in tables), repr(query._filters), tuple(query._order))
+            rows = self._scans.get(key)
+            if rows is None:
+                rows = self._ordered_rows(query)
+                if len(self._scans) >= 8:
+                    self._scans.pop(next(iter(self._scans)))
+                self._scans[key] = rows
+
+        count = len(rows) if query._count else None
+        if query._range:
+            start, end = query._range
+            rows = rows[start:] if end is None else rows[start:end + 1]
+        if self.max_rows is not None:
+            rows = rows[:self.max_rows]
+
+        return [self._project(query._table, row, query._columns) for row in rows], count
+
+    def _write(self, query):
+        table = query._table
+        if table in VIEWS:
+            raise APIError({"message": f"cannot modify view '{table}'", "code": "55000"})
+        key = PRIMARY_KEYS.get(table, "id")
+        rows = self._tables.setdefault(table, [])
+
+        if query._op in ("insert", "upsert"):
+            payload = query._payload if isinstance(query._payload, list) else [query._payload]
+            conflict = [c.strip() for c in (query._on_conflict or key).split(",")]
+            existing_keys = self._index(table, key)
+            new_keys = set()
+            inserted, written, updated = [], [], False
+            for item in payload:
+                item = dict(item)
+                if query._op == "upsert" and all(item.get(c) is not None for c in conflict):
+                    candidates = self._index(table, conflict[0]).get(str(item[conflict[0]]), [])
+                    existing = next((r for r in candidates if all(str(r.get(c)) == str(item[c]) for c in conflict)), None)
+                    if existing is not None:
+                        existing.update(item)
+                        written.append(dict(existing))
+                        updated = True
+                        continue
+                if item.get(key) is None:
+                    item[key] = self._next_id(table, key)
+                elif str(item[key]) in existing_keys or str(item[key]) in new_keys:
+                    raise APIError({"message": f'duplicate key value violates unique constraint "{table}_pkey"', "code": "23505"})
+                new_keys.add(str(item[key]))
+                rows.append(item)
+                inserted.append(item)
+                written.append(dict(item))
+            self._bump(table, inserted=None if updated else inserted)
+            return written
+
+        matched = self._filter_rows(self._candidates(table, query._filters), query._filters)
+        if query._op == "update":
+            for row in matched:
+                row.update(query._payload)
+        else:
+            ids = {id(row) for row in matched}
+            self._tables[table] = [row for row in rows if id(row) not in ids]
+        self._bump(table)
+        return [dict(row) for row in matched]
+
+    def _finish(self, table, op, request, data, count=None, as_csv=False):
+        delay = self.latency(request) if callable(self.latency) else (self.latency or 0.0)
+        if delay:
+            time.sleep(delay)
+
+        if as_csv:
+            data = _to_csv(data)
+        size = 0
+        if self.measure_bytes:
+            size = len(data) if isinstance(data, str) else len(json.dumps(data, default=str))
+        rows = data.count("\n") - 1 if isinstance(data, str) else (len(data) if isinstance(data, list) else int(data is not None))
+        self.stats.record(table, op, max(rows, 0), size, delay)
+        return MemoryResponse(data, count)
+
+    def _execute(self, query):
+        request = {"table": query._table, "op": query._op or "select", "filters": list(query._filters)}
+        with self._lock:
+            if request["op"] == "select":
+                data, count = self._select(query)
+            else:
+                data, count = self._write(query), None
+                if query._columns != "*":
+                    data = [self._project(query._table, row, query._columns) for row in data]
+
+        if query._single:
+            if len(data) != 1 and not (query._single == "maybe" and not data):
+                self._finish(query._table, request["op"], request, [])
+                raise APIError({"message": "JSON object requested, multiple (or no) rows returned", "code": "PGRST116"})
+            data = data[0] if data else None
+
+        return self._finish(query._table, request["op"], request, data, count, as_csv=query._csv)
+
+    def _execute_rpc(self, name, params):
+        request = {"table": f"rpc/{name}", "op": "rpc", "filters": list(params.items())}
+        fn = self._rpcs.get(name)
+        if fn is None:
+            self._finish(request["table"], "rpc", request, [])
+            raise APIError({"message": f"Could not find the function public.{name}", "code": "PGRST202"})
+        with self._lock:
+            data = fn(self, params)
+        return self._finish(request["table"], "rpc", request, data)
+
+    # ---------------- Built-in Postgres functions ----------------
+    @staticmethod
+    def _rpc_delete_enrollments_for_student_semester(client, params):
+        query = client.table("enrollments").delete() \
+            .eq("studentid", params["param_studentid"]) \
+            .eq("semesterid", params["param_semesterid"])
+        deleted = client._write(query)
+        return [{"enrollmentid": row["enrollmentid"]} for row in deleted]
+
+
+def _page_bundle(*tables):
+    """A page bundle function: {table: every row} for each of `tables`."""
+    def bundle(client, params):
+        return {table: client.rows(table) for table in tables}
+    return bundle
+
+
+# Columns that look numeric in CSV but are text in the database.
+TEXT_COLUMNS = {"grade", "studentid", "code", "section", "password"}
+
+
+def _parse_csv_value(column, value):
+    if value == "":
+        return None
+    if value in ("True", "False"):
+        return value == "True"
+    if column not in TEXT_COLUMNS:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _to_csv(data):
+    rows = data if isinstance(data, list) else ([data] if data else [])
+    buffer = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def client_from_env():
+    """
+    Build a MemoryClient from environment variables:
+    GMS_MEMORY_DATA (directory from utils.dataset_generator), GMS_MEMORY_LATENCY (seconds)
+    and GMS_MEMORY_MAX_ROWS (rows per select, unlimited when unset).
+    """
+    max_rows = os.environ.get("GMS_MEMORY_MAX_ROWS")
+    client = MemoryClient(latency=float(os.environ.get("GMS_MEMORY_LATENCY", "0") or 0),
+                          max_rows=int(max_rows) if max_rows else None)
+    data_dir = os.environ.get("GMS_MEMORY_DATA")
+    if data_dir:
+        client.load_directory(data_dir)
+    return client
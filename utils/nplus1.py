@@ -0,0 +1,148 @@
+"""
+N+1 query detection.
+
+Every query is fingerprinted by its shape (table/view, operation and filtered columns, never
+the values). When one rerun issues the same shape more than NPLUS1_THRESHOLD times, the
+shape is logged once with the call site that issued it. With GMS_NPLUS1_STRICT=1 (CI,
+AppTest runs) the offending query raises NPlusOneError instead, and assert_no_nplus1()
+checks an arbitrary block of code the same way.
+
+Paginated scans (queries with .range()) are repeated by design and are not counted; wrap
+other intentional repeats in `with expected():`. Queries from threads outside a script run
+and outside track() (jobs, prefetch) belong to no rerun and are not counted either.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+
+NPLUS1_THRESHOLD = int(os.environ.get("GMS_NPLUS1_THRESHOLD", "10"))
+STRICT = os.environ.get("GMS_NPLUS1_STRICT", "").lower() in ("1", "true", "yes")
+MAX_SESSIONS = 200
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_runs = OrderedDict()  # scope key -> {fingerprint: {"count": n, "caller": str, "view": str}}
+_local = threading.local()
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def fingerprint(request):
+    columns = tuple(sorted({f"{method}:{column}" for method, column, _ in request.filters}))
+    return (request.table, request.operation, columns)
+
+
+def describe(shape):
+    table, operation, columns = shape
+    return f"{operation} {table} [{', '.join(columns) or 'no filters'}]"
+
+
+def _scope_key():
+    scope = getattr(_local, "scope", None)
+    if scope is not None:
+        return scope
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def begin_rerun():
+    """Reset the shape counts for the calling session (call once at the top of app.py)."""
+    key = _scope_key()
+    if key is None:
+        return
+    with _lock:
+        _runs[key] = {}
+        _runs.move_to_end(key)
+        while len(_runs) > MAX_SESSIONS:
+            _runs.popitem(last=False)
+
+
+@contextmanager
+def expected():
+    """Mark queries issued inside the block as intentionally repeated."""
+    _local.expected = getattr(_local, "expected", 0) + 1
+    try:
+        yield
+    finally:
+        _local.expected -= 1
+
+
+def offenders(threshold=None, key=None):
+    """[(shape, count, caller, view)] for shapes issued more than `threshold` times."""
+    threshold = NPLUS1_THRESHOLD if threshold is None else threshold
+    with _lock:
+        counts = dict(_runs.get(_scope_key() if key is None else key, {}))
+    return [
+        (shape, entry["count"], entry["caller"], entry["view"])
+        for shape, entry in counts.items()
+        if entry["count"] > threshold
+    ]
+
+
+def _message(shape, count, caller, view):
+    return f"N+1 query: {describe(shape)} issued {count}x in one rerun (view {view}) from {caller}"
+
+
+def detect_nplus1(request, call_next):
+    """Query middleware: count query shapes per rerun and flag repeated ones."""
+    if getattr(_local, "expected", 0) or any(name == "range" for name, _, _ in request.calls):
+        return call_next(request)
+
+    key = _scope_key()
+    if key is None:
+        # No rerun to attribute the query to (jobs, prefetch, other background threads).
+        return call_next(request)
+
+    shape = fingerprint(request)
+    with _lock:
+        counts = _runs.setdefault(key, {})
+        entry = counts.setdefault(shape, {"count": 0, "caller": request.caller, "view": request.view})
+        entry["count"] += 1
+        count = entry["count"]
+
+    if count == NPLUS1_THRESHOLD + 1:
+        message = _message(shape, count, entry["caller"], entry["view"])
+        if STRICT:
+            raise NPlusOneError(message)
+        logger.warning(message)
+    return call_next(request)
+
+
+@contextmanager
+def track(threshold=None):
+    """
+    Count query shapes issued by this thread inside the block on their own and yield a list
+    that is filled with the offenders (see offenders()) when the block exits.
+    """
+    found = []
+    scope = object()
+    previous = getattr(_local, "scope", None)
+    _local.scope = scope
+    try:
+        yield found
+    finally:
+        _local.scope = previous
+        found.extend(offenders(threshold, key=scope))
+        with _lock:
+            _runs.pop(scope, None)
+
+
+@contextmanager
+def assert_no_nplus1(threshold=None):
+    """
+    Raise NPlusOneError if the block repeats a query shape more than `threshold` times.
+
+        with assert_no_nplus1():
+            migrate_students_to_semester_subjects(ids, semester_id)
+    """
+    with track(threshold) as found:
+        yield
+    if found:
+        raise NPlusOneError("\n".join(_message(*item) for item in found))
@@ -0,0 +1,20 @@
+"""
+Paged PostgREST reads.
+
+Supabase returns at most PAGE_SIZE rows per request (PostgREST max-rows) and says nothing when
+it cuts a response short, so every read that can exceed it goes through paginate() with a
+stable .order().
+"""
+PAGE_SIZE = 1000
+
+
+def paginate(build_query, page_size=PAGE_SIZE):
+    """Yield pages of rows from a query builder factory using PostgREST range requests."""
+    start = 0
+    while True:
+        rows = build_query().range(start, start + page_size - 1).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        start += page_size
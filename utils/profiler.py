@@ -0,0 +1,167 @@
+"""
+Opt-in render profiler.
+
+With "🔬 Profile page" on in the sidebar, app.py times the whole page and views mark their
+phases with checkpoint("data load") / checkpoint("transform") / checkpoint("render"); each
+phase runs until the next checkpoint or the end of the page. "Capture next rerun" additionally
+runs one rerun under cProfile, tracemalloc and a stack sampler, and keeps a report (summary
+text, folded stacks for flame graph tools, raw .prof for snakeviz) for download. tracemalloc
+is process-wide, so only one session captures at a time; others see the capture as busy.
+
+Everything is a no-op while profiling is off.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+from utils import query_metrics
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples for the flame graph
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+_local = threading.local()
+_capture_lock = threading.Lock()
+
+
+def enabled():
+    return bool(st.session_state.get("profile_enabled"))
+
+
+def capture_busy():
+    """True while some session in this process is capturing a profile."""
+    return _capture_lock.locked()
+
+
+def begin_rerun():
+    _local.open = None
+    if enabled():
+        st.session_state["profile_timings"] = []
+
+
+def _record(name, start, queries_before):
+    st.session_state.setdefault("profile_timings", []).append({
+        "section": name,
+        "ms": round((time.perf_counter() - start) * 1000, 1),
+        "queries": query_metrics.query_count() - queries_before,
+    })
+
+
+def _close_checkpoint():
+    current = getattr(_local, "open", None)
+    if current:
+        _record(*current)
+        _local.open = None
+
+
+def checkpoint(name):
+    """End the current page phase (if any) and start timing `name`."""
+    if not enabled():
+        return
+    _close_checkpoint()
+    page = getattr(_local, "page", None)
+    _local.open = (f"{page}: {name}" if page else name, time.perf_counter(), query_metrics.query_count())
+
+
+# -------------------------
+# Capture
+# -------------------------
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into folded-stack counts."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _summary(page, wall_ms, profile, snapshot, peak):
+    out = io.StringIO()
+    out.write(f"Profile of page '{page}' captured {datetime.now():%Y-%m-%d %H:%M:%S}\n")
+    out.write(f"Wall time (with profiling overhead): {wall_ms:.1f} ms, peak traced memory: {peak / 1024:.0f} KB\n\n")
+
+    out.write("Sections\n")
+    for timing in st.session_state.get("profile_timings", []):
+        out.write(f"  {timing['section']:<40} {timing['ms']:>10.1f} ms  {timing['queries']:>4} queries\n")
+
+    out.write(f"\nTop {TOP_FUNCTIONS} functions by cumulative time\n")
+    pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+    out.write(f"\nTop {TOP_ALLOCATIONS} allocation sites (still allocated at the end of the rerun)\n")
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        out.write(f"  {stat}\n")
+    return out.getvalue()
+
+
+@contextmanager
+def profile_page(page):
+    """Time the page (and capture a full profile if one was requested for this rerun)."""
+    if not enabled():
+        yield
+        return
+
+    _local.page = page
+    capture = st.session_state.pop("profile_capture_next", False)
+    if capture and (tracemalloc.is_tracing() or not _capture_lock.acquire(blocking=False)):
+        st.session_state["profile_capture_busy"] = True
+        capture = False
+    if capture:
+        st.session_state.pop("profile_capture_busy", None)
+        sampler = _StackSampler(threading.get_ident())
+        profile = cProfile.Profile()
+        tracemalloc.start()
+        sampler.start()
+        profile.enable()
+
+    start = time.perf_counter()
+    queries_before = query_metrics.query_count()
+    try:
+        yield
+    finally:
+        _close_checkpoint()
+        _record(f"{page} (total)", start, queries_before)
+        _local.page = None
+        if capture:
+            profile.disable()
+            sampler.stop()
+            try:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+                _capture_lock.release()
+            profile.create_stats()
+            # Dump before building the summary: pstats.Stats() takes the stats out of the profile.
+            prof = marshal.dumps(profile.stats)
+            st.session_state["profile_report"] = {
+                "page": page,
+                "summary": _summary(page, (time.perf_counter() - start) * 1000, profile, snapshot, peak),
+                "folded": "\n".join(f"{stack} {count}" for stack, count in sampler.stacks.most_common()),
+                "prof": prof,
+            }
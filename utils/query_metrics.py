@@ -0,0 +1,199 @@
+"""
+Per-query instrumentation for every Supabase call made through database_client.
+
+record_query is installed as a query middleware. Each executed query produces a record
+(table, operation, calling view, call site, duration, rows, response size, error, cache hit) that is
+kept for the current rerun of the issuing session and folded into process-wide totals,
+which prometheus_text() renders in the Prometheus text exposition format.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_RUN_QUERIES = 5000  # per rerun; anything beyond is only counted
+MAX_SESSIONS = 200
+SIZE_SAMPLE_ROWS = 20
+
+_lock = threading.Lock()
+_runs = OrderedDict()  # session_id -> {"queries": [...], "dropped": n, "started": t}
+_totals = defaultdict(lambda: {"count": 0, "errors": 0, "cached": 0, "rows": 0, "bytes": 0, "seconds": 0.0, "buckets": [0] * len(DURATION_BUCKETS)})
+
+
+def _session_id():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def _row_count(data):
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, str):
+        return max(data.count("\n"), 0)
+    return 1 if data else 0
+
+
+def _estimate_bytes(data):
+    """JSON size of the response, extrapolated from the first rows for large lists."""
+    if data is None:
+        return 0
+    if isinstance(data, (str, bytes)):
+        return len(data)
+    if isinstance(data, list) and len(data) > SIZE_SAMPLE_ROWS:
+        sample = len(json.dumps(data[:SIZE_SAMPLE_ROWS], default=str))
+        return int(sample * len(data) / SIZE_SAMPLE_ROWS)
+    return len(json.dumps(data, default=str))
+
+
+def _new_run():
+    return {"queries": [], "dropped": 0, "started": time.time()}
+
+
+def begin_rerun():
+    """Start a fresh query log for the calling session (call once at the top of app.py)."""
+    session_id = _session_id()
+    with _lock:
+        _runs[session_id] = _new_run()
+        _runs.move_to_end(session_id)
+        while len(_runs) > MAX_SESSIONS:
+            _runs.popitem(last=False)
+
+
+def _store(record, session_id):
+    with _lock:
+        run = _runs.get(session_id)
+        if run is None:
+            run = _runs[session_id] = _new_run()
+        if len(run["queries"]) < MAX_RUN_QUERIES:
+            run["queries"].append(record)
+        else:
+            run["dropped"] += 1
+
+        totals = _totals[(record["table"], record["operation"], record["view"])]
+        totals["count"] += 1
+        totals["errors"] += 1 if record["error"] else 0
+        totals["cached"] += 1 if record["cached"] else 0
+        totals["rows"] += record["rows"]
+        totals["bytes"] += record["bytes"]
+        seconds = record["ms"] / 1000
+        totals["seconds"] += seconds
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                totals["buckets"][i] += 1
+
+
+def record_query(request, call_next):
+    """Query middleware: time the request and record its size and origin."""
+    start = time.perf_counter()
+    error = None
+    response = None
+    try:
+        response = call_next(request)
+        return response
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        data = getattr(response, "data", None)
+        _store({
+            "table": request.table,
+            "operation": request.operation,
+            "view": request.view or "-",
+            "caller": request.caller or "-",
+            "ms": (time.perf_counter() - start) * 1000,
+            "rows": _row_count(data),
+            "bytes": _estimate_bytes(data),
+            "error": error or ("cancelled" if getattr(request, "cancelled", False) else None),
+            "cached": getattr(request, "cache_hit", False),
+            "target": getattr(request, "target", "primary"),
+        }, _session_id())
+
+
+# -------------------------
+# Reading
+# -------------------------
+def current_rerun_queries():
+    """Queries issued by the calling session since its last begin_rerun()."""
+    with _lock:
+        run = _runs.get(_session_id())
+        return (list(run["queries"]), run["dropped"]) if run else ([], 0)
+
+
+def query_count():
+    """Number of queries the calling session has issued in the current rerun."""
+    with _lock:
+        run = _runs.get(_session_id())
+        return len(run["queries"]) + run["dropped"] if run else 0
+
+
+def summarize(queries):
+    return {
+        "queries": len(queries),
+        "ms": sum(q["ms"] for q in queries),
+        "rows": sum(q["rows"] for q in queries),
+        "bytes": sum(q["bytes"] for q in queries),
+        "errors": sum(1 for q in queries if q["error"]),
+        "cached": sum(1 for q in queries if q["cached"]),
+    }
+
+
+def slowest(queries, n=5):
+    return sorted(queries, key=lambda q: q["ms"], reverse=True)[:n]
+
+
+def reset_totals():
+    with _lock:
+        _totals.clear()
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def prometheus_text():
+    """Process-wide query totals in the Prometheus text exposition format."""
+    with _lock:
+        totals = {key: dict(value, buckets=list(value["buckets"])) for key, value in _totals.items()}
+    totals = dict(sorted(totals.items(), key=lambda item: tuple(map(str, item[0]))))
+
+    lines = []
+
+    def counter(name, help_text, field):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (table, operation, view), value in totals.items():
+            lines.append(f"{name}{_labels(table=table, operation=operation, view=view)} {value[field]}")
+
+    counter("gms_queries_total", "Supabase queries executed.", "count")
+    counter("gms_query_errors_total", "Supabase queries that raised.", "errors")
+    counter("gms_query_cache_hits_total", "Queries answered from the in-process cache.", "cached")
+    counter("gms_query_rows_total", "Rows returned by Supabase queries.", "rows")
+    counter("gms_query_response_bytes_total", "Approximate JSON bytes returned by Supabase queries.", "bytes")
+
+    name = "gms_query_duration_seconds"
+    lines.append(f"# HELP {name} Supabase query latency.")
+    lines.append(f"# TYPE {name} histogram")
+    for (table, operation, view), value in totals.items():
+        for bound, count in zip(DURATION_BUCKETS, value["buckets"]):
+            lines.append(f"{name}_bucket{_labels(table=table, operation=operation, view=view, le=bound)} {count}")
+        lines.append(f"{name}_bucket{_labels(table=table, operation=operation, view=view, le='+Inf')} {value['count']}")
+        lines.append(f"{name}_sum{_labels(table=table, operation=operation, view=view)} {value['seconds']:.6f}")
+        lines.append(f"{name}_count{_labels(table=table, operation=operation, view=view)} {value['count']}")
+
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+_collectors = []
+
+
+def add_collector(fn):
+    """Append fn() -> [exposition lines] to prometheus_text() (for other data-layer metrics)."""
+    if fn not in _collectors:
+        _collectors.append(fn)
@@ -0,0 +1,102 @@
+import io
+import os
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.backends.backend_pdf import PdfPages
+
+PAGE_SIZE = (8.5, 11)
+ROW_HEIGHT = 0.02
+BOTTOM_MARGIN = 0.05
+YEAR_LEVELS = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
+SEMESTER_TERMS = ["1st Semester", "2nd Semester"]
+
+
+def _gwa_summary(rows):
+    import pandas as pd
+    from services.grades_service import summarize_gwa
+
+    df = pd.DataFrame(rows)
+    df["units"] = pd.to_numeric(df["units"], errors="coerce")
+    df["grade"] = pd.to_numeric(df["grade"], errors="coerce")
+    return summarize_gwa(df)
+
+
+def _new_page(student, page_no):
+    fig = Figure(figsize=PAGE_SIZE)
+    fig.text(0.5, 0.96, "Student Grade Report", ha="center", fontsize=16, weight="bold")
+    fig.text(0.08, 0.92, f"{student['studentname']} ({student['studentid']})", fontsize=11)
+    fig.text(0.08, 0.90, f"Program: {student.get('program') or '-'}", fontsize=9)
+    fig.text(0.92, 0.92, f"Page {page_no}", ha="right", fontsize=9)
+    return fig
+
+
+def _add_table(fig, top, title, header, rows, col_x):
+    """Draw a plain text table starting at `top` (figure coords) and return the y below it.
+
+    Plain fig.text rows are several times cheaper to lay out than matplotlib's Table artist,
+    which matters when thousands of reports are rendered in one batch.
+    """
+    fig.text(col_x[0], top, title, fontsize=10, weight="bold")
+    y = top - ROW_HEIGHT
+    for x, label in zip(col_x, header):
+        fig.text(x, y, label, fontsize=8, weight="bold")
+    fig.add_artist(Line2D([col_x[0], 0.92], [y - 0.006, y - 0.006], linewidth=0.5, color="black"))
+    for row in rows or [["-"] * len(header)]:
+        y -= ROW_HEIGHT
+        for x, value in zip(col_x, row):
+            fig.text(x, y, str(value), fontsize=8)
+    return y - ROW_HEIGHT
+
+
+def render_student_report(payload):
+    """
+    Render one student's grade report to PDF bytes.
+
+    payload = {"student": {...}, "rows": [enrollment rows with units and raw grade]}
+    Runs inside process-pool workers, so it only touches matplotlib's object API (no pyplot state).
+    """
+    student = payload["student"]
+    rows = payload["rows"]
+    summary = _gwa_summary(rows)
+
+    terms = {}
+    for row in rows:
+        terms.setdefault((row.get("schoolyear") or "", row.get("semester_term") or ""), []).append(row)
+
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        page_no = 1
+        fig = _new_page(student, page_no)
+
+        gwa_rows = [
+            [year] + [summary.get(f"{year} {sem}", "--") for sem in SEMESTER_TERMS] + [summary.get(f"{year} Overall", "--")]
+            for year in YEAR_LEVELS
+        ]
+        gwa_rows.append(["Overall", "", "", summary.get("Overall", "--")])
+        top = _add_table(fig, 0.86, "GWA Summary", ["Year", *SEMESTER_TERMS, "Overall"], gwa_rows, [0.08, 0.3, 0.52, 0.74])
+
+        for (schoolyear, term), term_rows in sorted(terms.items()):
+            if top - ROW_HEIGHT * (len(term_rows) + 2) < BOTTOM_MARGIN:
+                pdf.savefig(fig)
+                page_no += 1
+                fig = _new_page(student, page_no)
+                top = 0.86
+            table_rows = [
+                [r.get("subjectcode") or "", r.get("subjectname") or "", r.get("units") if r.get("units") is not None else "", r.get("grade") or ""]
+                for r in term_rows
+            ]
+            top = _add_table(fig, top, f"{schoolyear} {term}", ["Code", "Subject", "Units", "Grade"], table_rows, [0.08, 0.22, 0.7, 0.8])
+
+        pdf.savefig(fig)
+
+    return buffer.getvalue()
+
+
+def render_report_file(payload, path):
+    """Render a report and atomically write it to `path` (process-pool entry point)."""
+    pdf_bytes = render_student_report(payload)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(pdf_bytes)
+    os.replace(tmp_path, path)
+    return path
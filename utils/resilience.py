@@ -0,0 +1,273 @@
+"""
+Retries, hedged reads and a circuit breaker around every Supabase request (query middleware).
+
+* Retry: transient failures (timeouts, dropped connections, HTTP 5xx, Postgres serialization
+  failures and deadlocks) are retried up to MAX_RETRIES times with full-jitter exponential
+  backoff, for idempotent requests only: reads, updates, deletes, upserts and known RPCs.
+  Inserts and unknown RPCs are retried only when the connection failed before sending.
+* Hedging: once a query shape (table, operation and filtered columns, see nplus1.fingerprint)
+  has enough latency samples, a read still running after that shape's p95 gets a second,
+  identical request on a small pool; whichever answers first wins.
+* Circuit breaker: after BREAKER_THRESHOLD consecutive transient failures, requests fail fast
+  for BREAKER_COOLDOWN seconds instead of waiting on a degraded backend. Reads are then served
+  from the query cache's last known result when there is one; then a single trial request
+  decides whether to close the breaker again. Any answer from the backend, including an
+  error such as a bad filter, counts as the backend being up.
+
+Every action is counted in stats() and exported with the query metrics (Prometheus).
+"""
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from utils import cache, nplus1, query_metrics
+
+MAX_RETRIES = int(os.environ.get("GMS_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.2  # seconds
+BACKOFF_CAP = 2.0
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05  # never hedge sooner than this
+HEDGE_WORKERS = 4  # hedges only; first attempts never wait for this pool
+ATTEMPT_WORKERS = int(os.environ.get("GMS_ATTEMPT_WORKERS", "8"))  # hedgeable first attempts
+POLL_SECONDS = 0.05
+BREAKER_THRESHOLD = int(os.environ.get("GMS_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("GMS_BREAKER_COOLDOWN", "30"))
+
+TRANSIENT_HTTP = {"500", "502", "503", "504"}
+# PostgREST connection pool timeout, statement timeout, serialization failure, deadlock.
+TRANSIENT_SQLSTATES = {"PGRST003", "57014", "40001", "40P01"}
+TRANSIENT_EXCEPTIONS = {"TimeoutException", "TransportError", "RemoteProtocolError"}
+NOT_SENT_EXCEPTIONS = {"ConnectError", "ConnectTimeout", "PoolTimeout"}
+
+
+class BackendUnavailable(ConnectionError):
+    """Raised instead of calling the backend while the circuit breaker is open."""
+
+
+_lock = threading.Lock()
+_latencies = defaultdict(lambda: deque(maxlen=200))  # query shape -> recent seconds
+_stats = defaultdict(int)
+_breaker = {"failures": 0, "opened_at": None, "trial": False}
+_executor = None
+_attempt_executor = None
+_attempt_slots = threading.BoundedSemaphore(ATTEMPT_WORKERS)
+
+
+def _exception_names(error):
+    return {cls.__name__ for cls in type(error).__mro__}
+
+
+def is_transient(error):
+    names = _exception_names(error)
+    if names & (TRANSIENT_EXCEPTIONS | NOT_SENT_EXCEPTIONS) or isinstance(error, (TimeoutError, ConnectionError)):
+        return not isinstance(error, BackendUnavailable)
+    code = getattr(error, "code", None)
+    return code is not None and str(code) in TRANSIENT_HTTP | TRANSIENT_SQLSTATES
+
+
+def _not_sent(error):
+    return bool(_exception_names(error) & NOT_SENT_EXCEPTIONS)
+
+
+def _is_idempotent(request):
+    if request.root == "rpc":
+        return request.table in cache.READ_ONLY_RPCS or request.table in cache.RPC_WRITES
+    return request.operation != "insert"
+
+
+def _count(action):
+    with _lock:
+        _stats[action] += 1
+
+
+def stats():
+    with _lock:
+        return dict(_stats, breaker="open" if _breaker["opened_at"] is not None else "closed")
+
+
+# -------------------------
+# Circuit breaker
+# -------------------------
+def _breaker_allows():
+    """True if a request may go to the backend (closed, or the single half-open trial)."""
+    with _lock:
+        opened_at = _breaker["opened_at"]
+        if opened_at is None:
+            return True
+        if time.monotonic() - opened_at >= BREAKER_COOLDOWN and not _breaker["trial"]:
+            _breaker["trial"] = True
+            return True
+        return False
+
+
+def _record_outcome(ok):
+    with _lock:
+        if ok:
+            if _breaker["opened_at"] is not None:
+                _stats["breaker_closed"] += 1
+            _breaker.update(failures=0, opened_at=None, trial=False)
+            return
+        _breaker["failures"] += 1
+        if _breaker["trial"] or (_breaker["opened_at"] is None and _breaker["failures"] >= BREAKER_THRESHOLD):
+            _breaker.update(opened_at=time.monotonic(), trial=False)
+            _stats["breaker_opened"] += 1
+
+
+def _end_trial():
+    """Let another request try the backend if a half-open trial ended without an outcome."""
+    with _lock:
+        _breaker["trial"] = False
+
+
+def reset():
+    with _lock:
+        _breaker.update(failures=0, opened_at=None, trial=False)
+        _latencies.clear()
+        _stats.clear()
+
+
+# -------------------------
+# Hedging
+# -------------------------
+def _hedge_delay(key):
+    with _lock:
+        samples = sorted(_latencies[key])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return max(HEDGE_MIN_DELAY, samples[int(len(samples) * 0.95) - 1])
+
+
+def _get_executor():
+    global _executor, _attempt_executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+            _attempt_executor = ThreadPoolExecutor(max_workers=ATTEMPT_WORKERS, thread_name_prefix="query-attempt")
+        return _executor
+
+
+def _next_outcome(outcomes, request, timeout=None):
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        wait = POLL_SECONDS if deadline is None else min(POLL_SECONDS, deadline - time.monotonic())
+        try:
+            return outcomes.get(timeout=max(wait, 0))
+        except queue.Empty:
+            request.stop_if_superseded()
+            if deadline is not None and time.monotonic() >= deadline:
+                raise
+
+
+def _hedged(request, call_next, delay):
+    # The first attempt runs on a pool with a free worker reserved for it (_attempt_slots), so
+    # it never queues behind other requests; when every worker is busy it runs inline, unhedged.
+    if not _attempt_slots.acquire(blocking=False):
+        return call_next(request)
+    outcomes = queue.Queue()
+
+    def attempt(is_hedge):
+        try:
+            outcomes.put((is_hedge, call_next(request), None))
+        except BaseException as e:
+            outcomes.put((is_hedge, None, e))
+        finally:
+            if not is_hedge:
+                _attempt_slots.release()
+
+    try:
+        hedges = _get_executor()
+        _attempt_executor.submit(attempt, False)
+    except BaseException:
+        _attempt_slots.release()
+        raise
+    launched = 1
+    try:
+        outcome = _next_outcome(outcomes, request, delay)
+    except queue.Empty:
+        request.stop_if_superseded()
+        if not request.cancelled:
+            _count("hedges")
+            hedges.submit(attempt, True)
+            launched = 2
+        outcome = _next_outcome(outcomes, request)
+    if outcome[2] is not None and launched == 2:
+        # The other attempt may still succeed.
+        outcome = _next_outcome(outcomes, request)
+
+    is_hedge, response, error = outcome
+    if error is not None:
+        raise error
+    if is_hedge:
+        _count("hedges_won")
+    return response
+
+
+# -------------------------
+# Middleware
+# -------------------------
+def resilient_queries(request, call_next):
+    """Query middleware: retry transient failures, hedge slow reads, fail fast when degraded."""
+    read = cache.is_read(request)
+    key = nplus1.fingerprint(request)
+
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            request.stop_if_superseded()
+        if request.cancelled:
+            raise CancelledError()
+        if not _breaker_allows():
+            _count("short_circuited")
+            fallback = cache.stale(request) if read else None
+            if fallback is not None:
+                _count("stale_served")
+                request.cache_hit = True
+                return fallback
+            raise BackendUnavailable("The database is not responding; try again shortly.")
+
+        start = time.perf_counter()
+        try:
+            delay = _hedge_delay(key) if read else None
+            response = _hedged(request, call_next, delay) if delay else call_next(request)
+        except Exception as e:
+            if not is_transient(e):
+                # The backend answered (bad filter, constraint violation, ...): it is up.
+                _record_outcome(True)
+                raise
+            _record_outcome(False)
+            if attempt == MAX_RETRIES or not (_is_idempotent(request) or _not_sent(e)):
+                raise
+            _count("retries")
+            time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+            continue
+        except BaseException:
+            # Interrupted (rerun, shutdown) before the backend answered.
+            _end_trial()
+            raise
+
+        _record_outcome(True)
+        with _lock:
+            _latencies[key].append(time.perf_counter() - start)
+        return response
+
+
+def _prometheus_lines():
+    current = stats()
+    lines = [
+        "# HELP gms_resilience_actions_total Retries, hedges and circuit breaker actions in the data layer.",
+        "# TYPE gms_resilience_actions_total counter",
+    ]
+    for action in ("retries", "hedges", "hedges_won", "breaker_opened", "breaker_closed", "short_circuited", "stale_served"):
+        lines.append(f'gms_resilience_actions_total{{action="{action}"}} {current.get(action, 0)}')
+    lines += [
+        "# HELP gms_circuit_breaker_open Whether the circuit breaker is open (1) or closed (0).",
+        "# TYPE gms_circuit_breaker_open gauge",
+        f"gms_circuit_breaker_open {1 if current['breaker'] == 'open' else 0}",
+    ]
+    return lines
+
+
+query_metrics.add_collector(_prometheus_lines)
@@ -0,0 +1,100 @@
+"""
+Read/write routing between the primary and an optional read replica (query middleware).
+
+Writes and RPCs with side effects always go to the primary. Reads go to the replica
+(SUPABASE_READ_URL / SUPABASE_READ_KEY in secrets) except when:
+
+* the table is in PRIMARY_ONLY_TABLES (logins must see a just-changed password);
+* the session (or background thread) that issues it wrote anything in the last PIN_SECONDS,
+  so a page that saves and reruns reads its own write;
+* one of the tables it reads was written by this process in the last PIN_SECONDS, so a
+  lagging replica cannot refill the shared query cache with pre-write rows;
+* it runs inside `with primary():` (read-modify-write code such as duplicate checks).
+
+Without a replica every request goes to the primary and this middleware only counts.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils import cache
+
+PIN_SECONDS = float(os.environ.get("GMS_REPLICA_PIN_SECONDS", "10"))
+PRIMARY_ONLY_TABLES = {"users"}
+
+_lock = threading.Lock()
+_local = threading.local()
+_session_writes = {}  # session id / thread key -> monotonic time of last write
+_table_writes = {}  # table -> monotonic time of last write from this process
+_stats = {"primary_reads": 0, "replica_reads": 0, "pinned_reads": 0, "writes": 0}
+
+
+def _writer_key():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else f"thread:{threading.get_ident()}"
+
+
+@contextmanager
+def primary():
+    """Send every read in this block to the primary."""
+    _local.primary = getattr(_local, "primary", 0) + 1
+    try:
+        yield
+    finally:
+        _local.primary -= 1
+
+
+def _is_pinned(request, now):
+    if getattr(_local, "primary", 0):
+        return True
+    with _lock:
+        if now - _session_writes.get(_writer_key(), float("-inf")) < PIN_SECONDS:
+            return True
+        last_write = max((_table_writes.get(table, float("-inf")) for table in cache.tables_read(request) | {cache.ALL_TABLES}), default=float("-inf"))
+    return now - last_write < PIN_SECONDS
+
+
+def _record_write(request, now):
+    if request.root == "rpc":
+        tables = cache.RPC_WRITES.get(request.table) or {cache.ALL_TABLES}
+    else:
+        tables = {request.table}
+    with _lock:
+        _session_writes[_writer_key()] = now
+        for table in tables:
+            _table_writes[table] = now
+        _stats["writes"] += 1
+        # Forget pins that have expired so the maps stay small.
+        if len(_session_writes) > 1000:
+            for key in [key for key, at in _session_writes.items() if now - at >= PIN_SECONDS]:
+                del _session_writes[key]
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
+
+
+def route_queries(request, call_next):
+    """Query middleware: mark reads for the replica unless read-your-writes requires the primary."""
+    from database_client import has_read_replica
+
+    now = time.monotonic()
+    if not cache.is_read(request):
+        try:
+            return call_next(request)
+        finally:
+            _record_write(request, now)
+
+    if not has_read_replica() or request.table in PRIMARY_ONLY_TABLES:
+        key = "primary_reads"
+    elif _is_pinned(request, now):
+        key = "pinned_reads"
+    else:
+        key = "replica_reads"
+        request.target = "replica"
+    with _lock:
+        _stats[key] += 1
+    return call_next(request)
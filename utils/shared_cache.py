@@ -0,0 +1,125 @@
+"""
+Process-wide cache for large read-only data that pages used to keep in session state.
+
+Every session reading the same key shares one frozen copy (lists become tuples, dicts become
+read-only mappings), and each session that read it is recorded as a holder until it leaves
+the page that read it (page_registry "shared_keys", see release()) or the session ends. When
+the total size passes MAX_BYTES, entries no live session holds go first, least recently used
+first, then the least recently used of the rest (whose holders simply reload on next access).
+Entries are tagged with the tables they were loaded from and dropped when the query cache
+sees a write to one of them, or after TTL seconds.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils import cache, memory
+
+MAX_BYTES = int(float(os.environ.get("GMS_SHARED_CACHE_MB", "64")) * 1024 * 1024)
+TTL = float(os.environ.get("GMS_SHARED_CACHE_TTL", "300"))  # picks up writes made by other processes
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> _Entry
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+class _Entry:
+    __slots__ = ("value", "size", "tables", "holders", "expires_at")
+
+    def __init__(self, value, size, tables):
+        self.value = value
+        self.size = size
+        self.tables = set(tables)
+        self.holders = set()
+        self.expires_at = time.monotonic() + TTL
+
+
+def freeze(value):
+    """Read-only copy of nested lists/dicts/sets."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _holder():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def get(key, loader, tables=()):
+    """Return the shared value for `key`, calling loader() on a miss. `tables` are the tables it reads."""
+    holder = _holder()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            if holder:
+                entry.holders.add(holder)
+            return entry.value
+        _stats["misses"] += 1
+
+    value = freeze(loader())
+    entry = _Entry(value, memory.deep_sizeof(value), tables)
+    if holder:
+        entry.holders.add(holder)
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        _evict()
+    return value
+
+
+def release(prefix, holder=None):
+    """Drop a session's reference to every key starting with the tuple `prefix` (the current session by default)."""
+    holder = holder or _holder()
+    with _lock:
+        for key, entry in _entries.items():
+            if key[:len(prefix)] == prefix:
+                entry.holders.discard(holder)
+
+
+def _total():
+    return sum(entry.size for entry in _entries.values())
+
+
+def _evict():
+    if _total() <= MAX_BYTES:
+        return
+    live = memory.live_session_ids()
+    if live is not None:  # without a session list, holders stay as they are
+        for entry in _entries.values():
+            entry.holders &= live
+    for key in [key for key, entry in _entries.items() if not entry.holders] + list(_entries):
+        if _total() <= MAX_BYTES or len(_entries) <= 1:
+            break
+        if _entries.pop(key, None) is not None:
+            _stats["evictions"] += 1
+
+
+def invalidate(tables=None):
+    """Drop entries read from `tables` (all entries when None)."""
+    with _lock:
+        for key in [key for key, entry in _entries.items() if tables is None or entry.tables & set(tables)]:
+            del _entries[key]
+
+
+def stats():
+    with _lock:
+        return dict(
+            _stats,
+            entries=len(_entries),
+            bytes=_total(),
+            max_bytes=MAX_BYTES,
+            detail=[(str(key), entry.size, len(entry.holders)) for key, entry in _entries.items()],
+        )
+
+
+cache.add_invalidation_listener(invalidate)
@@ -0,0 +1,118 @@
+"""
+Single-flight coalescing of identical concurrent reads (query middleware).
+
+When several sessions issue the same read at the same moment (everyone opening the overview
+at 8 AM), the first becomes the leader and goes to the backend; the others wait for its
+response and each get their own copy of the rows. Nothing is kept once the leader finishes,
+so this never serves older data than a fresh request would:
+
+* reads are keyed by the recorded query, the route (primary or replica) and the write
+  generation of every table they read, so a read issued after a write never joins a flight
+  that started before it;
+* a follower waits at most WAIT_SECONDS, then sends its own request;
+* the leader's error is raised in every follower, except when the leader was cancelled by a
+  rerun, in which case followers send their own request;
+* a follower whose own run is superseded while waiting stops like any other read.
+
+stats() reports leaders, followers and the coalescing ratio (followers / all reads seen).
+"""
+import os
+import threading
+import time
+from concurrent.futures import CancelledError
+
+from utils import cache, query_metrics
+
+WAIT_SECONDS = float(os.environ.get("GMS_SINGLEFLIGHT_WAIT", "10"))
+POLL_SECONDS = 0.05  # followers check between slices whether their own run was superseded
+
+_lock = threading.Lock()
+_flights = {}  # key -> _Flight
+_stats = {"leaders": 0, "followers": 0, "timeouts": 0, "shared_errors": 0}
+
+
+class _Flight:
+    __slots__ = ("done", "response", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.followers = 0
+
+
+def stats():
+    with _lock:
+        seen = _stats["leaders"] + _stats["followers"]
+        return dict(_stats, in_flight=len(_flights), ratio=_stats["followers"] / seen if seen else 0.0)
+
+
+def _lead(key, flight, request, call_next):
+    try:
+        response = call_next(request)
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            if _flights.get(key) is flight:
+                del _flights[key]
+            followers = flight.followers
+        if followers and flight.error is None:
+            # Followers copy from a private snapshot; the leader's caller may mutate its rows.
+            flight.response = cache.clone(response)
+        flight.done.set()
+    return response
+
+
+def coalesce_reads(request, call_next):
+    """Query middleware: identical concurrent reads share one backend request."""
+    if not cache.is_read(request) or request.table in cache.UNCACHED_TABLES:
+        return call_next(request)
+
+    key = (request.target,) + cache.version_key(request)
+    with _lock:
+        flight = _flights.get(key)
+        if flight is None:
+            flight = _flights[key] = _Flight()
+            _stats["leaders"] += 1
+            leader = True
+        else:
+            flight.followers += 1
+            _stats["followers"] += 1
+            leader = False
+
+    if leader:
+        return _lead(key, flight, request, call_next)
+
+    deadline = time.monotonic() + WAIT_SECONDS
+    while not flight.done.wait(POLL_SECONDS):
+        request.stop_if_superseded()
+        if time.monotonic() >= deadline:
+            with _lock:
+                _stats["timeouts"] += 1
+            return call_next(request)
+    if isinstance(flight.error, CancelledError) or not isinstance(flight.error, (Exception, type(None))):
+        # The leader's run was superseded (rerun, stop); that says nothing about this read.
+        return call_next(request)
+    if flight.error is not None:
+        with _lock:
+            _stats["shared_errors"] += 1
+        raise flight.error
+    return cache.clone(flight.response)
+
+
+def _prometheus_lines():
+    current = stats()
+    return [
+        "# HELP gms_singleflight_reads_total Reads that led a backend request or joined one already in flight.",
+        "# TYPE gms_singleflight_reads_total counter",
+        f'gms_singleflight_reads_total{{role="leader"}} {current["leaders"]}',
+        f'gms_singleflight_reads_total{{role="follower"}} {current["followers"]}',
+        "# HELP gms_singleflight_timeouts_total Followers that stopped waiting and sent their own request.",
+        "# TYPE gms_singleflight_timeouts_total counter",
+        f"gms_singleflight_timeouts_total {current['timeouts']}",
+    ]
+
+
+query_metrics.add_collector(_prometheus_lines)
@@ -0,0 +1,60 @@
+"""
+Per-table write stamps shared by every worker process on the host.
+
+SHARED_DIR/stamps/<table> holds a random token that any process writing the table replaces
+(ALL_TABLES after a write with unknown effects). Data remembered together with the stamps of
+the tables it was read from is stale as soon as one of them differs, whichever process wrote.
+"""
+import os
+import tempfile
+import threading
+import uuid
+
+SHARED_DIR = os.environ.get("GMS_SHARED_DIR", os.path.join(tempfile.gettempdir(), "gms_shared"))
+ALL_TABLES = "*"
+
+
+def path(*parts):
+    return os.path.join(SHARED_DIR, *parts)
+
+
+def ensure_dir(*parts):
+    """
+    Create SHARED_DIR (private to this user: it holds session revocations and data snapshots)
+    and the subdirectory `parts`. Refuses a SHARED_DIR another user created first.
+    """
+    os.makedirs(SHARED_DIR, mode=0o700, exist_ok=True)
+    info = os.stat(SHARED_DIR)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"{SHARED_DIR} belongs to another user; set GMS_SHARED_DIR to a private directory.")
+    if info.st_mode & 0o077:
+        os.chmod(SHARED_DIR, 0o700)
+    if parts:
+        os.makedirs(path(*parts), mode=0o700, exist_ok=True)
+
+
+def write_atomic(file_path, text):
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp_path, file_path)
+
+
+def read(table):
+    try:
+        with open(path("stamps", table), encoding="utf-8") as fh:
+            return fh.read().strip()
+    except FileNotFoundError:
+        return "0"
+
+
+def current(tables):
+    """{table: stamp} for `tables` plus ALL_TABLES."""
+    return {table: read(table) for table in sorted(set(tables) | {ALL_TABLES})}
+
+
+def bump(tables=None):
+    """Mark `tables` (all tables when None) as written, for every worker on this host."""
+    ensure_dir("stamps")
+    for table in (tables if tables is not None else [ALL_TABLES]):
+        write_atomic(path("stamps", table), uuid.uuid4().hex)
@@ -1,10 +1,16 @@
-from faker import Faker
 import random
+from functools import lru_cache
 from database_client import supabase
 
-faker = Faker()
+
+@lru_cache(maxsize=1)
+def _faker():
+    # Faker is slow to import and to instantiate; only the dev buttons need it.
+    from faker import Faker
+    return Faker()
 
 def generate_fake_students(n=10):
+    faker = _faker()
     year_levels = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
     enrollment_status = ["Enrolled", "Not Enrolled", "Graduated", "Dropped"]
     programs = ["BSCS", "BSIT", "BSEd"]
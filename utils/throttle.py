@@ -0,0 +1,53 @@
+"""
+Token-bucket rate limiting keyed by an arbitrary string (user ID, client IP, ...).
+
+Each key gets `capacity` tokens that refill at `rate` tokens per second; take() spends one
+and returns 0, or returns the seconds until one is available; refund() gives one back. Buckets that have refilled
+completely are forgotten, so memory stays bounded by the keys that are actually throttled.
+"""
+import threading
+import time
+
+
+class TokenBuckets:
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def _tokens(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def take(self, key):
+        """Spend one token for `key`. Returns 0 on success, else seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0
+
+    def refund(self, key):
+        """Give back a token spent by take() (e.g. for an attempt that turned out fine)."""
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                self._buckets[key] = (min(self.capacity, self._tokens(key, now) + 1), now)
+
+    def _prune(self, now):
+        for key in [key for key in self._buckets if self._tokens(key, now) >= self.capacity]:
+            del self._buckets[key]
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
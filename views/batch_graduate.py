@@ -1,11 +1,8 @@
 import streamlit as st
-import pandas as pd
-from services.enrollment_service import (
-    get_all_semesters,
-    get_all_enrollments,
-    update_student_status,
-)
-from database_client import supabase
+from services.enrollment_service import get_all_enrollments_frame
+from services.calendar_service import get_calendar
+from utils.jobs import submit_job, chunk_items
+from views.jobs import job_progress
 
 def show():
 
@@ -15,13 +12,12 @@ def show():
     # -------------------------
     # Fetch semesters and enrollments
     # -------------------------
-    semesters = get_all_semesters()
-    semester_options = {f"{sem['schoolyear']} {sem['term']}": sem["semesterid"] for sem in semesters}
+    semester_options = get_calendar().options(newest_first=True)
 
     selected_sem_key = st.selectbox("Select Semester (Graduating Batch)", list(semester_options.keys()))
     selected_sem_id = semester_options[selected_sem_key]
 
-    all_enrollments = pd.DataFrame(get_all_enrollments())
+    all_enrollments = get_all_enrollments_frame()
 
     if all_enrollments.empty:
         st.warning("No enrollment records found.")
@@ -74,30 +70,18 @@ def show():
     # Graduation Process
     # -------------------------
     if st.button("🎓 Mark Selected Students as Graduated"):
-        success_count = 0
-        failed_students = []
-
-        for student_name in students_to_graduate:
-            student = graduating_df[graduating_df["studentname"] == student_name].iloc[0]
-            student_id = student["studentid"]
-
-            try:
-                update_student_status(
-                    student_id=student_id,
-                    program=student["program"],
-                    yearlevel="Graduated",
-                    remarks="Graduated",
-                    status="Graduated"
-                )
-                # Optionally, you can update 'enrollments' remarks too, via Supabase:
-                supabase.table("enrollments").update({"remarks": "Graduated"}).eq("studentid", student_id).eq("semesterid", selected_sem_id).execute()
-                success_count += 1
-            except Exception as e:
-                failed_students.append((student_name, f"Update error: {str(e)}"))
-
-        if success_count > 0:
-            st.success(f"✅ Successfully marked {success_count} students as Graduated.")
-        if failed_students:
-            st.error("❌ Failed to update for:")
-            for name, error in failed_students:
-                st.write(f"- {name}: {error}")
+        selected = graduating_df[graduating_df["studentname"].isin(students_to_graduate)]
+        students = selected[["studentid", "studentname"]].drop_duplicates("studentid")
+
+        st.session_state["graduate_job_id"] = submit_job(
+            "graduate_students",
+            chunk_items(list(zip(students["studentid"], students["studentname"]))),
+            params={"semester_id": selected_sem_id},
+            label=f"Graduate {len(students)} students in {selected_sem_key}",
+        )
+
+    if st.session_state.get("graduate_job_id"):
+        job_progress(st.session_state["graduate_job_id"])
+        if st.button("📋 Open Jobs page"):
+            st.session_state.page = "jobs"
+            st.rerun()
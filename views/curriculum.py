@@ -8,7 +8,6 @@ from services.curriculum_service import (
 )
 from services.program_service import get_all_programs
 from services.program_service import get_all_programs, add_program, delete_program
-from utils.student_fake_data import insert_fake_curriculum_data
 
 
 def show():
@@ -27,6 +26,7 @@ def show():
     # -------------------------
     with st.expander("💾 Developer: Insert Fake Data for Testing"):
         if st.button("➕ Insert Fake Curriculum Subjects"):
+            from utils.student_fake_data import insert_fake_curriculum_data  # dev tooling, loaded on demand
             insert_fake_curriculum_data()
             st.success("Fake curriculum subjects inserted.")
             st.rerun()
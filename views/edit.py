@@ -2,20 +2,21 @@ import streamlit as st
 import pandas as pd
 from services.enrollment_service import (
     get_all_students,
-    get_all_enrollments,
+    get_all_enrollments_frame,
     update_enrollment_status_and_remarks,
 )
-from services.student_service import update_student_info
+from services.student_service import update_student_info, changed_fields
 from services.grades_service import upsert_grade, get_student_gwa_summary
 from services.curriculum_service import get_all_curriculum_subjects
-from services.semester_service import get_all_semesters
+from services.calendar_service import calendar_from_frame
+from utils.export_buttons import export_buttons
 from database_client import supabase
 
-st.set_page_config(page_title="Edit Student Info", layout="wide")
-st.title("Edit Student Information")
-
 def show():
 
+    st.set_page_config(page_title="Edit Student Info", layout="wide")
+    st.title("Edit Student Information")
+
     # --- Cache Student List Once ---
     students = pd.DataFrame(get_all_students())
     students["fullname"] = students["firstname"] + " " + students["lastname"]
@@ -38,19 +39,20 @@ def show():
     selected_student = students.loc[students["studentid"] == student_id].squeeze()
 
     # --- Enrollment Data ---
-    enrollments = pd.DataFrame(get_all_enrollments())
+    enrollments = get_all_enrollments_frame()
     if enrollments.empty:
-        enrollments = pd.DataFrame(columns=["studentid", "schoolyear", "semester_term", "curriculumid", "enrollmentid", "subjectname", "grade"])
+        enrollments = pd.DataFrame(columns=["studentid", "semesterid", "schoolyear", "semester_term", "curriculumid", "enrollmentid", "subjectname", "grade"])
 
     student_enrollments = enrollments[enrollments["studentid"] == student_id]
+    calendar = calendar_from_frame(student_enrollments)
 
     school_year = None
     semester_term = None
 
-    if not student_enrollments.empty:
-        latest_enrollment = student_enrollments.sort_values("schoolyear", ascending=False).iloc[0]
-        school_year = latest_enrollment["schoolyear"]
-        semester_term = latest_enrollment["semester_term"]
+    latest_semester = calendar.latest()
+    if latest_semester is not None:
+        school_year = latest_semester["schoolyear"]
+        semester_term = latest_semester["term"]
 
     tabs = st.tabs(["Overview", "Grades", "Edit Info"])
 
@@ -83,6 +85,9 @@ def show():
             col2.metric("Latest Enrollment", f"{school_year} {semester_term}")
             col3.metric("Overall GWA", gwa_overall)
 
+            with st.expander("📤 Export Transcript"):
+                export_buttons("transcripts", f"transcript_{student_id}", key=f"transcript_{student_id}", student_id=student_id)
+
 
     with tabs[1]:
         st.header("Edit Grades by Semester")
@@ -95,6 +100,7 @@ def show():
                 f"{row['schoolyear']} {row['semester_term']}": row["semesterid"]
                 for _, row in student_enrollments.drop_duplicates(subset=["semesterid"]).iterrows()
             }
+            semester_options = {key: semester_options[key] for key in calendar.sort(semester_options, newest_first=True)}
 
             selected_semester_display = st.selectbox("Select Semester", list(semester_options.keys()))
             selected_semester_id = semester_options[selected_semester_display]
@@ -109,6 +115,7 @@ def show():
             else:
                 st.caption(f"Editing Grades for: **{selected_semester_display}**")
 
+                original_grades = {}
                 edited_grades = {}
                 for _, row in current_sem.iterrows():
                     subject = row["subjectname"]
@@ -121,28 +128,42 @@ def show():
                         index=allowed_grades.index(grade) if grade in allowed_grades else 0,
                         key=row["enrollmentid"]
                     )
+                    original_grades[row["enrollmentid"]] = grade if grade in allowed_grades else ""
                     edited_grades[row["enrollmentid"]] = new_grade
 
                 # --- Save Grades Button (OUTSIDE LOOP)
                 if st.button("💾 Save Grades for this Semester"):
-                    update_enrollment_status_and_remarks(
-                        student_id=student_id,
-                        semester_id=selected_semester_id,
-                        enrollment_status="Enrolled - Regular",  # Or fetch dynamically if needed
-                        remarks="Regular"
+                    # Only grades that were changed, and the status only if it is not already set
+                    grade_changes = changed_fields(original_grades, edited_grades)
+                    status_changed = (
+                        (current_sem["enrollmentstatus"] != "Enrolled - Regular").any()
+                        or (current_sem["remarks"] != "Regular").any()
                     )
 
-                    for enrollment_id, grade in edited_grades.items():
-                        upsert_grade(enrollment_id, grade)
+                    if not grade_changes and not status_changed:
+                        st.info("No changes to save.")
+                    else:
+                        if status_changed:
+                            update_enrollment_status_and_remarks(
+                                student_id=student_id,
+                                semester_id=selected_semester_id,
+                                enrollment_status="Enrolled - Regular",  # Or fetch dynamically if needed
+                                remarks="Regular"
+                            )
 
-                    st.success(f"✅ Grades updated for {selected_semester_display}!")
-                    st.rerun()
+                        for enrollment_id, grade in grade_changes.items():
+                            upsert_grade(enrollment_id, grade)
+
+                        st.success(f"✅ Grades updated for {selected_semester_display}!")
+                        st.rerun()
 
 
     with tabs[2]:
         st.header("Edit Student Information")
         st.markdown("<br>", unsafe_allow_html=True)
 
+        # Values as first shown in the form; only fields that differ from them are saved.
+        original_info = {}
         updated_info = {}
         new_status = selected_student.get("status", "")
 
@@ -158,6 +179,7 @@ def show():
                 except:
                     value = None
 
+                original_info[col] = (value if value else pd.to_datetime("2000-01-01")).strftime("%Y-%m-%d")
                 updated_info[col] = st.date_input(
                     "Date of Birth",
                     value=value if value else pd.to_datetime("2000-01-01"),
@@ -166,15 +188,18 @@ def show():
 
             elif col == "dl_applicable":
                 dl_value = "Yes" if value else "No"
+                original_info[col] = (dl_value == "Yes")
                 new_dl = st.selectbox("DL Applicable", ["Yes", "No"], index=0 if dl_value == "Yes" else 1)
                 updated_info[col] = (new_dl == "Yes")
 
             elif col == "laude_applicable":
                 laude_value = "Yes" if value else "No"
+                original_info[col] = (laude_value == "Yes")
                 new_laude = st.selectbox("Laude Applicable", ["Yes", "No"], index=0 if laude_value == "Yes" else 1)
                 updated_info[col] = (new_laude == "Yes")
 
             elif col == "status":
+                original_info[col] = "Regular" if str(value) == "Regular" else "Irregular"
                 new_status = st.selectbox(
                     "Status",
                     options=["Regular", "Irregular"],
@@ -183,30 +208,33 @@ def show():
                 updated_info[col] = new_status
 
             else:
+                original_info[col] = str(value)
                 updated_info[col] = st.text_input(f"{col.capitalize()}", value=str(value))
 
         updated_info["status"] = new_status  # Ensure latest selected status is stored.
+        original_info.setdefault("status", selected_student.get("status", ""))
 
         if st.button("💾 Save Changes"):
-            update_student_info(
-                student_id=student_id,
-                data=updated_info
-            )
+            changes = changed_fields(original_info, updated_info)
+            if not changes:
+                st.info("No changes to save.")
+            else:
+                update_student_info(
+                    student_id=student_id,
+                    data=changes
+                )
 
-            if not student_enrollments.empty and school_year is not None:
-                semesters = pd.DataFrame(get_all_semesters())
-                semester_row = semesters[(semesters["schoolyear"] == school_year) & (semesters["term"] == semester_term)]
-                if not semester_row.empty:
-                    semester_id = semester_row.iloc[0]["semesterid"]
+                # Enrollment status and remarks follow the student's status; leave them alone otherwise.
+                if "status" in changes and latest_semester is not None:
                     update_enrollment_status_and_remarks(
                         student_id=student_id,
-                        semester_id=semester_id,
-                        enrollment_status=f"Enrolled - {updated_info['status']}",
-                        remarks=updated_info["status"]
+                        semester_id=latest_semester["semesterid"],
+                        enrollment_status=f"Enrolled - {changes['status']}",
+                        remarks=changes["status"]
                     )
 
-            st.success("✅ Changes saved successfully!")
-            st.rerun()
+                st.success("✅ Changes saved successfully!")
+                st.rerun()
 
         if st.button("🗑️ Delete Student"):
             supabase.table("students").delete().eq("studentid", student_id).execute()
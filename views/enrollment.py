@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
 from services.enrollment_service import (
-    get_all_students,
-    get_all_semesters,
     get_curriculum_subjects,
     add_enrollment,
     update_student_status,
@@ -11,7 +9,9 @@ from services.enrollment_service import (
     delete_all_enrollments_for_student_semester,
     get_subjects_for_semester,
 )
-from services.program_service import get_all_programs
+from services.page_bundle_service import get_page_bundle
+from services.calendar_service import AcademicCalendar, sort_school_years, sort_terms
+from utils import shared_cache
 
 def show():
     
@@ -20,8 +20,11 @@ def show():
 
     tab1, tab2, tab3 = st.tabs(["➕ Enroll Student", "📋 View Enrollments", "🗑️ Delete Enrollments"])
 
+    # Programs, students and semesters in one round trip
+    bundle = get_page_bundle("enrollment")
+
     # Fetch programs for dropdown
-    programs_data = get_all_programs()
+    programs_data = bundle["programs"]
     program_options = [p["program_name"] for p in programs_data] if programs_data else []
 
     # -------------------------
@@ -30,14 +33,15 @@ def show():
     with tab1:
         st.header("Enroll Student")
 
-        students = get_all_students()
-        semesters = get_all_semesters()
+        students = bundle["students"]
+        semesters = bundle["semesters"]
 
         # Exclude Dropped and Graduated students
         filtered_students = [s for s in students if s.get('enrollmentstatus') not in ['Dropped', 'Graduated']]
 
         student_options = {f"{s['firstname']} {s['lastname']}": s["studentid"] for s in filtered_students}
-        semester_options = {f"{sem['schoolyear']} {sem['term']}": sem["semesterid"] for sem in semesters}
+        calendar = AcademicCalendar(semesters)
+        semester_options = calendar.options(newest_first=True)
 
         student_name = st.selectbox("Select Student", list(student_options.keys()))
         enrollment_type = st.radio("Enrollment Type", ["Regular", "Irregular"])
@@ -167,8 +171,8 @@ def show():
                     help="Select a program to view all its available subjects"
                 )
 
-                # Load all subjects once (if not cached yet)
-                if f"all_subjects_{program}" not in st.session_state:
+                # Load all subjects once per process (shared by every session, not kept in session state)
+                def load_program_subjects():
                     all_subjects = []
                     year_levels = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
                     terms = ["1st Semester", "2nd Semester", "Summer"]
@@ -181,9 +185,9 @@ def show():
                                     subject["year_level"] = year_level
                                     subject["term"] = sub_term
                                     all_subjects.append(subject)
-                    st.session_state[f"all_subjects_{program}"] = all_subjects
+                    return all_subjects
 
-                all_subjects = st.session_state[f"all_subjects_{program}"]
+                all_subjects = shared_cache.get(("all_subjects", program), load_program_subjects, tables={"curriculum_subjects"})
 
                 # Search and Select
                 st.subheader(f"Available Subjects for {program}")
@@ -323,8 +327,8 @@ def show():
             col1, col2, col3, col4, col5 = st.columns(5)
             programs = ["All"] + sorted(df["Program"].unique().tolist())
             years = ["All"] + sorted(df["Year Level"].unique().tolist())
-            school_years = ["All"] + sorted(df["School Year"].unique().tolist())
-            terms = ["All"] + sorted(df["Semester Term"].unique().tolist())
+            school_years = ["All"] + sort_school_years(df["School Year"].dropna().unique())
+            terms = ["All"] + sort_terms(df["Semester Term"].dropna().unique())
             statuses = ["All"] + sorted(df["Status"].unique().tolist())
 
             selected_program = col1.selectbox("Program", programs)
@@ -388,7 +392,7 @@ def show():
                 "enrollmentid": "Enrollment ID"
             }, inplace=True)
 
-            students = get_all_students()
+            students = bundle["students"]
 
             # ✅ Only students with Enrolled status
             enrolled_students = [s for s in students if s.get('enrollmentstatus', '').startswith('Enrolled')] 
@@ -412,9 +416,9 @@ def show():
                 st.stop()
 
             # ✅ Get semesters
-            semester_keys = student_df.apply(
+            semester_keys = calendar.sort(student_df.apply(
                 lambda row: f"{row['School Year']} {row['Semester Term']}", axis=1
-            ).unique().tolist()
+            ).unique().tolist(), newest_first=True)
 
             if not semester_keys:
                 st.info(f"No semesters found for {selected_student_display}")
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from database_client import supabase
+from services.calendar_service import calendar_from_frame
 
 def show():
         
@@ -24,14 +25,7 @@ def show():
     enrollments_response = supabase.table("enrollments_view").select("*").execute()
     enrollments_df = pd.DataFrame(enrollments_response.data if enrollments_response.data else [])
 
-    schoolyear_semesters = sorted(
-        enrollments_df[["schoolyear", "semester_term"]]
-        .dropna()
-        .drop_duplicates()
-        .apply(lambda row: f"{row['schoolyear']} {row['semester_term']}", axis=1)
-        .tolist(),
-        reverse=True
-    )
+    schoolyear_semesters = list(calendar_from_frame(enrollments_df).options(newest_first=True))
 
     # -------------------------
     # Filters Above Table
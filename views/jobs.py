@@ -0,0 +1,91 @@
+import streamlit as st
+from datetime import datetime
+from utils import jobs
+
+REFRESH_SECONDS = 2
+
+STATUS_ICONS = {
+    "queued": "⏳",
+    "running": "🔄",
+    "done": "✅",
+    "failed": "❌",
+    "cancelled": "🚫",
+}
+
+
+def _render_job(job, expanded=False):
+    total = len(job["items"]) or 1
+    results = job["results"]
+    created = datetime.fromtimestamp(job["created"]).strftime("%Y-%m-%d %H:%M:%S")
+
+    with st.container(border=True):
+        st.markdown(f"**{STATUS_ICONS.get(job['status'], '')} {job['label']}** · {job['status']} · started {created}")
+        st.progress(job["done"] / total, text=f"{job['done']} / {len(job['items'])} batches")
+        st.caption(
+            f"{len(results['succeeded'])} succeeded · {len(results['skipped'])} skipped · {len(results['failed'])} failed"
+            + (f" · resumed {job['resumed']}×" if job.get("resumed") else "")
+        )
+        if job.get("error"):
+            st.error(job["error"])
+        if job["status"] in jobs.ACTIVE:
+            if st.button("Cancel", key=f"cancel_job_{job['id']}"):
+                jobs.cancel_job(job["id"])
+                st.rerun()
+            return
+        if job["status"] in jobs.RESUMABLE and job["done"] < len(job["items"]):
+            if st.button("Resume", key=f"resume_job_{job['id']}"):
+                jobs.resume_job(job["id"])
+                st.rerun()
+        if results["skipped"] or results["failed"] or results["succeeded"]:
+            with st.expander("Results", expanded=expanded):
+                if results["succeeded"]:
+                    st.success("Succeeded:\n\n" + "\n".join(f"- {name}" for name in results["succeeded"]))
+                if results["skipped"]:
+                    st.warning("Skipped:\n\n" + "\n".join(f"- {name}" for name in results["skipped"]))
+                if results["failed"]:
+                    st.error("Failed:\n\n" + "\n".join(f"- {name}" for name in results["failed"]))
+
+
+def job_progress(job_id):
+    """Live progress of one job; refreshes itself (not the whole page) while the job runs."""
+    job = jobs.load_job(job_id)
+    if job is None:
+        return
+
+    @st.fragment(run_every=REFRESH_SECONDS if job["status"] in jobs.ACTIVE else None)
+    def _progress():
+        current = jobs.load_job(job_id)
+        if current is None:
+            return
+        _render_job(current, expanded=True)
+        if current["status"] not in jobs.ACTIVE and job["status"] in jobs.ACTIVE:
+            st.rerun()  # finished: drop the refresh timer
+
+    _progress()
+
+
+def show():
+
+    st.set_page_config(page_title="Background Jobs", layout="wide")
+    st.title("Background Jobs")
+    jobs.ensure_started()
+
+    all_jobs = jobs.list_jobs()
+    if not all_jobs:
+        st.info("No jobs yet. Migrations and batch graduations run here in the background.")
+        return
+
+    # -------------------------
+    # Job list (auto-refreshing while anything runs)
+    # -------------------------
+    active = any(job["status"] in jobs.ACTIVE for job in all_jobs)
+
+    @st.fragment(run_every=REFRESH_SECONDS if active else None)
+    def _job_list():
+        current = jobs.list_jobs()
+        for job in current:
+            _render_job(job)
+        if active and not any(job["status"] in jobs.ACTIVE for job in current):
+            st.rerun()
+
+    _job_list()
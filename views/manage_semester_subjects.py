@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
 from database_client import supabase
-from services.enrollment_service import get_all_semesters
-from services.curriculum_service import get_all_curriculum_subjects
+from services.page_bundle_service import get_page_bundle
+from services.calendar_service import AcademicCalendar, sort_terms
 import uuid
 
 def show():
@@ -13,9 +13,10 @@ def show():
     # -------------------------------
     # Load Data
     # -------------------------------
-    semesters = get_all_semesters()
-    semester_options = {f"{sem['schoolyear']} {sem['term']}": sem["semesterid"] for sem in semesters}
-    curriculum_subjects = get_all_curriculum_subjects()
+    bundle = get_page_bundle("semester_subject")
+    semesters = bundle["semesters"]
+    semester_options = AcademicCalendar(semesters).options(newest_first=True)
+    curriculum_subjects = bundle["curriculum_subjects"]
     curriculum_df = pd.DataFrame(curriculum_subjects)
 
     # Ensure curriculum_df has a 'curriculum_semester' column like "1st Year 1st Sem"
@@ -30,7 +31,7 @@ def show():
     # -------------------------------
     # Choose Curriculum Semester First
     # -------------------------------
-    curriculum_semesters = sorted(curriculum_df["term"].dropna().unique())
+    curriculum_semesters = sort_terms(curriculum_df["term"].dropna().unique())
     selected_curriculum_sem = st.selectbox("Filter Subjects By Curriculum Semester", curriculum_semesters)
 
     # -------------------------------
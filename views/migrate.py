@@ -1,24 +1,29 @@
 import streamlit as st
-import pandas as pd
 from services.enrollment_service import (
-    get_all_semesters,
-    get_all_enrollments,
+    get_all_enrollments_frame,
     get_curriculum_subjects,
     add_enrollment,
     update_student_status,
-    migrate_student_to_semester_subjects
 )
+from services.calendar_service import get_calendar, semester_key
+from utils.jobs import submit_job, chunk_items
+from views.jobs import job_progress
 
 def show():
 
     st.set_page_config(page_title="Batch Enrollment Migration", layout="wide")
     st.title("Batch Enroll Students from One Semester to Another")
 
-    semesters = get_all_semesters()
-    semester_options = {f"{sem['schoolyear']} {sem['term']}": sem["semesterid"] for sem in semesters}
+    calendar = get_calendar()
+    semester_options = calendar.options(newest_first=True)
+    semester_keys = list(semester_options.keys())
 
-    source_sem_key = st.selectbox("Select SOURCE Semester (where students are enrolled)", list(semester_options.keys()))
-    target_sem_key = st.selectbox("Select TARGET Semester (to enroll students into)", list(semester_options.keys()))
+    # Defaults: from the term before the latest into the latest
+    latest = calendar.latest()
+    previous = calendar.previous(latest["semesterid"]) if latest else None
+    source_index = semester_keys.index(semester_key(previous["schoolyear"], previous["term"])) if previous else 0
+    source_sem_key = st.selectbox("Select SOURCE Semester (where students are enrolled)", semester_keys, index=source_index)
+    target_sem_key = st.selectbox("Select TARGET Semester (to enroll students into)", semester_keys)
 
     if source_sem_key == target_sem_key:
         st.warning("Source and Target semester cannot be the same.")
@@ -27,8 +32,7 @@ def show():
     source_sem_id = semester_options[source_sem_key]
     target_sem_id = semester_options[target_sem_key]
 
-    all_enrollments = get_all_enrollments()
-    df_enrollments = pd.DataFrame(all_enrollments)
+    df_enrollments = get_all_enrollments_frame()
 
     if df_enrollments.empty:
         st.info("No enrollments found.")
@@ -73,12 +77,10 @@ def show():
     st.markdown(f"**Selected {len(students_to_migrate)} students to migrate from {source_sem_key} to {target_sem_key}.**")
 
     if st.button("🚀 Migrate Selected Students to Target Semester"):
-        success_count = 0
         skipped_students = []
-        failed_students = []
+        eligible = []
 
-        all_enrollments_latest = get_all_enrollments()
-        df_enrollments_latest = pd.DataFrame(all_enrollments_latest)
+        df_enrollments_latest = get_all_enrollments_frame()
 
         for student_name in students_to_migrate:
             student = students_in_source[students_in_source["studentname"] == student_name].iloc[0]
@@ -111,24 +113,23 @@ def show():
                 skipped_students.append(f"{student_name} (incomplete or dropped grades in source semester)")
                 continue
 
-            # ✅ Proceed with your function
-            try:
-                result_message = migrate_student_to_semester_subjects(student_id, target_sem_id)
-                if "Enrolled 0" in result_message:
-                    skipped_students.append(f"{student_name} (already enrolled in all subjects)")
-                else:
-                    success_count += 1
-            except Exception as e:
-                failed_students.append((student_name, f"Enrollment error: {str(e)}"))
-
-        # ✅ Results Feedback
-        if success_count > 0:
-            st.success(f"✅ Successfully migrated {success_count} students to {target_sem_key}.")
+            eligible.append((student_name, student_id))
+
+        # ✅ Enroll eligible students in the background; progress is shown on the Jobs page
+        if eligible:
+            job_id = submit_job(
+                "migrate_students",
+                chunk_items([(student_id, student_name) for student_name, student_id in eligible]),
+                params={"target_semester_id": target_sem_id},
+                label=f"Migrate {len(eligible)} students to {target_sem_key}",
+            )
+            st.session_state["migrate_job_id"] = job_id
+
         if skipped_students:
             st.warning(f"⚠️ Skipped:\n\n" + "\n".join(skipped_students))
-        if failed_students:
-            st.error("❌ Enrollment failed for:")
-            for name, error in failed_students:
-                st.write(f"- {name}: {error}")
-
 
+    if st.session_state.get("migrate_job_id"):
+        job_progress(st.session_state["migrate_job_id"])
+        if st.button("📋 Open Jobs page"):
+            st.session_state.page = "jobs"
+            st.rerun()
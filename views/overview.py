@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-from services.enrollment_service import get_all_regular_enrollments
+from services.enrollment_service import get_all_regular_enrollments_frame
 from services.student_service import get_all_students
-from services.grades_service import get_student_grades, calculate_gwa
+from services.grades_service import get_grades_for_students, calculate_gwa
+from services.calendar_service import calendar_from_frame, sort_school_years, sort_terms
+from utils.export_buttons import export_buttons
+from utils.profiler import checkpoint
 
 def show():
 
@@ -12,8 +15,8 @@ def show():
     # -------------------------
     # Fetch Data
     # -------------------------
-    data = get_all_regular_enrollments()
-    df = pd.DataFrame(data)
+    checkpoint("data load")
+    df = get_all_regular_enrollments_frame()
 
     if df.empty:
         st.warning("No data available.")
@@ -48,15 +51,19 @@ def show():
     # -------------------------
     # Filters
     # -------------------------
-    latest_school_year = sorted(df["schoolyear"].dropna().unique())[-1]
+    checkpoint("transform")
+    school_years = sort_school_years(df["schoolyear"].dropna().unique())
+    terms = sort_terms(df["semester_term"].dropna().unique())
+    latest_semester = calendar_from_frame(df).latest()
+    latest_school_year = latest_semester["schoolyear"] if latest_semester else school_years[-1]
     latest_year_level = sorted(df["yearlevel"].dropna().unique())[0]
-    latest_term = sorted(df["semester_term"].dropna().unique())[0]
+    latest_term = latest_semester["term"] if latest_semester else terms[0]
     latest_program = sorted(df["program"].dropna().unique())[0]
 
     col1, col2, col3, col4 = st.columns(4)
-    school_year_filter = col1.selectbox("School Year", sorted(df["schoolyear"].unique()), index=sorted(df["schoolyear"].unique()).index(latest_school_year))
+    school_year_filter = col1.selectbox("School Year", school_years, index=school_years.index(latest_school_year) if latest_school_year in school_years else len(school_years) - 1)
     year_level_filter = col2.selectbox("Year Level", sorted(df["yearlevel"].unique()), index=0)
-    semester_filter = col3.selectbox("Semester Term", sorted(df["semester_term"].unique()), index=0)
+    semester_filter = col3.selectbox("Semester Term", terms, index=terms.index(latest_term) if latest_term in terms else 0)
     program_filter = col4.selectbox("Program", sorted(df["program"].unique()), index=0)
 
     filtered_df = df[
@@ -108,9 +115,15 @@ def show():
     # -------------------------
     # Compute GWA via grades_service properly
     # -------------------------
+    # One batched grades fetch for every listed student instead of one request per student.
+    grades = get_grades_for_students(students["studentid"].unique())
+    grades_by_student = dict(tuple(grades.groupby("studentid", sort=False))) if not grades.empty else {}
+
     def get_student_gwa(student_id):
-        df_grades = get_student_grades(student_id)
-        gwa = calculate_gwa(df_grades, yearlevel=year_level_filter, semester_term=semester_filter)
+        df_grades = grades_by_student.get(student_id)
+        if df_grades is None:
+            return None
+        gwa = calculate_gwa(df_grades.copy(), yearlevel=year_level_filter, semester_term=semester_filter)
         if gwa == "--":
             return None
         return gwa
@@ -160,4 +173,21 @@ def show():
     # -------------------------
     # Final Display
     # -------------------------
+    checkpoint("render")
     st.dataframe(display_df, use_container_width=True)
+
+    # -------------------------
+    # Export
+    # -------------------------
+    checkpoint("export controls")
+    with st.expander("📤 Export Gradebook"):
+        export_scope = st.radio("Scope", ["Current filters", "Whole school"], horizontal=True, key="gradebook_export_scope")
+        filters = {}
+        if export_scope == "Current filters":
+            filters = {
+                "schoolyear": school_year_filter,
+                "yearlevel": year_level_filter,
+                "semester_term": semester_filter,
+                "program": program_filter,
+            }
+        export_buttons("gradebook", "gradebook", key="gradebook", **filters)
@@ -0,0 +1,77 @@
+import os
+import streamlit as st
+from services.enrollment_service import get_all_regular_enrollments_frame
+from services.calendar_service import sort_school_years
+from services.report_service import fetch_report_data, generate_reports, build_report_archive
+
+def show():
+
+    st.set_page_config(page_title="Grade Reports", layout="wide")
+    st.title("Batch Grade Reports (PDF)")
+
+    # -------------------------
+    # Filters
+    # -------------------------
+    df = get_all_regular_enrollments_frame()
+
+    if df.empty:
+        st.warning("No data available.")
+        st.stop()
+
+    col1, col2 = st.columns(2)
+    school_years = ["All"] + sort_school_years(df["schoolyear"].dropna().unique(), newest_first=True)
+    programs = ["All"] + sorted(df["program"].dropna().unique())
+    school_year_filter = col1.selectbox("School Year", school_years)
+    program_filter = col2.selectbox("Program", programs)
+
+    filters = {"regular_only": True}
+    if school_year_filter != "All":
+        filters["schoolyear"] = school_year_filter
+    if program_filter != "All":
+        filters["program"] = program_filter
+
+    st.caption("Reports are cached by the content of each student's grades; only students whose grades changed are re-rendered.")
+
+    # -------------------------
+    # Generate
+    # -------------------------
+    if st.button("🖨️ Generate Grade Reports"):
+        with st.spinner("Fetching grades..."):
+            student_data = fetch_report_data(**filters)
+
+        if not student_data:
+            st.info("No students match the selected filters.")
+            st.stop()
+
+        progress = st.progress(0.0, text="Rendering reports...")
+
+        def on_progress(done, total):
+            progress.progress(done / total if total else 1.0, text=f"Rendered {done} / {total} reports")
+
+        result = generate_reports(student_data, progress_callback=on_progress)
+
+        previous = st.session_state.pop("report_archive", None)
+        if previous and os.path.exists(previous["path"]):
+            os.remove(previous["path"])
+
+        st.session_state["report_archive"] = {
+            "path": build_report_archive(result["paths"], student_data),
+            "rendered": result["rendered"],
+            "cached": result["cached"],
+            "failed": result["failed"],
+        }
+
+    archive = st.session_state.get("report_archive")
+    if archive and os.path.exists(archive["path"]):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🖨️ Rendered", archive["rendered"])
+        col2.metric("♻️ Reused from Cache", archive["cached"])
+        col3.metric("❌ Failed", len(archive["failed"]))
+
+        if archive["failed"]:
+            st.error("❌ Failed to render:")
+            for student_id, error in archive["failed"]:
+                st.write(f"- {student_id}: {error}")
+
+        with open(archive["path"], "rb") as fh:
+            st.download_button("⬇️ Download Reports (ZIP)", data=fh, file_name="grade_reports.zip", mime="application/zip")
@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import date
 from services.semester_service import get_all_semesters, add_semester, delete_semester
+from services.calendar_service import AcademicCalendar
 import pandas as pd
 
 def show():
@@ -18,10 +19,10 @@ def show():
         semesters = get_all_semesters()
 
         if semesters:
-            df = pd.DataFrame(semesters)
+            # Newest first
+            df = pd.DataFrame(list(reversed(AcademicCalendar(semesters).semesters)))
             df["startdate"] = pd.to_datetime(df["startdate"]).dt.strftime("%Y-%m-%d")
             df["enddate"] = pd.to_datetime(df["enddate"]).dt.strftime("%Y-%m-%d")
-            df = df.sort_values(by="startdate", ascending=False)
 
             st.dataframe(df[["schoolyear", "term", "startdate", "enddate"]], use_container_width=True)
 
@@ -2,13 +2,13 @@ import streamlit as st
 from datetime import date
 from services.student_service import get_all_students, add_student
 from services.program_service import get_all_programs
-from utils.student_fake_data import generate_fake_students
+from services.roster_import_service import import_student_roster, REQUIRED_COLUMNS, STUDENT_COLUMNS, DEFAULT_CHUNK_SIZE
 
 def show():
 
     st.title("Students Management")
 
-    tab1, tab2 = st.tabs(["📋 View All Students", "➕ Add Student"])
+    tab1, tab2, tab3 = st.tabs(["📋 View All Students", "➕ Add Student", "📥 Import Roster"])
 
 
     # -------------------------
@@ -32,6 +32,7 @@ def show():
         st.header("⚙️ Developer Tools")
 
         if st.button("Add 10 Fake Students"):
+            from utils.student_fake_data import generate_fake_students  # dev tooling, loaded on demand
             generate_fake_students(10)
             st.success("10 fake students added successfully!")
 
@@ -62,3 +63,49 @@ def show():
             add_student(student_data)
             st.success(f"Student {student_data['firstname']} {student_data['lastname']} added successfully!")
             st.rerun()
+
+
+    # -------------------------
+    # Import Roster Tab
+    # -------------------------
+    with tab3:
+        st.header("Import Student Roster (CSV)")
+        st.caption(f"Required columns: {', '.join(REQUIRED_COLUMNS)}. Optional: {', '.join(c for c in STUDENT_COLUMNS if c not in REQUIRED_COLUMNS)}")
+
+        roster_file = st.file_uploader("Roster CSV", type=["csv"], key="roster_file")
+        import_mode = st.radio(
+            "Existing Student IDs",
+            ["Reject (insert new only)", "Update (upsert)"],
+            horizontal=True
+        )
+        chunk_size = st.number_input("Rows per chunk", min_value=50, max_value=5000, value=DEFAULT_CHUNK_SIZE, step=50)
+
+        if roster_file and st.button("🚀 Import Roster"):
+            progress = st.progress(0.0, text="Importing...")
+
+            def on_progress(rows_processed, fraction):
+                progress.progress(min(fraction or 0.0, 1.0), text=f"Processed {rows_processed} rows...")
+
+            try:
+                summary = import_student_roster(
+                    roster_file,
+                    mode="upsert" if import_mode.startswith("Update") else "insert",
+                    chunk_size=int(chunk_size),
+                    progress_callback=on_progress
+                )
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("✅ Inserted", summary["inserted"])
+            col2.metric("🔄 Updated", summary["updated"])
+            col3.metric("⚠️ Rejected", summary["rejected"])
+
+            if summary["reject_csv"]:
+                st.download_button(
+                    "⬇️ Download Rejected Rows",
+                    data=summary["reject_csv"],
+                    file_name="roster_rejects.csv",
+                    mime="text/csv"
+                )
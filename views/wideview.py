@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-from services.enrollment_service import get_all_regular_enrollments
-from services.grades_service import get_student_gwa_summary
+from services.enrollment_service import get_all_regular_enrollments_frame
+from services.grades_service import get_grades_for_students, summarize_gwa
+from services.calendar_service import sort_school_years
+from utils.export_buttons import export_buttons
+from utils.profiler import checkpoint
 
 def show():
 
@@ -12,7 +15,8 @@ def show():
     # -------------------------
     # Fetch Data
     # -------------------------
-    df = pd.DataFrame(get_all_regular_enrollments())
+    checkpoint("data load")
+    df = get_all_regular_enrollments_frame()
 
     if df.empty:
         st.warning("No data available.")
@@ -21,7 +25,7 @@ def show():
     # -------------------------
     # Filters
     # -------------------------
-    school_years = sorted(df["schoolyear"].dropna().unique(), reverse=True)
+    school_years = sort_school_years(df["schoolyear"].dropna().unique(), newest_first=True)
     programs = sorted(df["program"].dropna().unique())
     year_levels = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
 
@@ -41,12 +45,18 @@ def show():
     # -------------------------
     # Build Table via GWA Summary Service
     # -------------------------
+    checkpoint("transform")
     gwa_table = []
 
     student_names = filtered_df[["studentid", "studentname"]].drop_duplicates().values.tolist()
 
+    # One batched grades fetch for every listed student instead of one request per student.
+    grades = get_grades_for_students(student_id for student_id, _ in student_names)
+    grades_by_student = dict(tuple(grades.groupby("studentid", sort=False))) if not grades.empty else {}
+
     for student_id, student_name in student_names:
-        gwa_summary = get_student_gwa_summary(student_id)
+        student_grades = grades_by_student.get(student_id)
+        gwa_summary = summarize_gwa(student_grades) if student_grades is not None else {}
 
         gwa_row = {"Name": student_name}
         for year in year_levels:
@@ -68,6 +78,7 @@ def show():
     # -------------------------
     # Styling Highlights
     # -------------------------
+    checkpoint("render")
     def highlight_overall(s):
         return ['background-color: #fffbcc' if 'Overall' in c else '' for c in s.index]
 
@@ -77,3 +88,17 @@ def show():
     # Display
     # -------------------------
     st.dataframe(styled_df, use_container_width=True)
+
+    # -------------------------
+    # Export
+    # -------------------------
+    checkpoint("export controls")
+    export_filters = {"schoolyear": school_year_filter, "program": program_filter}
+    if year_filter != "All":
+        export_filters["yearlevel"] = year_filter
+
+    with st.expander("📤 Export GWA Table"):
+        export_buttons("gwa", f"gwa_{program_filter}_{school_year_filter}", key="gwa", **export_filters)
+
+    with st.expander("📤 Export Transcripts"):
+        export_buttons("transcripts", f"transcripts_{program_filter}_{school_year_filter}", key="transcripts", **export_filters)